@@ -114,7 +114,7 @@ def _set_cuda_device(device_id, verbose=None):
 # Repeated FFT multiplication
 
 def _setup_cuda_fft_multiply_repeated(n_jobs, h, n_fft,
-                                      kind='FFT FIR filtering'):
+                                      kind='FFT FIR filtering', h_fft=None):
     """Set up repeated CUDA FFT multiplication with a given filter.
 
     Parameters
@@ -128,6 +128,9 @@ def _setup_cuda_fft_multiply_repeated(n_jobs, h, n_fft,
         The number of points in the FFT.
     kind : str
         The kind to report to the user.
+    h_fft : array | None
+        The (precomputed) real FFT of ``h`` with ``n_fft`` points. If None,
+        it is computed here.
 
     Returns
     -------
@@ -154,8 +157,9 @@ def _setup_cuda_fft_multiply_repeated(n_jobs, h, n_fft,
     -----
     This function is designed to be used with fft_multiply_repeated().
     """
-    cuda_dict = dict(n_fft=n_fft, rfft=rfft, irfft=irfft,
-                     h_fft=rfft(h, n=n_fft))
+    if h_fft is None:
+        h_fft = rfft(h, n=n_fft)
+    cuda_dict = dict(n_fft=n_fft, rfft=rfft, irfft=irfft, h_fft=h_fft)
     if n_jobs == 'cuda':
         n_jobs = 1
         init_cuda()
@@ -345,7 +349,7 @@ def _fft_resample(x, new_len, npads, to_removes, cuda_dict=None,
 
 # this has to go in mne.cuda instead of mne.filter to avoid import errors
 def _smart_pad(x, n_pad, pad='reflect_limited'):
-    """Pad vector x."""
+    """Pad vector x (or each row of x, along the last axis)."""
     n_pad = np.asarray(n_pad)
     assert n_pad.shape == (2,)
     if (n_pad == 0).all():
@@ -354,9 +358,13 @@ def _smart_pad(x, n_pad, pad='reflect_limited'):
         raise RuntimeError('n_pad must be non-negative')
     if pad == 'reflect_limited':
         # need to pad with zeros if len(x) <= npad
-        l_z_pad = np.zeros(max(n_pad[0] - len(x) + 1, 0), dtype=x.dtype)
-        r_z_pad = np.zeros(max(n_pad[1] - len(x) + 1, 0), dtype=x.dtype)
-        return np.concatenate([l_z_pad, 2 * x[0] - x[n_pad[0]:0:-1], x,
-                               2 * x[-1] - x[-2:-n_pad[1] - 2:-1], r_z_pad])
+        n_x = x.shape[-1]
+        l_z_pad = np.zeros(x.shape[:-1] + (max(n_pad[0] - n_x + 1, 0),),
+                           dtype=x.dtype)
+        r_z_pad = np.zeros(x.shape[:-1] + (max(n_pad[1] - n_x + 1, 0),),
+                           dtype=x.dtype)
+        return np.concatenate([
+            l_z_pad, 2 * x[..., :1] - x[..., n_pad[0]:0:-1], x,
+            2 * x[..., -1:] - x[..., -2:-n_pad[1] - 2:-1], r_z_pad], axis=-1)
     else:
-        return np.pad(x, (tuple(n_pad),), pad)
+        return np.pad(x, ((0, 0),) * (x.ndim - 1) + (tuple(n_pad),), pad)
@@ -41,6 +41,7 @@ from .io.proj import setup_proj, ProjMixin, _proj_equal
 from .io.base import BaseRaw, TimeMixin
 from .bem import _check_origin
 from .evoked import EvokedArray, _check_decim
+from .annotations import _sync_onset
 from .baseline import rescale, _log_rescale
 from .channels.channels import (ContainsMixin, UpdateChannelsMixin,
                                 SetChannelsMixin, InterpolationMixin)
@@ -422,7 +423,8 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
                                  % (selected.shape, selection.shape))
             self.selection = selection
             if drop_log is None:
-                self.drop_log = [list() if k in self.selection else ['IGNORED']
+                use_selection = set(self.selection.tolist())
+                self.drop_log = [list() if k in use_selection else ['IGNORED']
                                  for k in range(max(len(events),
                                                     max(self.selection) + 1))]
             else:
@@ -759,11 +761,44 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
                             self.reject, self.flat, full_report=True,
                             ignore_chs=self.info['bads'])
 
+    def _is_good_epochs(self, data, other):
+        """Determine which epochs of a batch are good.
+
+        Parameters
+        ----------
+        data : ndarray, shape (n_epochs, n_channels, n_times)
+            The epochs to check (except for those in ``other``).
+        other : dict
+            The (noproj, proj) output for the epochs (by index) that are not
+            in ``data``, which are checked one at a time.
+
+        Returns
+        -------
+        reasons : list
+            None for each good epoch, otherwise the list of offending
+            reasons (as returned by ``_is_good_epoch``).
+        """
+        check = [ii for ii in range(len(data)) if ii not in other]
+        reasons = [None] * len(data)
+        if len(check) > 0 and (self.reject is not None or
+                               self.flat is not None):
+            if len(check) < len(data):
+                data = data[check]
+            if self._reject_time is not None:
+                data = data[..., self._reject_time]
+            for ii, bad_list in zip(check, _is_good_batch(
+                    data, self.ch_names, self._channel_type_idx,
+                    self.reject, self.flat, ignore_chs=self.info['bads'])):
+                reasons[ii] = bad_list
+        for ii, (_, epoch) in other.items():
+            reasons[ii] = self._is_good_epoch(epoch)[1]
+        return reasons
+
     @verbose
     def _detrend_offset_decim(self, epoch, verbose=None):
         """Aux Function: detrend, baseline correct, offset, decim.
 
-        Note: operates inplace
+        Note: operates inplace, on a single epoch or on a 3D array of epochs
         """
         if (epoch is None) or isinstance(epoch, str):
             return epoch
@@ -771,22 +806,25 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
         # Detrend
         if self.detrend is not None:
             picks = _pick_data_channels(self.info, exclude=[])
-            epoch[picks] = detrend(epoch[picks], self.detrend, axis=1)
+            epoch[..., picks, :] = detrend(epoch[..., picks, :],
+                                           self.detrend, axis=-1)
 
         # Baseline correct
-        picks = pick_types(self.info, meg=True, eeg=True, stim=False,
-                           ref_meg=True, eog=True, ecg=True, seeg=True,
-                           emg=True, bio=True, ecog=True, fnirs=True,
-                           exclude=[])
-        epoch[picks] = rescale(epoch[picks], self._raw_times, self.baseline,
-                               copy=False, verbose=False)
+        if self.baseline is not None:
+            picks = pick_types(self.info, meg=True, eeg=True, stim=False,
+                               ref_meg=True, eog=True, ecg=True, seeg=True,
+                               emg=True, bio=True, ecog=True, fnirs=True,
+                               exclude=[])
+            epoch[..., picks, :] = rescale(
+                epoch[..., picks, :], self._raw_times, self.baseline,
+                copy=False, verbose=False)
 
         # handle offset
         if self._offset is not None:
             epoch += self._offset
 
         # Decimate if necessary (i.e., epoch not preloaded)
-        epoch = epoch[:, self._decim_slice]
+        epoch = epoch[..., self._decim_slice]
         return epoch
 
     def iter_evoked(self, copy=False):
@@ -1272,9 +1310,37 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
             return epoch
         proj = self._do_delayed_proj or self.proj
         if self._projector is not None and proj is True:
-            epoch = np.dot(self._projector, epoch)
+            # works for a single epoch or a 3D array of epochs
+            epoch = np.matmul(self._projector, epoch)
         return epoch
 
+    def _get_epochs_from_raw(self, idx):
+        """Load several epochs as a 3D array.
+
+        Subclasses can override this to fetch the epochs in batches.
+
+        Returns
+        -------
+        data : ndarray, shape (n_epochs, n_channels, n_times)
+            The epochs (zeros for those in ``other``).
+        other : dict
+            The output of ``_get_epoch_from_raw`` (None, a str, or a too
+            short array) for the epochs that are not in ``data``, by their
+            position in ``idx``.
+        """
+        data = np.zeros((len(idx), len(self.ch_names), len(self._raw_times)))
+        other = dict()
+        for ii, this_idx in enumerate(idx):
+            epoch = self._get_epoch_from_raw(this_idx)
+            if isinstance(epoch, np.ndarray) and \
+                    epoch.shape[1] == data.shape[2]:
+                if np.iscomplexobj(epoch) and not np.iscomplexobj(data):
+                    data = data.astype(epoch.dtype)
+                data[ii] = epoch
+            else:
+                other[ii] = epoch
+        return data, other
+
     @verbose
     def _get_data(self, out=True, picks=None, item=None, verbose=None):
         """Load all data, dropping bad epochs along the way.
@@ -1316,54 +1382,81 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
                     picks = _picks_to_idx(self.info, picks)
                     return data[:, picks]
 
-            # we need to load from disk, drop, and return data
-            for ii, idx in enumerate(use_idx):
-                # faster to pre-allocate memory here
-                epoch_noproj = self._get_epoch_from_raw(idx)
-                epoch_noproj = self._detrend_offset_decim(epoch_noproj)
+            # we need to load from disk, drop, and return data, a batch of
+            # (at most about 64 MB of) epochs at a time
+            n_batch = max(2 ** 23 // (len(self.ch_names) *
+                                      len(self._raw_times)), 1)
+            for start in range(0, n_events, n_batch):
+                epochs_noproj, other = self._get_epochs_from_raw(
+                    use_idx[start:start + n_batch])
+                epochs_noproj = self._detrend_offset_decim(epochs_noproj)
                 if self._do_delayed_proj:
-                    epoch_out = epoch_noproj
+                    epochs_out = epochs_noproj
                 else:
-                    epoch_out = self._project_epoch(epoch_noproj)
-                if ii == 0:
+                    epochs_out = self._project_epoch(epochs_noproj)
+                if start == 0:
                     data = np.empty((n_events, len(self.ch_names),
-                                     len(self.times)), dtype=epoch_out.dtype)
-                data[ii] = epoch_out
+                                     len(self.times)), dtype=epochs_out.dtype)
+                data[start:start + n_batch] = epochs_out
+                for ii, epoch_noproj in other.items():
+                    epoch_noproj = self._detrend_offset_decim(epoch_noproj)
+                    data[start + ii] = epoch_noproj if self._do_delayed_proj \
+                        else self._project_epoch(epoch_noproj)
         else:
             # bads need to be dropped, this might occur after a preload
             # e.g., when calling drop_bad w/new params
             good_idx = []
             n_out = 0
             assert n_events == len(self.selection)
-            for idx, sel in enumerate(self.selection):
+            n_batch = max(2 ** 23 // (len(self.ch_names) *
+                                      len(self._raw_times)), 1)
+            for start in range(0, n_events, n_batch):
+                stop = min(start + n_batch, n_events)
                 if self.preload:  # from memory
+                    other = dict()
                     if self._do_delayed_proj:
-                        epoch_noproj = self._data[idx]
-                        epoch = self._project_epoch(epoch_noproj)
+                        batch_noproj = self._data[start:stop]
+                        batch = self._project_epoch(batch_noproj)
                     else:
-                        epoch_noproj = None
-                        epoch = self._data[idx]
+                        batch_noproj = None
+                        batch = self._data[start:stop]
                 else:  # from disk
-                    epoch_noproj = self._get_epoch_from_raw(idx)
-                    epoch_noproj = self._detrend_offset_decim(epoch_noproj)
-                    epoch = self._project_epoch(epoch_noproj)
-
-                epoch_out = epoch_noproj if self._do_delayed_proj else epoch
-                is_good, offending_reason = self._is_good_epoch(epoch)
-                if not is_good:
-                    self.drop_log[sel] += offending_reason
-                    continue
-                good_idx.append(idx)
-
-                # store the epoch if there is a reason to (output or update)
-                if out or self.preload:
-                    # faster to pre-allocate, then trim as necessary
-                    if n_out == 0 and not self.preload:
-                        data = np.empty((n_events, epoch_out.shape[0],
-                                         epoch_out.shape[1]),
-                                        dtype=epoch_out.dtype, order='C')
-                    data[n_out] = epoch_out
-                    n_out += 1
+                    batch_noproj, other = self._get_epochs_from_raw(
+                        np.arange(start, stop))
+                    batch_noproj = self._detrend_offset_decim(batch_noproj)
+                    batch = self._project_epoch(batch_noproj)
+                    for ii, epoch_noproj in other.items():
+                        epoch_noproj = self._detrend_offset_decim(epoch_noproj)
+                        other[ii] = (epoch_noproj,
+                                     self._project_epoch(epoch_noproj))
+                # check all the epochs of the batch at once
+                reasons = self._is_good_epochs(batch, other)
+
+                for ii, offending_reason in enumerate(reasons):
+                    idx, sel = start + ii, self.selection[start + ii]
+                    if offending_reason is not None:
+                        self.drop_log[sel] += offending_reason
+                        continue
+                    good_idx.append(idx)
+
+                    # store the epoch if there is a reason to (output or
+                    # update)
+                    if out or self.preload:
+                        if ii in other:
+                            epoch_noproj, epoch = other[ii]
+                        else:
+                            epoch_noproj = None if batch_noproj is None \
+                                else batch_noproj[ii]
+                            epoch = batch[ii]
+                        epoch_out = epoch_noproj if self._do_delayed_proj \
+                            else epoch
+                        # faster to pre-allocate, then trim as necessary
+                        if n_out == 0 and not self.preload:
+                            data = np.empty((n_events, epoch_out.shape[0],
+                                             epoch_out.shape[1]),
+                                            dtype=epoch_out.dtype, order='C')
+                        data[n_out] = epoch_out
+                        n_out += 1
 
             self._bad_dropped = True
             logger.info("%d bad epochs dropped" % (n_events - len(good_idx)))
@@ -2051,6 +2144,53 @@ class Epochs(BaseEpochs):
                                             self.reject_by_annotation)
         return data
 
+    def _get_epochs_from_raw(self, idx):
+        """Load several epochs, gathering them at once from preloaded raw."""
+        raw = self._raw
+        if raw is None or not raw.preload:
+            return super(Epochs, self)._get_epochs_from_raw(idx)
+        sfreq = raw.info['sfreq']
+        n_times = len(self._raw_times)
+        # same as the rounding in _get_epoch_from_raw
+        starts = np.array([int(round(event_samp + self._raw_times[0] * sfreq))
+                           for event_samp in self.events[idx, 0]], int)
+        starts -= raw.first_samp
+        stops = starts + n_times
+        other = dict()
+
+        # epochs that overlap a bad annotation, with the same precedence as
+        # _check_bad_segment (the first overlapping bad annotation wins)
+        annot = raw.annotations
+        if self.reject_by_annotation and len(annot) > 0:
+            onset = _sync_onset(raw, annot.onset)
+            offset = onset + annot.duration
+            order = np.argsort(starts, kind='mergesort')
+            start_times = starts[order] / sfreq
+            stop_times = stops[order] / sfreq
+            bad_descr = [(ai, descr) for ai, descr in
+                         enumerate(annot.description)
+                         if descr.lower().startswith('bad')]
+            for ai, descr in bad_descr[::-1]:
+                # onset < stop / sfreq and onset + duration > start / sfreq
+                lo = np.searchsorted(stop_times, onset[ai], 'right')
+                hi = np.searchsorted(start_times, offset[ai], 'left')
+                other.update(dict.fromkeys(order[lo:hi].tolist(), descr))
+        other.update(dict.fromkeys(np.where(starts < 0)[0].tolist()))
+        for ii in np.where(stops > raw.n_times)[0].tolist():
+            if ii not in other:  # too short
+                other[ii] = raw[self.picks, starts[ii]:stops[ii]][0]
+
+        # gather the others with a single fancy index of a strided view
+        good = np.setdiff1d(np.arange(len(idx)), list(other), True).astype(int)
+        data = np.zeros((len(idx), len(self.picks), n_times), raw._data.dtype)
+        if len(good) > 0:
+            windows = np.lib.stride_tricks.as_strided(
+                raw._data, (raw._data.shape[1] - n_times + 1,
+                            raw._data.shape[0], n_times),
+                (raw._data.strides[1],) + raw._data.strides)
+            data[good] = windows[np.ix_(starts[good], self.picks)]
+        return data, other
+
 
 @fill_doc
 class EpochsArray(BaseEpochs):
@@ -2383,6 +2523,43 @@ def _is_good(e, ch_names, channel_type_idx, reject, flat, full_report=False,
             return False, bad_list
 
 
+def _is_good_batch(data, ch_names, channel_type_idx, reject, flat,
+                   ignore_chs=[]):
+    """Test which epochs of data are good according to reject and flat.
+
+    This is the same as calling ``_is_good`` with ``full_report=True`` for
+    each epoch, but the peak-to-peak amplitudes are computed at once.
+    Returns a list with None for each good epoch, otherwise the list of
+    offending channels.
+    """
+    checkable = np.array([c not in ignore_chs for c in ch_names], bool)
+    deltas = np.max(data, axis=-1) - np.min(data, axis=-1)
+    bads = list()  # (mask of bad epochs, channel indices, name, kind)
+    for refl, f, t in zip([reject, flat], [np.greater, np.less], ['', 'flat']):
+        if refl is not None:
+            for key, thresh in refl.items():
+                idx = np.array(channel_type_idx[key], int)
+                if len(idx) > 0:
+                    mask = np.logical_and(f(deltas[:, idx], thresh),
+                                          checkable[idx])
+                    bads.append((mask, idx, key.upper(), t))
+    reasons = [None] * len(data)
+    if len(bads) == 0:
+        return reasons
+    for ei in np.where(np.any([mask.any(axis=1)
+                               for mask, _, _, _ in bads], axis=0))[0]:
+        bad_list = list()
+        for mask, idx, name, t in bads:
+            ch_name = [ch_names[idx[i]] for i in np.where(mask[ei])[0]]
+            if len(ch_name) > 0:
+                if len(bad_list) == 0:
+                    logger.info('    Rejecting %s epoch based on %s : '
+                                '%s' % (t, name, ch_name))
+                bad_list.extend(ch_name)
+        reasons[ei] = bad_list
+    return reasons
+
+
 def _read_one_epoch_file(f, tree, preload):
     """Read a single FIF file."""
     with f as fid:
@@ -2568,6 +2745,37 @@ class _RawContainer(object):
         self.epoch_shape = epoch_shape
         self.cals = cals
         self.proj = False
+        self.dtype = np.dtype({
+            FIFF.FIFFT_FLOAT: '>f4', FIFF.FIFFT_DOUBLE: '>f8',
+            FIFF.FIFFT_COMPLEX_FLOAT: '>c8',
+            FIFF.FIFFT_COMPLEX_DOUBLE: '>c16'}[data_tag.type])
+        # index to look up the epochs in the file by event sample
+        self.order = np.argsort(event_samps)
+        self.sorted_samps = event_samps[self.order]
+
+    def find(self, event_samps):
+        """Get the epoch index in the file for each event sample (or -1)."""
+        if len(self.sorted_samps) == 0:
+            return np.full(len(event_samps), -1)
+        pos = np.searchsorted(self.sorted_samps, event_samps)
+        pos = np.minimum(pos, len(self.sorted_samps) - 1)
+        return np.where(self.sorted_samps[pos] == event_samps,
+                        self.order[pos], -1)
+
+    def read(self, file_idx, out):
+        """Read (calibrated) epochs into out, coalescing contiguous reads."""
+        size = np.prod(self.epoch_shape) * self.dtype.itemsize
+        order = np.argsort(file_idx, kind='mergesort')
+        sorted_idx = file_idx[order]
+        breaks = np.where(np.diff(sorted_idx) != 1)[0] + 1
+        for run in np.split(np.arange(len(order)), breaks):
+            first, n = sorted_idx[run[0]], len(run)
+            self.fid.seek(self.data_tag.pos + first * size + 16, 0)  # header
+            out[order[run]] = np.frombuffer(
+                self.fid.read(n * size), self.dtype).reshape(
+                (n,) + tuple(self.epoch_shape))
+        out *= self.cals
+        return out
 
     def __del__(self):  # noqa: D105
         self.fid.close()
@@ -2675,33 +2883,28 @@ class EpochsFIF(BaseEpochs):
     @verbose
     def _get_epoch_from_raw(self, idx, verbose=None):
         """Load one epoch from disk."""
-        # Find the right file and offset to use
-        event_samp = self.events[idx, 0]
+        return self._get_epochs_from_raw([idx])[0][0]
+
+    def _get_epochs_from_raw(self, idx):
+        """Load several epochs from disk (in as few reads as possible)."""
+        event_samps = self.events[idx, 0]
+        dtype = np.complex128 if self._raw[0].dtype.kind == 'c' else \
+            np.float64
+        data = np.empty((len(event_samps),) + tuple(self._raw[0].epoch_shape),
+                        dtype)
+        found = np.zeros(len(event_samps), bool)
         for raw in self._raw:
-            idx = np.where(raw.event_samps == event_samp)[0]
-            if len(idx) == 1:
-                idx = idx[0]
-                size = np.prod(raw.epoch_shape) * 4
-                offset = idx * size
-                break
-        else:
+            file_idx = raw.find(event_samps)
+            mask = file_idx >= 0
+            if mask.any():
+                data[mask] = raw.read(file_idx[mask], np.empty(
+                    (mask.sum(),) + data.shape[1:], dtype))
+                found |= mask
+        if not found.all():
             # read the correct subset of the data
             raise RuntimeError('Correct epoch could not be found, please '
                                'contact mne-python developers')
-        # the following is equivalent to this, but faster:
-        #
-        # >>> data = read_tag(raw.fid, raw.data_tag.pos).data.astype(float)
-        # >>> data *= raw.cals[np.newaxis, :, :]
-        # >>> data = data[idx]
-        #
-        # Eventually this could be refactored in io/tag.py if other functions
-        # could make use of it
-
-        raw.fid.seek(raw.data_tag.pos + offset + 16, 0)  # 16 = Tag header
-        data = np.frombuffer(raw.fid.read(size), '>f4').astype(np.float64)
-        data.shape = raw.epoch_shape
-        data *= raw.cals
-        return data
+        return data, dict()
 
 
 @fill_doc
@@ -1,7 +1,8 @@
 """IIR and FIR filtering and resampling functions."""
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from functools import partial
+from functools import partial, lru_cache
 
 import numpy as np
 
@@ -9,7 +10,8 @@ from .annotations import _annotations_starts_stops
 from .io.pick import _picks_to_idx
 from .cuda import (_setup_cuda_fft_multiply_repeated, _fft_multiply_repeated,
                    _setup_cuda_fft_resample, _fft_resample, _smart_pad)
-from .fixes import minimum_phase, _sosfreqz, irfft, ifftshift, fftfreq
+from .fixes import (minimum_phase, _sosfreqz, rfft, irfft, ifftshift,
+                    fftfreq)
 from .parallel import parallel_func, check_n_jobs
 from .time_frequency.multitaper import _mt_spectra, _compute_mt_params
 from .utils import (logger, verbose, sum_squared, check_version, warn, _pl,
@@ -143,8 +145,8 @@ def _overlap_add_filter(x, h, n_fft=None, phase='zero', picks=None,
     picks : list | None
         See calling functions.
     n_jobs : int | str
-        Number of jobs to run in parallel. Can be 'cuda' if ``cupy``
-        is installed properly.
+        Number of threads to run in parallel (over the overlap-add
+        segments). Can be 'cuda' if ``cupy`` is installed properly.
     copy : bool
         If True, a copy of x, filtered, is returned. Otherwise, it operates
         on x in place.
@@ -164,9 +166,28 @@ def _overlap_add_filter(x, h, n_fft=None, phase='zero', picks=None,
     _check_zero_phase_length(len(h), phase)
     if len(h) == 1:
         return x * h ** 2 if phase == 'zero-double' else x * h
-    n_edge = max(min(len(h), x.shape[1]) - 1, 0)
+    h, n_edge, n_fft = _setup_overlap_add(h, x.shape[1], n_fft, phase)
+
+    picks = _picks_to_idx(len(x), picks)
+    if n_jobs == 'cuda':
+        # CUDA filters one row at a time
+        n_jobs, cuda_dict = _setup_cuda_fft_multiply_repeated(
+            n_jobs, h, n_fft, h_fft=_get_h_fft(h, n_fft))
+        for p in picks:
+            x[p] = _1d_overlap_filter(x[p], len(h), n_edge, phase,
+                                      cuda_dict, pad, n_fft)
+    elif len(picks) > 0:
+        _2d_overlap_filter(x, picks, h, n_edge, phase, pad, n_fft, n_jobs)
+
+    x.shape = orig_shape
+    return x
+
+
+def _setup_overlap_add(h, n_times, n_fft, phase):
+    """Get the (effective) filter, edge padding, and FFT length to use."""
+    n_edge = max(min(len(h), n_times) - 1, 0)
     logger.debug('Smart-padding with:  %s samples on each edge' % n_edge)
-    n_x = x.shape[1] + 2 * n_edge
+    n_x = n_times + 2 * n_edge
 
     if phase == 'zero-double':
         h = np.convolve(h, h[::-1])
@@ -194,26 +215,7 @@ def _overlap_add_filter(x, h, n_fft=None, phase='zero', picks=None,
     if n_fft < min_fft:
         raise ValueError('n_fft is too short, has to be at least '
                          '2 * len(h) - 1 (%s), got %s' % (min_fft, n_fft))
-
-    # Figure out if we should use CUDA
-    n_jobs, cuda_dict = _setup_cuda_fft_multiply_repeated(
-        n_jobs, h, n_fft)
-
-    # Process each row separately
-    picks = _picks_to_idx(len(x), picks)
-    if n_jobs == 1:
-        for p in picks:
-            x[p] = _1d_overlap_filter(x[p], len(h), n_edge, phase,
-                                      cuda_dict, pad, n_fft)
-    else:
-        parallel, p_fun, _ = parallel_func(_1d_overlap_filter, n_jobs)
-        data_new = parallel(p_fun(x[p], len(h), n_edge, phase,
-                                  cuda_dict, pad, n_fft) for p in picks)
-        for pp, p in enumerate(picks):
-            x[p] = data_new[pp]
-
-    x.shape = orig_shape
-    return x
+    return h, n_edge, n_fft
 
 
 def _1d_overlap_filter(x, n_h, n_edge, phase, cuda_dict, pad, n_fft):
@@ -248,6 +250,203 @@ def _1d_overlap_filter(x, n_h, n_edge, phase, cuda_dict, pad, n_fft):
     return x_filtered
 
 
+def _2d_overlap_filter(x, picks, h, n_edge, phase, pad, n_fft, n_jobs):
+    """Do overlap-add FFT FIR filtering of the rows picks of x, inplace.
+
+    The rows are filtered in blocks: each segment is transformed for a
+    block of rows in a single FFT call, and the segments are distributed
+    over ``n_jobs`` threads (the FFTs release the GIL). Neighboring segments
+    overlap in the output, so the even and the odd segments are processed
+    in two passes. Only the padded input and the output of one block are
+    held in memory at a time.
+    """
+    n_h = len(h)
+    h_fft = _get_h_fft(h, n_fft)
+    n_times = x.shape[1]
+    n_x = n_times + 2 * n_edge
+
+    n_seg = n_fft - n_h + 1
+    n_segments = int(np.ceil(n_x / float(n_seg)))
+    shift = ((n_h - 1) // 2 if phase.startswith('zero') else 0) + n_edge
+    # transform blocks of ~1 MB of complex spectra at a time, from blocks of
+    # rows of at most ~32 MB of padded data
+    n_rows = max(min(2 ** 16 // n_fft, 2 ** 22 // n_x), 1)
+
+    def _filter_segments(x_ext, x_filtered, seg_idxs):
+        for seg_idx in seg_idxs:
+            start = seg_idx * n_seg
+            start_filt = max(0, start - shift)
+            stop_filt = min(start - shift + n_fft, n_times)
+            if stop_filt <= start_filt:
+                continue
+            start_prod = max(0, shift - start)
+            stop_prod = start_prod + stop_filt - start_filt
+            seg = x_ext[:, start:start + n_seg]
+            prod = irfft(rfft(seg, n=n_fft) * h_fft, n=n_fft)
+            x_filtered[:, start_filt:stop_filt] += \
+                prod[:, start_prod:stop_prod]
+
+    n_jobs = min(check_n_jobs(n_jobs), max(n_segments // 2, 1))
+    if n_jobs > 1:
+        logger.debug('Filtering %d segments using %d threads'
+                     % (n_segments, n_jobs))
+    with ThreadPoolExecutor(n_jobs) as executor:
+        for ri in range(0, len(picks), n_rows):
+            rows = picks[ri:ri + n_rows]
+            x_ext = _smart_pad(x[rows], (n_edge, n_edge), pad)
+            x_filtered = np.zeros((len(rows), n_times))
+            if n_jobs == 1:
+                _filter_segments(x_ext, x_filtered, range(n_segments))
+            else:
+                for first in (0, 1):
+                    for future in [
+                            executor.submit(_filter_segments, x_ext,
+                                            x_filtered, seg_idxs)
+                            for seg_idxs in np.array_split(
+                                np.arange(first, n_segments, 2), n_jobs)]:
+                        future.result()  # re-raise any errors
+            x[rows] = x_filtered.astype(x.dtype, copy=False)
+            del x_ext, x_filtered
+
+
+class _OverlapAddStream(object):
+    """Compute samples of an overlap-add FIR filtered signal on demand.
+
+    This gives the same output as :func:`_overlap_add_filter` (with
+    ``n_fft=None``) for a signal of ``n_times`` samples, but only ever
+    holds the overlap-add blocks that contribute to the requested output
+    samples, so arbitrarily long signals can be filtered piece by piece.
+    The blocks of the last call are kept, so reading the signal
+    sequentially computes each block only once.
+
+    Parameters
+    ----------
+    h : 1d array
+        Filter impulse response (FIR filter coefficients).
+    n_times : int
+        The number of samples in the whole signal.
+    phase : str
+        The filter phase (see :func:`_overlap_add_filter`).
+    pad : str
+        Padding type for ``_smart_pad``. Only the modes that depend on the
+        edge samples alone are supported.
+    """
+
+    def __init__(self, h, n_times, phase, pad):  # noqa: D102
+        _check_zero_phase_length(len(h), phase)
+        _check_option('pad', pad, ('reflect_limited', 'reflect', 'symmetric',
+                                   'edge', 'constant', 'linear_ramp'),
+                      extra='when filtering without preloading')
+        self.n_times, self.phase, self.pad = n_times, phase, pad
+        self.h = h
+        if len(h) > 1:
+            h, self.n_edge, self.n_fft = _setup_overlap_add(
+                h, n_times, None, phase)
+            self.n_h = len(h)
+            self.h_fft = _get_h_fft(h, self.n_fft)
+            self.n_seg = self.n_fft - self.n_h + 1
+            n_x = n_times + 2 * self.n_edge
+            self.n_segments = int(np.ceil(n_x / float(self.n_seg)))
+            self.shift = ((self.n_h - 1) // 2 if phase.startswith('zero')
+                          else 0) + self.n_edge
+            self._blocks = dict()
+
+    def __call__(self, read, start, stop):
+        """Get the filtered samples ``start:stop``.
+
+        ``read(start, stop)`` must return the unfiltered signal samples
+        ``start:stop`` as an array of shape (n_signals, stop - start).
+        """
+        if len(self.h) == 1:
+            h = self.h ** 2 if self.phase == 'zero-double' else self.h
+            return read(start, stop) * h
+        n_seg = self.n_seg
+        # the blocks that contribute to the output samples
+        k_start = max(-((self.n_fft - 1 - start - self.shift) // n_seg), 0)
+        k_stop = min((stop - 1 + self.shift) // n_seg + 1, self.n_segments)
+        blocks = self._get_blocks(read, k_start, k_stop)
+        x_filtered = np.zeros((len(blocks[0]), stop - start))
+        for seg_idx, prod in zip(range(k_start, k_stop), blocks):
+            # where this block lands in the output, and what part we need
+            out_start = seg_idx * n_seg - self.shift
+            start_filt = max(out_start, start)
+            stop_filt = min(out_start + self.n_fft, stop)
+            x_filtered[:, start_filt - start:stop_filt - start] += \
+                prod[:, start_filt - out_start:stop_filt - out_start]
+        return x_filtered
+
+    def _get_blocks(self, read, k_start, k_stop):
+        """Get the filtered blocks, reusing those of the previous call."""
+        n_edge, n_seg, n_fft = self.n_edge, self.n_seg, self.n_fft
+        blocks = dict((k, self._blocks[k]) for k in range(k_start, k_stop)
+                      if k in self._blocks)
+        missing = [k for k in range(k_start, k_stop) if k not in blocks]
+        if len(missing) > 0:
+            k_start_, k_stop_ = missing[0], missing[-1] + 1
+            # the (padded) input these blocks need
+            x_start = k_start_ * n_seg - n_edge
+            x_stop = k_stop_ * n_seg - n_edge
+            x_ext = list()
+            if x_start < 0:
+                x_ext.append(self._get_edge(read, 0, x_start, min(x_stop, 0)))
+            if max(x_start, 0) < min(x_stop, self.n_times):
+                x_ext.append(read(max(x_start, 0), min(x_stop, self.n_times)))
+            if x_stop > self.n_times:
+                x_ext.append(self._get_edge(
+                    read, 1, max(x_start, self.n_times), x_stop))
+            x_ext = np.concatenate(x_ext, axis=-1)
+            for seg_idx in range(k_start_, k_stop_):
+                seg_start = (seg_idx - k_start_) * n_seg
+                blocks[seg_idx] = irfft(rfft(
+                    x_ext[:, seg_start:seg_start + n_seg], n=n_fft) *
+                    self.h_fft, n=n_fft)
+        # sequential reads overlap by (at most) a few blocks
+        self._blocks = blocks
+        return [blocks[k] for k in range(k_start, k_stop)]
+
+    def _get_edge(self, read, end, start, stop):
+        """Get the padded samples ``start:stop`` before or after the signal."""
+        n_read = min(self.n_edge + 1, self.n_times)
+        first = 0 if end == 0 else self.n_times - n_read
+        n_pad = (self.n_edge, 0) if end == 0 else (0, self.n_edge)
+        x = np.array([_smart_pad(xx, n_pad, self.pad)
+                      for xx in read(first, first + n_read)])
+        offset = first - n_pad[0]
+        # the last block is zero-padded beyond the smart-padded edge
+        n_zero = max(stop - offset - x.shape[1], 0)
+        x = np.concatenate([x, np.zeros((len(x), n_zero))], axis=-1)
+        return x[:, start - offset:stop - offset]
+
+
+def _filter_raw_to_file(raw, fname, overwrite, onsets, ends, update_info,
+                        l_freq, h_freq, picks, filter_length,
+                        l_trans_bandwidth, h_trans_bandwidth, method,
+                        iir_params, phase, fir_window, fir_design, pad,
+                        verbose):
+    """Filter (possibly not preloaded) raw data and write it to disk."""
+    from .io.base import _RawFiltered
+    from .io.fiff import read_raw_fif
+    streams = list()
+    max_idx = (ends - onsets).argmax() if len(onsets) else 0
+    for si, (start, stop) in enumerate(zip(onsets, ends)):
+        use_verbose = verbose if si == max_idx else 'error'
+        # the filter only depends on the number of samples, not the data
+        filt = create_filter(
+            np.broadcast_to(0., (1, stop - start)), raw.info['sfreq'], l_freq,
+            h_freq, filter_length, l_trans_bandwidth, h_trans_bandwidth,
+            method, iir_params, phase, fir_window, fir_design,
+            verbose=use_verbose)
+        if method == 'iir':
+            stream = _IIRStream(filt, stop - start)
+        else:
+            stream = _OverlapAddStream(filt, stop - start, phase, pad)
+        streams.append((start, stop, stream))
+    info = raw.info.copy()
+    _filt_update_info(info, update_info, l_freq, h_freq)
+    _RawFiltered(raw, info, picks, streams).save(fname, overwrite=overwrite)
+    return read_raw_fif(fname, verbose=False)
+
+
 def _filter_attenuation(h, freq, gain):
     """Compute minimum attenuation at stop frequency."""
     from scipy.signal import freqz
@@ -358,11 +557,7 @@ def _construct_fir_filter(sfreq, freq, gain, filter_length, phase, fir_window,
         Filter coefficients.
     """
     assert freq[0] == 0
-    if fir_design == 'firwin2':
-        from scipy.signal import firwin2 as fir_design
-    else:
-        assert fir_design == 'firwin'
-        fir_design = partial(_firwin_design, sfreq=sfreq)
+    _check_option('fir_design', fir_design, ('firwin2', 'firwin'))
 
     # issue a warning if attenuation is less than this
     min_att_db = 12 if phase == 'minimum' else 20
@@ -376,6 +571,33 @@ def _construct_fir_filter(sfreq, freq, gain, filter_length, phase, fir_window,
 
     # Use overlap-add filter with a fixed length
     N = _check_zero_phase_length(filter_length, phase, gain[-1])
+    h, att_db, att_freq = _design_fir_filter(
+        float(sfreq), tuple(freq), tuple(gain), N, phase, fir_window,
+        fir_design)
+    if phase == 'zero-double':
+        att_db += 6
+    if att_db < min_att_db:
+        att_freq *= sfreq / 2.
+        warn('Attenuation at stop frequency %0.2f Hz is only %0.2f dB. '
+             'Increase filter_length for higher attenuation.'
+             % (att_freq, att_db))
+    return h.copy()
+
+
+@lru_cache(maxsize=32)
+def _design_fir_filter(sfreq, freq, gain, N, phase, fir_window, fir_design):
+    """Design a FIR filter and compute its attenuation (cached).
+
+    ``freq`` and ``gain`` are tuples of normalized frequencies and gains.
+    The filter is returned read-only, as it is shared between calls.
+    """
+    logger.debug('Designing FIR filter with %s taps' % (N,))
+    freq, gain = np.array(freq), np.array(gain)
+    if fir_design == 'firwin2':
+        from scipy.signal import firwin2 as fir_design
+    else:
+        assert fir_design == 'firwin'
+        fir_design = partial(_firwin_design, sfreq=sfreq)
     # construct symmetric (linear phase) filter
     if phase == 'minimum':
         h = fir_design(N * 2 - 1, freq, gain, window=fir_window)
@@ -384,14 +606,68 @@ def _construct_fir_filter(sfreq, freq, gain, filter_length, phase, fir_window,
         h = fir_design(N, freq, gain, window=fir_window)
     assert h.size == N
     att_db, att_freq = _filter_attenuation(h, freq, gain)
-    if phase == 'zero-double':
-        att_db += 6
-    if att_db < min_att_db:
-        att_freq *= sfreq / 2.
-        warn('Attenuation at stop frequency %0.2f Hz is only %0.2f dB. '
-             'Increase filter_length for higher attenuation.'
-             % (att_freq, att_db))
-    return h
+    h.flags.writeable = False
+    return h, att_db, att_freq
+
+
+@lru_cache(maxsize=32)
+def _rfft_cached(h_bytes, n_fft):
+    """Compute the real FFT of a filter given as float64 bytes (cached).
+
+    The bytes make the filter hashable. The FFT is returned read-only, as it
+    is shared between calls.
+    """
+    h_fft = rfft(np.frombuffer(h_bytes), n=n_fft)
+    h_fft.flags.writeable = False
+    return h_fft
+
+
+def _get_h_fft(h, n_fft):
+    """Get the (cached, read-only) real FFT of a filter."""
+    return _rfft_cached(np.asarray(h, np.float64).tobytes(), int(n_fft))
+
+
+def fir_cache_info():
+    """Get the statistics of the FIR filter caches.
+
+    FIR filter designs (as used by :func:`mne.filter.create_filter`,
+    :func:`mne.filter.filter_data` and the ``filter`` methods) and their
+    FFTs are cached, so that filtering many epochs, channels, or files with
+    the same parameters designs the filter only once.
+
+    Returns
+    -------
+    info : dict
+        The ``'design'`` and ``'fft'`` entries are the statistics of the
+        filter design and filter FFT caches, respectively, as named tuples
+        with the fields ``hits``, ``misses``, ``maxsize`` and ``currsize``
+        (see :func:`functools.lru_cache`).
+
+    See Also
+    --------
+    fir_cache_clear
+
+    Notes
+    -----
+    .. versionadded:: 0.20
+    """
+    return dict(design=_design_fir_filter.cache_info(),
+                fft=_rfft_cached.cache_info())
+
+
+def fir_cache_clear():
+    """Empty the FIR filter caches (and reset their statistics).
+
+    See Also
+    --------
+    fir_cache_info
+
+    Notes
+    -----
+    .. versionadded:: 0.20
+    """
+    _design_fir_filter.cache_clear()
+    _rfft_cached.cache_clear()
 
 
 def _check_zero_phase_length(N, phase, gain_nyq=0):
@@ -434,18 +710,170 @@ def _filtfilt(x, iir_params, picks, n_jobs, copy):
         fun = partial(filtfilt, b=iir_params['b'], a=iir_params['a'],
                       padlen=padlen, axis=-1)
         _check_coefficients((iir_params['b'], iir_params['a']))
-    if n_jobs == 1:
-        for p in picks:
-            x[p] = fun(x=x[p])
+    # filter blocks of (~8 MB of) channels with one vectorized call each,
+    # in threads if requested (the filtering loops release the GIL)
+    n_per = max(2 ** 20 // max(x.shape[-1] + 2 * padlen, 1), 1)
+    blocks = [picks[ii:ii + n_per] for ii in range(0, len(picks), n_per)]
+
+    def _filter_block(block):
+        x[block] = fun(x=x[block])
+
+    n_jobs = min(n_jobs, len(blocks))
+    if n_jobs <= 1:
+        for block in blocks:
+            _filter_block(block)
     else:
-        parallel, p_fun, _ = parallel_func(fun, n_jobs)
-        data_new = parallel(p_fun(x=x[p]) for p in picks)
-        for pp, p in enumerate(picks):
-            x[p] = data_new[pp]
+        with ThreadPoolExecutor(n_jobs) as executor:
+            for future in [executor.submit(_filter_block, block)
+                           for block in blocks]:
+                future.result()  # re-raise any errors
     x.shape = orig_shape
     return x
 
 
+def _iir_filt(iir_params, x, zi):
+    """Filter the rows of x causally, starting from (and returning) zi."""
+    from scipy.signal import lfilter, sosfilt
+    if 'sos' in iir_params:
+        return sosfilt(iir_params['sos'], x, axis=-1, zi=zi)
+    return lfilter(iir_params['b'], iir_params['a'], x, axis=-1, zi=zi)
+
+
+def _iir_zi(iir_params):
+    """Get the step response steady-state of the filter, ready to scale."""
+    from scipy.signal import lfilter_zi, sosfilt_zi
+    if 'sos' in iir_params:
+        zi = sosfilt_zi(iir_params['sos'])
+        return zi[:, np.newaxis, :]  # (n_sections, 1, 2)
+    return lfilter_zi(iir_params['b'], iir_params['a'])[np.newaxis]
+
+
+def _iir_decay_samples(system, tol=1e-10):
+    """Get the number of samples for the IIR filter memory to decay."""
+    from scipy.signal import sos2zpk, tf2zpk
+    if isinstance(system, tuple):
+        p = tf2zpk(*system)[1]
+    else:
+        p = sos2zpk(system)[1]
+    r = np.abs(p).max() if len(p) else 0.
+    return int(np.ceil(np.log(tol) / np.log(r))) if r > 0 else 1
+
+
+class _IIRStream(object):
+    """Compute samples of a zero-phase (filtfilt) IIR filtered signal.
+
+    The forward pass runs over the signal in order, carrying the filter
+    state across blocks, and all signals are filtered together. The
+    reverse pass is computed for blocks of ``n_block`` samples, each one
+    started ``n_look`` samples after the end of its block (from the steady
+    state of the last forward sample, as for the end of the signal), so
+    only ``n_block + n_look`` samples are held at a time. For the blocks
+    that reach the end of the signal, this is the same as
+    :func:`scipy.signal.sosfiltfilt` (or :func:`scipy.signal.filtfilt`);
+    for the others the difference decays with the filter ringing.
+
+    Parameters
+    ----------
+    iir_params : dict
+        The IIR filter parameters, as returned by
+        :func:`construct_iir_filter`.
+    n_times : int
+        The number of samples in the whole signal.
+    n_look : int | None
+        The number of samples to run the reverse pass for before a block.
+        If None, the number of samples it takes the slowest pole of the
+        filter to decay by a factor of ``1e10`` is used.
+    """
+
+    def __init__(self, iir_params, n_times, n_look=None):  # noqa: D102
+        if 'sos' in iir_params:
+            system = iir_params['sos']
+        else:
+            system = (iir_params['b'], iir_params['a'])
+        _check_coefficients(system)
+        self.iir_params = iir_params
+        self.n_times = n_times
+        self.padlen = min(iir_params['padlen'], n_times - 1)
+        self.n_ext = n_times + 2 * self.padlen
+        if n_look is None:
+            n_look = _iir_decay_samples(system)
+        self.n_look = int(n_look)
+        self.n_block = max(self.n_look, 2 ** 14)
+        self._zi = _iir_zi(iir_params)
+        self._edges = None
+        self._reset()
+        self._blocks = dict()
+
+    def _reset(self):
+        self._fwd_start = self._fwd_stop = 0
+        self._fwd = self._fwd_zi = None
+
+    def __call__(self, read, start, stop):
+        """Get the filtered samples ``start:stop``.
+
+        ``read(start, stop)`` must return the unfiltered signal samples
+        ``start:stop`` as an array of shape (n_signals, stop - start).
+        """
+        start, stop = start + self.padlen, stop + self.padlen
+        out = list()
+        blocks = dict()
+        for k in range(start // self.n_block,
+                       (stop - 1) // self.n_block + 1):
+            if k in self._blocks:
+                blocks[k] = self._blocks[k]
+            else:
+                blocks[k] = self._reverse_block(read, k)
+            block_start = k * self.n_block
+            out.append(blocks[k][:, max(start - block_start, 0):
+                                 stop - block_start])
+        # sequential reads overlap by (at most) a block
+        self._blocks = blocks
+        return np.concatenate(out, axis=-1)
+
+    def _reverse_block(self, read, k):
+        """Compute the zero-phase output of (extended) block k."""
+        start = k * self.n_block
+        stop = min(start + self.n_block, self.n_ext)
+        y = self._forward(read, start, min(stop + self.n_look, self.n_ext))
+        y = _iir_filt(self.iir_params, y[:, ::-1],
+                      self._zi * y[:, -1:])[0][:, ::-1]
+        return y[:, :stop - start]
+
+    def _forward(self, read, start, stop):
+        """Get the forward pass over the extended samples start:stop."""
+        if start < self._fwd_start:  # seeking backward, start over
+            self._reset()
+        while self._fwd_stop < stop:
+            x = self._read_ext(read, self._fwd_stop,
+                               min(self._fwd_stop + self.n_block, stop))
+            if self._fwd_zi is None:
+                self._fwd_zi = self._zi * x[:, :1]
+            y, self._fwd_zi = _iir_filt(self.iir_params, x, self._fwd_zi)
+            if self._fwd is not None:
+                y = np.concatenate([self._fwd, y], axis=-1)
+            self._fwd, self._fwd_stop = y, self._fwd_stop + x.shape[1]
+            # only keep what is needed from now on
+            drop = min(start, self._fwd_stop) - self._fwd_start
+            self._fwd = self._fwd[:, drop:]
+            self._fwd_start += drop
+        return self._fwd[:, start - self._fwd_start:stop - self._fwd_start]
+
+    def _read_ext(self, read, start, stop):
+        """Read the samples start:stop of the odd-extended signal."""
+        n_times, padlen = self.n_times, self.padlen
+        if self._edges is None:
+            self._edges = (read(0, 1), read(n_times - 1, n_times))
+        idx = np.arange(start, stop) - padlen
+        left, right = idx < 0, idx >= n_times
+        idx[left] = -idx[left]
+        idx[right] = 2 * (n_times - 1) - idx[right]
+        first = idx.min()
+        x = read(first, idx.max() + 1)[:, idx - first]
+        x[:, left] = 2 * self._edges[0] - x[:, left]
+        x[:, right] = 2 * self._edges[1] - x[:, right]
+        return x
+
+
 def estimate_ringing_samples(system, max_try=100000):
     """Estimate filter ringing.
 
@@ -1085,7 +1513,7 @@ def notch_filter(x, Fs, freqs, filter_length='auto', notch_widths=None,
         Frequencies to notch filter in Hz, e.g. np.arange(60, 241, 60).
         None can only be used with the mode 'spectrum_fit', where an F
         test is used to find sinusoidal components.
-    %(filter_length)s
+    %(filter_length-notch)s
     notch_widths : float | array of float | None
         Width of the stop band (centred at each freq in freqs) in Hz.
         If None, freqs / 200 is used.
@@ -1153,7 +1581,24 @@ def notch_filter(x, Fs, freqs, filter_length='auto', notch_widths=None,
     cite this in publications if method 'spectrum_fit' is used.
     """
     iir_params, method = _check_method(method, iir_params, ['spectrum_fit'])
+    freqs, notch_widths = _check_notch_freqs(freqs, notch_widths, method)
+
+    if method in ('fir', 'iir'):
+        # Speed this up by computing the fourier coefficients once
+        tb_2 = trans_bandwidth / 2.0
+        lows, highs = _notch_bands(freqs, notch_widths, tb_2)
+        xf = filter_data(x, Fs, highs, lows, picks, filter_length, tb_2, tb_2,
+                         n_jobs, method, iir_params, copy, phase, fir_window,
+                         fir_design, pad=pad)
+    elif method == 'spectrum_fit':
+        xf = _mt_spectrum_proc(x, Fs, freqs, notch_widths, mt_bandwidth,
+                               p_value, picks, n_jobs, copy, filter_length)
 
+    return xf
+
+
+def _check_notch_freqs(freqs, notch_widths, method):
+    """Check the notch frequencies and widths."""
     if freqs is not None:
         freqs = np.atleast_1d(freqs)
     elif method != 'spectrum_fit':
@@ -1173,35 +1618,123 @@ def notch_filter(x, Fs, freqs, filter_length='auto', notch_widths=None,
             elif len(notch_widths) != len(freqs):
                 raise ValueError('notch_widths must be None, scalar, or the '
                                  'same length as freqs')
-
+    return freqs, notch_widths
+
+
+def _notch_bands(freqs, notch_widths, tb_2):
+    """Get the band-stop edges of FIR and IIR notch filters."""
+    lows = [freq - nw / 2.0 - tb_2
+            for freq, nw in zip(freqs, notch_widths)]
+    highs = [freq + nw / 2.0 + tb_2
+             for freq, nw in zip(freqs, notch_widths)]
+    return lows, highs
+
+
+def _notch_filter_raw_to_file(raw, fname, overwrite, freqs, picks,
+                              filter_length, notch_widths, trans_bandwidth,
+                              n_jobs, method, iir_params, mt_bandwidth,
+                              p_value, phase, fir_window, fir_design, pad,
+                              verbose):
+    """Notch filter (possibly not preloaded) raw data and write it to disk."""
+    from .io.base import _RawFiltered
+    from .io.fiff import read_raw_fif
+    iir_params, method = _check_method(method, iir_params, ['spectrum_fit'])
+    freqs, notch_widths = _check_notch_freqs(freqs, notch_widths, method)
+    n_times, sfreq = raw.n_times, raw.info['sfreq']
     if method in ('fir', 'iir'):
-        # Speed this up by computing the fourier coefficients once
         tb_2 = trans_bandwidth / 2.0
-        lows = [freq - nw / 2.0 - tb_2
-                for freq, nw in zip(freqs, notch_widths)]
-        highs = [freq + nw / 2.0 + tb_2
-                 for freq, nw in zip(freqs, notch_widths)]
-        xf = filter_data(x, Fs, highs, lows, picks, filter_length, tb_2, tb_2,
-                         n_jobs, method, iir_params, copy, phase, fir_window,
-                         fir_design, pad=pad)
-    elif method == 'spectrum_fit':
-        xf = _mt_spectrum_proc(x, Fs, freqs, notch_widths, mt_bandwidth,
-                               p_value, picks, n_jobs, copy)
-
-    return xf
+        lows, highs = _notch_bands(freqs, notch_widths, tb_2)
+        return _filter_raw_to_file(
+            raw, fname, overwrite, np.array([0]), np.array([n_times]), False,
+            highs, lows, picks, filter_length, tb_2, tb_2, method, iir_params,
+            phase, fir_window, fir_design, pad, verbose)
+    n_window = _mt_spectrum_n_window(filter_length, sfreq, n_times,
+                                     auto=int(round(10 * sfreq)))
+    logger.info('Removing line noise in %0.3f sec sliding windows'
+                % (n_window / sfreq,))
+    stream = _MTSpectrumStream(n_times, sfreq, freqs, notch_widths,
+                               mt_bandwidth, p_value, n_window,
+                               check_n_jobs(n_jobs))
+    _RawFiltered(raw, raw.info.copy(), picks, [(0, n_times, stream)]).save(
+        fname, overwrite=overwrite)
+    return read_raw_fif(fname, verbose=False)
 
 
 def _mt_spectrum_proc(x, sfreq, line_freqs, notch_widths, mt_bandwidth,
-                      p_value, picks, n_jobs, copy):
+                      p_value, picks, n_jobs, copy, filter_length='auto'):
     """Call _mt_spectrum_remove."""
-    from scipy import stats
     # set up array for filtering, reshape to 2D, operate on last axis
     n_jobs = check_n_jobs(n_jobs)
     x, orig_shape, picks = _prep_for_filtering(x, copy, picks)
-
-    # XXX need to implement the moving window version for raw files
     n_times = x.shape[1]
+    n_window = _mt_spectrum_n_window(filter_length, sfreq, n_times)
+
+    if n_window < n_times:
+        logger.info('Removing line noise in %0.3f sec sliding windows'
+                    % (n_window / sfreq,))
+        stream = _MTSpectrumStream(n_times, sfreq, line_freqs, notch_widths,
+                                   mt_bandwidth, p_value, n_window, n_jobs)
+        x_picks = x[picks]
+        x[picks] = stream(lambda start, stop: x_picks[:, start:stop],
+                          0, n_times)
+    else:
+        window_fun, threshold = _get_mt_spectrum_params(
+            n_times, sfreq, mt_bandwidth, p_value)
+        x_picks = x[picks]
+        freq_list = _mt_spectrum_remove(x_picks, sfreq, line_freqs,
+                                        notch_widths, window_fun, threshold,
+                                        n_jobs)
+        x[picks] = x_picks
+
+        # report found frequencies
+        if line_freqs is None:
+            for rm_freqs in freq_list:
+                if len(rm_freqs) > 0:
+                    logger.info('Detected notch frequencies:\n%s'
+                                % ', '.join([str(rm_f) for rm_f in rm_freqs]))
+                else:
+                    logger.info('Detected notch frequecies:\nNone')
 
+    x.shape = orig_shape
+    return x
+
+
+def _mt_spectrum_n_window(filter_length, sfreq, n_times, auto=None):
+    """Get the sliding window length (in samples) for spectrum_fit."""
+    if isinstance(filter_length, str):
+        filter_length = filter_length.lower()
+        if filter_length == 'auto':
+            return n_times if auto is None else min(auto, n_times)
+        err_msg = ('filter_length, if a string, must be a human-readable '
+                   'time, e.g. "10s", or "auto", not "%s"' % filter_length)
+        if filter_length.endswith('ms'):
+            mult_fact, filter_length = 1e-3, filter_length[:-2]
+        elif filter_length.endswith('s'):
+            mult_fact, filter_length = 1., filter_length[:-1]
+        else:
+            raise ValueError(err_msg)
+        try:
+            filter_length = float(filter_length)
+        except ValueError:
+            raise ValueError(err_msg)
+        filter_length = int(np.ceil(filter_length * mult_fact * sfreq))
+    elif not isinstance(filter_length, (int, np.integer)):
+        raise ValueError('filter_length must be a str or int, got %s'
+                         % (type(filter_length),))
+    if filter_length <= 0:
+        raise ValueError('filter_length must be positive, got %s'
+                         % (filter_length,))
+    return min(int(filter_length), n_times)
+
+
+@lru_cache(maxsize=8)
+def _get_mt_spectrum_params(n_times, sfreq, mt_bandwidth, p_value):
+    """Get the DPSS tapers and F-test threshold for spectrum fitting.
+
+    These only depend on the window length and bandwidth, so they are cached
+    (read-only) for the repeated windows of streaming or epoched data.
+    """
+    from scipy import stats
     # max taper size chosen because it has an max error < 1e-3:
     # >>> np.max(np.diff(dpss_windows(953, 4, 100)[0]))
     # 0.00099972447657578449
@@ -1211,51 +1744,54 @@ def _mt_spectrum_proc(x, sfreq, line_freqs, notch_widths, mt_bandwidth,
     dpss_n_times_max = 100000 if check_version('scipy', '1.1') else 1000
 
     # figure out what tapers to use
-    window_fun, eigvals, _ = _compute_mt_params(
+    window_fun, _, _ = _compute_mt_params(
         n_times, sfreq, mt_bandwidth, False, False,
         interp_from=min(n_times, dpss_n_times_max), verbose=False)
+    window_fun.flags.writeable = False
 
     # F-stat of 1-p point
     threshold = stats.f.ppf(1 - p_value / n_times, 2, 2 * len(window_fun) - 2)
-
-    if n_jobs == 1:
-        freq_list = list()
-        for ii, x_ in enumerate(x):
-            if ii in picks:
-                x[ii], f = _mt_spectrum_remove(x_, sfreq, line_freqs,
-                                               notch_widths, window_fun,
-                                               threshold)
-                freq_list.append(f)
-    else:
-        parallel, p_fun, _ = parallel_func(_mt_spectrum_remove, n_jobs)
-        data_new = parallel(p_fun(x_, sfreq, line_freqs, notch_widths,
-                                  window_fun, threshold)
-                            for xi, x_ in enumerate(x)
-                            if xi in picks)
-        freq_list = [d[1] for d in data_new]
-        data_new = np.array([d[0] for d in data_new])
-        x[picks, :] = data_new
-
-    # report found frequencies
-    for rm_freqs in freq_list:
-        if line_freqs is None:
-            if len(rm_freqs) > 0:
-                logger.info('Detected notch frequencies:\n%s'
-                            % ', '.join([str(rm_f) for rm_f in rm_freqs]))
-            else:
-                logger.info('Detected notch frequecies:\nNone')
-
-    x.shape = orig_shape
-    return x
+    return window_fun, threshold
 
 
 def _mt_spectrum_remove(x, sfreq, line_freqs, notch_widths,
-                        window_fun, threshold):
+                        window_fun, threshold, n_jobs=1):
     """Use MT-spectrum to remove line frequencies.
 
     Based on Chronux. If line_freqs is specified, all freqs within notch_width
     of each line_freq is set to zero.
+
+    The sinusoids are fitted to (and removed from) all rows of the 2D array
+    ``x`` in place, a block of rows at a time. The frequencies removed from
+    each row are returned.
     """
+    n_signals, n_times = x.shape
+    # keep the tapered spectra of each block to ~64 MB
+    n_per = max(2 ** 22 // (len(window_fun) * n_times), 1)
+    blocks = [np.arange(start, min(start + n_per, n_signals))
+              for start in range(0, n_signals, n_per)]
+    rm_freqs = [None] * n_signals
+
+    def _remove(idx):
+        x[idx], this_rm_freqs = _mt_spectrum_remove_block(
+            x[idx], sfreq, line_freqs, notch_widths, window_fun, threshold)
+        for ii, freqs in zip(idx, this_rm_freqs):
+            rm_freqs[ii] = freqs
+
+    n_jobs = min(n_jobs, len(blocks))
+    if n_jobs == 1:
+        for idx in blocks:
+            _remove(idx)
+    else:
+        with ThreadPoolExecutor(n_jobs) as executor:
+            for future in [executor.submit(_remove, idx) for idx in blocks]:
+                future.result()  # re-raise any errors
+    return rm_freqs
+
+
+def _mt_spectrum_remove_block(x, sfreq, line_freqs, notch_widths,
+                              window_fun, threshold):
+    """Fit and remove the sinusoids of a (n_signals, n_times) block."""
     # drop the even tapers
     n_tapers = len(window_fun)
     tapers_odd = np.arange(0, n_tapers, 2)
@@ -1268,15 +1804,12 @@ def _mt_spectrum_remove(x, sfreq, line_freqs, notch_widths,
     # sum of squares across tapers (1, )
     H0_sq = sum_squared(H0)
 
-    # make "time" vector
-    rads = 2 * np.pi * (np.arange(x.size) / float(sfreq))
-
     # compute mt_spectrum (returning n_ch, n_tapers, n_freq)
-    x_p, freqs = _mt_spectra(x[np.newaxis, :], window_fun, sfreq)
+    n_times = x.shape[1]
+    x_p, freqs = _mt_spectra(x, window_fun, sfreq)
 
-    # sum of the product of x_p and H0 across tapers (1, n_freqs)
-    x_p_H0 = np.sum(x_p[:, tapers_odd, :] *
-                    H0[np.newaxis, :, np.newaxis], axis=1)
+    # sum of the product of x_p and H0 across tapers (n_ch, n_freqs)
+    x_p_H0 = np.einsum('ijk,j->ik', x_p[:, tapers_odd], H0)
 
     # resulting calculated amplitudes for all freqs
     A = x_p_H0 / H0_sq
@@ -1285,7 +1818,7 @@ def _mt_spectrum_remove(x, sfreq, line_freqs, notch_widths,
         # figure out which freqs to remove using F stat
 
         # estimated coefficient
-        x_hat = A * H0[:, np.newaxis]
+        x_hat = A[:, np.newaxis] * H0[:, np.newaxis]
 
         # numerator for F-statistic
         num = (n_tapers - 1) * (A * A.conj()).real * H0_sq
@@ -1296,32 +1829,120 @@ def _mt_spectrum_remove(x, sfreq, line_freqs, notch_widths,
         f_stat = num / den
 
         # find frequencies to remove
-        indices = np.where(f_stat > threshold)[1]
-        rm_freqs = freqs[indices]
+        mask = f_stat > threshold
     else:
         # specify frequencies
         indices_1 = np.unique([np.argmin(np.abs(freqs - lf))
                                for lf in line_freqs])
-        notch_widths /= 2.0
-        indices_2 = [np.logical_and(freqs > lf - nw, freqs < lf + nw)
+        indices_2 = [np.logical_and(freqs > lf - nw / 2., freqs < lf + nw / 2.)
                      for lf, nw in zip(line_freqs, notch_widths)]
         indices_2 = np.where(np.any(np.array(indices_2), axis=0))[0]
-        indices = np.unique(np.r_[indices_1, indices_2])
-        rm_freqs = freqs[indices]
+        mask = np.zeros(len(freqs), bool)
+        mask[np.r_[indices_1, indices_2]] = True
+        mask = np.broadcast_to(mask, A.shape)
+    rm_freqs = [freqs[m] for m in mask]
+
+    # The fitted sinusoids |c| cos(2 pi f t + angle(c)) with c = 2 A are
+    # summed over the removed frequencies, which (as the frequencies are
+    # those of the FFT) is the inverse FFT of the masked amplitudes
+    datafit = np.where(mask, A, 0.) * n_times
+    datafit[:, 0] = datafit[:, 0].real * 2
+    if n_times % 2 == 0:
+        datafit[:, -1] = datafit[:, -1].real * 2
+    datafit = irfft(datafit, n=n_times)
 
-    fits = list()
-    for ind in indices:
-        c = 2 * A[0, ind]
-        fit = np.abs(c) * np.cos(freqs[ind] * rads + np.angle(c))
-        fits.append(fit)
+    return x - datafit, rm_freqs
 
-    if len(fits) == 0:
-        datafit = 0.0
-    else:
-        # fitted sinusoids are summed, and subtracted from data
-        datafit = np.sum(np.atleast_2d(fits), axis=0)
 
-    return x - datafit, rm_freqs
+class _MTSpectrumStream(object):
+    """Remove line noise in sliding windows on demand.
+
+    The sinusoids are fitted (see :func:`_mt_spectrum_remove`) to windows of
+    ``n_window`` samples that overlap by (at least) half, and the cleaned
+    windows are averaged with a squared-sine weighting, so a signal can be
+    processed piece by piece. The windows of the last call are kept, so
+    reading the signal sequentially processes each window only once.
+
+    Parameters
+    ----------
+    n_times : int
+        The number of samples in the whole signal.
+    sfreq : float
+        The sampling frequency.
+    line_freqs : array | None
+        The line frequencies (None to detect them using an F test).
+    notch_widths : array | None
+        The notch widths.
+    mt_bandwidth : float | None
+        The multitaper bandwidth.
+    p_value : float
+        The F-test p-value.
+    n_window : int
+        The window length in samples.
+    n_jobs : int
+        The number of threads to use.
+    """
+
+    def __init__(self, n_times, sfreq, line_freqs, notch_widths,
+                 mt_bandwidth, p_value, n_window, n_jobs=1):  # noqa: D102
+        self.n_window = n_window = min(n_window, n_times)
+        n_step = max(n_window // 2, 1)
+        n_win = -(-max(n_times - n_window, 0) // n_step) + 1
+        self.starts = np.round(np.linspace(
+            0, n_times - n_window, n_win)).astype(int)
+        self.weights = np.sin(np.pi * (np.arange(n_window) + 0.5) /
+                              n_window) ** 2
+        self.window_fun, self.threshold = _get_mt_spectrum_params(
+            n_window, sfreq, mt_bandwidth, p_value)
+        self.sfreq, self.line_freqs = sfreq, line_freqs
+        self.notch_widths, self.n_jobs = notch_widths, n_jobs
+        self._windows = dict()
+
+    def __call__(self, read, start, stop):
+        """Get the cleaned samples ``start:stop``.
+
+        ``read(start, stop)`` must return the signal samples ``start:stop``
+        as an array of shape (n_signals, stop - start).
+        """
+        starts, n_window = self.starts, self.n_window
+        # the windows that overlap the output samples
+        w_start = np.searchsorted(starts + n_window, start, 'right')
+        w_stop = np.searchsorted(starts, stop, 'left')
+        windows = self._get_windows(read, w_start, w_stop)
+        x_clean = np.zeros((len(windows[0]), stop - start))
+        weight = np.zeros(stop - start)
+        for win_start, win in zip(starts[w_start:w_stop], windows):
+            this_start = max(win_start, start)
+            this_stop = min(win_start + n_window, stop)
+            this_weights = self.weights[this_start - win_start:
+                                        this_stop - win_start]
+            x_clean[:, this_start - start:this_stop - start] += \
+                win[:, this_start - win_start:this_stop - win_start] * \
+                this_weights
+            weight[this_start - start:this_stop - start] += this_weights
+        x_clean /= weight
+        return x_clean
+
+    def _get_windows(self, read, w_start, w_stop):
+        """Get the cleaned windows, reusing those of the previous call."""
+        windows = dict((w, self._windows[w]) for w in range(w_start, w_stop)
+                       if w in self._windows)
+        missing = [w for w in range(w_start, w_stop) if w not in windows]
+        if len(missing) > 0:
+            x_start = self.starts[missing[0]]
+            x = read(x_start, self.starts[missing[-1]] + self.n_window)
+            # clean all signals of all missing windows together
+            x = np.concatenate([
+                x[:, self.starts[w] - x_start:
+                  self.starts[w] - x_start + self.n_window]
+                for w in missing])
+            _mt_spectrum_remove(x, self.sfreq, self.line_freqs,
+                                self.notch_widths, self.window_fun,
+                                self.threshold, self.n_jobs)
+            for w, win in zip(missing, np.split(x, len(missing))):
+                windows[w] = win
+        self._windows = windows
+        return [windows[w] for w in range(w_start, w_stop)]
 
 
 def _check_filterable(x, kind='filtered'):
@@ -1334,7 +1955,7 @@ def _check_filterable(x, kind='filtered'):
 
 @verbose
 def resample(x, up=1., down=1., npad=100, axis=-1, window='boxcar', n_jobs=1,
-             pad='reflect_limited', verbose=None):
+             pad='reflect_limited', method='fft', verbose=None):
     """Resample an array.
 
     Operates along the last dimension of the array.
@@ -1356,6 +1977,7 @@ def resample(x, up=1., down=1., npad=100, axis=-1, window='boxcar', n_jobs=1,
         The default is ``'reflect_limited'``.
 
         .. versionadded:: 0.15
+    %(method-resample)s
     %(verbose)s
 
     Returns
@@ -1371,10 +1993,11 @@ def resample(x, up=1., down=1., npad=100, axis=-1, window='boxcar', n_jobs=1,
     important consequences, and the default choices should work well
     for most natural signals.
 
-    Resampling arguments are broken into "up" and "down" components for future
-    compatibility in case we decide to use an upfirdn implementation. The
-    current implementation is functionally equivalent to passing
-    up=up/down and down=1.
+    For ``method='fft'``, the current implementation is functionally
+    equivalent to passing up=up/down and down=1. For
+    ``method='polyphase'``, ``up / down`` must be a ratio of (reasonably
+    small) integers, ``npad`` and ``window`` are not used, and
+    ``n_jobs`` is the number of threads to use.
     """
     from scipy.signal import get_window
     # check explicitly for backwards compatibility
@@ -1385,6 +2008,7 @@ def resample(x, up=1., down=1., npad=100, axis=-1, window='boxcar', n_jobs=1,
                "subsequent window parameter." % repr(axis))
         raise TypeError(err)
 
+    _check_option('method', method, ('fft', 'polyphase'))
     # make sure our arithmetic will work
     x = _check_filterable(x, 'resampled')
     ratio = float(up) / down
@@ -1398,6 +2022,13 @@ def resample(x, up=1., down=1., npad=100, axis=-1, window='boxcar', n_jobs=1,
     if x_len == 0:
         warn('x has zero length along last axis, returning a copy of x')
         return x.copy()
+    if method == 'polyphase':
+        _check_polyphase_unused(npad=(npad, 100), window=(window, 'boxcar'))
+        y = _polyphase_resample(x.reshape((-1, x_len)), up, down, pad, n_jobs)
+        y.shape = orig_shape[:-1] + (y.shape[1],)
+        if axis != orig_last_axis:
+            y = y.swapaxes(axis, orig_last_axis)
+        return y
     bad_msg = 'npad must be "auto" or an integer'
     if isinstance(npad, str):
         if npad != 'auto':
@@ -1461,6 +2092,156 @@ def resample(x, up=1., down=1., npad=100, axis=-1, window='boxcar', n_jobs=1,
     return y
 
 
+def _polyphase_ratio(up, down):
+    """Get the integer up- and downsampling factors for polyphase filters."""
+    from fractions import Fraction
+    ratio = float(up) / down
+    frac = Fraction(ratio).limit_denominator(1000)
+    if frac.numerator > 1000 or \
+            not np.isclose(float(frac), ratio, rtol=1e-12, atol=0):
+        raise ValueError('For method="polyphase", up / down (%s) must be a '
+                         'ratio of integers no larger than 1000' % (ratio,))
+    return frac.numerator, frac.denominator
+
+
+def _check_polyphase_unused(**params):
+    """Warn about parameters (value, default) not used by polyphase."""
+    unused = sorted(key for key, (value, default) in params.items()
+                    if not (isinstance(value, type(default)) and
+                            value == default))
+    if len(unused) > 0:
+        warn('%s %s not used with method="polyphase", and will be ignored'
+             % (', '.join(unused), 'is' if len(unused) == 1 else 'are'))
+
+
+def _polyphase_resample(x, up, down, pad, n_jobs):
+    """Resample the rows of x with a polyphase filter."""
+    up, down = _polyphase_ratio(up, down)
+    stream = _PolyphaseStream(x.shape[1], up, down, pad)
+
+    def _resample_rows(rows):
+        return stream(lambda start, stop: x[rows, start:stop], 0,
+                      stream.n_out)
+
+    n_jobs = check_n_jobs(n_jobs, allow_cuda=True)
+    n_jobs = 1 if n_jobs == 'cuda' else min(n_jobs, len(x))
+    if n_jobs == 1:
+        return _resample_rows(slice(None))
+    with ThreadPoolExecutor(n_jobs) as executor:
+        y = list(executor.map(_resample_rows, np.array_split(
+            np.arange(len(x)), n_jobs)))
+    return np.concatenate(y, axis=0)
+
+
+class _PolyphaseStream(object):
+    """Compute samples of a polyphase resampled signal on demand.
+
+    The anti-aliasing FIR filter is designed as in
+    :func:`scipy.signal.resample_poly` (Kaiser window with beta=5), and
+    applied with :func:`scipy.signal.upfirdn` to all signals at once. The
+    output sample ``m`` is centered on the input sample ``m * down / up``,
+    so any range of output samples can be computed from a (slightly
+    larger) range of input samples, which makes it possible to resample
+    arbitrarily long signals piece by piece.
+
+    Parameters
+    ----------
+    n_times : int
+        The number of samples in the whole signal.
+    up : int
+        Factor to upsample by.
+    down : int
+        Factor to downsample by.
+    pad : str
+        Padding type for ``_smart_pad``.
+    """
+
+    def __init__(self, n_times, up, down, pad):  # noqa: D102
+        from scipy.signal import firwin
+        self.n_times, self.up, self.down, self.pad = n_times, up, down, pad
+        max_rate = max(up, down)
+        if max_rate == 1:
+            self.half_len, self.h = 0, np.ones(1)
+        else:
+            self.half_len = 10 * max_rate
+            self.h = firwin(2 * self.half_len + 1, 1. / max_rate,
+                            window=('kaiser', 5.0)) * up
+        self.n_pad = -(-self.half_len // up) + 1
+        self.n_out = int(round(n_times * up / float(down)))
+
+    def input_range(self, start, stop):
+        """Get the (padded) input samples needed for output start:stop."""
+        i_start = -((self.half_len - start * self.down) // self.up)
+        i_stop = ((stop - 1) * self.down + self.half_len) // self.up + 1
+        return i_start, i_stop
+
+    def __call__(self, read, start, stop):
+        """Get the resampled samples ``start:stop``.
+
+        ``read(start, stop)`` must return the original signal samples
+        ``start:stop`` as an array of shape (n_signals, stop - start).
+        """
+        from scipy.signal import upfirdn
+        i_start, i_stop = self.input_range(start, stop)
+        x = self._read_padded(read, i_start, i_stop)
+        # delay the filter so that output samples fall on the grid of
+        # upfirdn, which starts at input sample i_start
+        offset = start * self.down + self.half_len - i_start * self.up
+        n_zero = -offset % self.down
+        h = np.concatenate([np.zeros(n_zero), self.h]) if n_zero else self.h
+        first = (offset + n_zero) // self.down
+        y = upfirdn(h, x, self.up, self.down, axis=-1)
+        assert y.shape[-1] >= first + stop - start
+        return y[:, first:first + stop - start]
+
+    def _read_padded(self, read, start, stop):
+        """Read the samples start:stop of the edge-padded signal."""
+        n_times, n_pad = self.n_times, self.n_pad
+        x = list()
+        if start < 0:
+            n_read = min(n_pad + 1, n_times)
+            left = _smart_pad(read(0, n_read), (n_pad, 0), self.pad)
+            x.append(left[:, n_pad + start:n_pad + min(stop, 0)])
+        if max(start, 0) < min(stop, n_times):
+            x.append(read(max(start, 0), min(stop, n_times)))
+        if stop > n_times:
+            n_read = min(n_pad + 1, n_times)
+            right = _smart_pad(read(n_times - n_read, n_times), (0, n_pad),
+                               self.pad)[:, n_read:]
+            x.append(right[:, max(start - n_times, 0):stop - n_times])
+        return np.concatenate(x, axis=-1)
+
+
+def _stim_windows(n_samples, up, down, start=0, stop=None):
+    """Get the input windows of stim channel output samples start:stop."""
+    ratio = float(up) / down
+    n_out = int(round(n_samples * ratio))
+    stop = n_out if stop is None else stop
+    picks = np.minimum((np.arange(start, stop + 1) / ratio).astype(int),
+                       n_samples - 1)
+    if stop == n_out:
+        picks[-1] = n_samples
+    return picks[:-1], picks[1:]
+
+
+def _stim_first_nonzero(stim_data, win_starts, win_stops):
+    """Get the first non-zero value (or the first value) in each window.
+
+    ``stim_data`` holds the input samples from ``win_starts[0]`` to
+    ``max(win_stops[-1], win_starts[-1] + 1)`` (windows can be empty).
+    """
+    offset = win_starts[0]
+    n_samples = stim_data.shape[1]
+    # index of the next non-zero sample at or after each sample
+    next_nonzero = np.where(stim_data != 0, np.arange(n_samples), n_samples)
+    next_nonzero = np.minimum.accumulate(next_nonzero[:, ::-1], axis=1)
+    next_nonzero = next_nonzero[:, ::-1]
+    starts = win_starts - offset
+    nonzero = next_nonzero[:, starts]
+    use = np.where(nonzero < win_stops - offset, nonzero, starts)
+    return np.take_along_axis(stim_data, use, axis=1)
+
+
 def _resample_stim_channels(stim_data, up, down):
     """Resample stim channels, carefully.
 
@@ -1488,31 +2269,14 @@ def _resample_stim_channels(stim_data, up, down):
 
     ratio = float(up) / down
     resampled_n_samples = int(round(n_samples * ratio))
+    if resampled_n_samples == 0:
+        return np.zeros((n_stim_channels, 0))
 
-    stim_resampled = np.zeros((n_stim_channels, resampled_n_samples))
-
-    # Figure out which points in old data to subsample protect against
-    # out-of-bounds, which can happen (having one sample more than
-    # expected) due to padding
-    sample_picks = np.minimum(
-        (np.arange(resampled_n_samples) / ratio).astype(int),
-        n_samples - 1
-    )
-
-    # Create windows starting from sample_picks[i], ending at sample_picks[i+1]
-    windows = zip(sample_picks, np.r_[sample_picks[1:], n_samples])
-
-    # Use the first non-zero value in each window
-    for window_i, window in enumerate(windows):
-        for stim_num, stim in enumerate(stim_data):
-            nonzero = stim[window[0]:window[1]].nonzero()[0]
-            if len(nonzero) > 0:
-                val = stim[window[0] + nonzero[0]]
-            else:
-                val = stim[window[0]]
-            stim_resampled[stim_num, window_i] = val
-
-    return stim_resampled
+    # Windows start at the subsampled points and end at the next one (which
+    # can be the same when upsampling); use the first non-zero value in each
+    win_starts, win_stops = _stim_windows(n_samples, up, down)
+    return _stim_first_nonzero(stim_data, win_starts,
+                               win_stops).astype(np.float64)
 
 
 def detrend(x, order=1, axis=-1):
@@ -1843,7 +2607,7 @@ class FilterMixin(object):
                method='fir', iir_params=None, phase='zero',
                fir_window='hamming', fir_design='firwin',
                skip_by_annotation=('edge', 'bad_acq_skip'), pad='edge',
-               verbose=None):
+               fname=None, overwrite=False, verbose=None):
         """Filter a subset of channels.
 
         Parameters
@@ -1872,12 +2636,32 @@ class FilterMixin(object):
 
             .. versionadded:: 0.16.
         %(pad-fir)s
+        fname : str | None
+            If not None, the filtered data are written to this FIF file
+            instead of being modified inplace, and the data do not need to
+            be loaded: they are read, filtered, and written a buffer at a
+            time, so memory usage does not grow with the recording length.
+            The output is the same as when filtering preloaded data. For
+            ``method='iir'``, the reverse pass of each buffer is started
+            after the number of samples it takes the slowest pole of the
+            filter to decay by a factor of ``1e10``, so the output matches
+            up to this relative tolerance. Only used if ``inst`` is raw.
+
+            .. versionadded:: 0.20
+        overwrite : bool
+            If True, overwrite ``fname`` if it already exists.
+            Only used if ``fname`` is not None.
+
+            .. versionadded:: 0.20
         %(verbose_meth)s
 
         Returns
         -------
         inst : instance of Epochs, Evoked, or Raw
-            The filtered data.
+            The filtered data. If ``fname`` is None, this is the instance
+            itself, modified inplace. If ``fname`` is not None, this is a
+            **new** raw instance (not preloaded) that reads the filtered data
+            from ``fname``, and the original instance is left unchanged.
 
         See Also
         --------
@@ -1893,10 +2677,10 @@ class FilterMixin(object):
         -----
         Applies a zero-phase low-pass, high-pass, band-pass, or band-stop
         filter to the channels selected by ``picks``.
-        The data are modified inplace.
+        The data are modified inplace, unless ``fname`` is given.
 
         The object has to have the data loaded e.g. with ``preload=True``
-        or ``self.load_data()``.
+        or ``self.load_data()``, unless ``fname`` is given.
 
         ``l_freq`` and ``h_freq`` are the frequencies below which and above
         which, respectively, to filter out of the data. Thus the uses are:
@@ -1920,7 +2704,11 @@ class FilterMixin(object):
         .. versionadded:: 0.15
         """
         from .io.base import BaseRaw
-        _check_preload(self, 'inst.filter')
+        if fname is None:
+            _check_preload(self, 'inst.filter')
+        elif not isinstance(self, BaseRaw):
+            raise TypeError('fname can only be used when filtering raw data, '
+                            'got %s' % (type(self).__name__,))
         if pad is None and method != 'iir':
             pad = 'edge'
         update_info, picks = _filt_check_picks(self.info, picks,
@@ -1933,6 +2721,12 @@ class FilterMixin(object):
                         % (len(onsets), _pl(onsets)))
         else:
             onsets, ends = np.array([0]), np.array([self._data.shape[1]])
+        if fname is not None:
+            return _filter_raw_to_file(
+                self, fname, overwrite, onsets, ends, update_info, l_freq,
+                h_freq, picks, filter_length, l_trans_bandwidth,
+                h_trans_bandwidth, method, iir_params, phase, fir_window,
+                fir_design, pad, verbose)
         max_idx = (ends - onsets).argmax()
         for si, (start, stop) in enumerate(zip(onsets, ends)):
             # Only output filter params once (for info level), and only warn
@@ -9,6 +9,7 @@
 #
 # License: BSD (3-clause)
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from datetime import timedelta
 import os
@@ -17,7 +18,8 @@ import os.path as op
 import numpy as np
 
 from .constants import FIFF
-from .utils import _construct_bids_filename, _check_orig_units
+from .utils import (_construct_bids_filename, _check_orig_units,
+                    _mult_cal_one)
 from .pick import (pick_types, pick_channels, pick_info, _picks_to_idx)
 from .meas_info import write_meas_info
 from .proj import setup_proj, activate_proj, _proj_equal, ProjMixin
@@ -25,15 +27,17 @@ from ..channels.channels import (ContainsMixin, UpdateChannelsMixin,
                                  SetChannelsMixin, InterpolationMixin)
 from .compensator import set_current_comp, make_compensator
 from .write import (start_file, end_file, start_block, end_block,
-                    write_dau_pack16, write_float, write_double,
-                    write_complex64, write_complex128, write_int,
-                    write_id, write_string, _get_split_size)
+                    write_int, write_id, write_string, _get_split_size,
+                    check_fiff_length)
 
 from ..annotations import (_annotations_starts_stops, _write_annotations,
                            _handle_meas_date)
 from ..filter import (FilterMixin, notch_filter, resample,
-                      _resample_stim_channels, _check_fun)
-from ..parallel import parallel_func
+                      _resample_stim_channels, _check_fun, _polyphase_ratio,
+                      _check_polyphase_unused, _PolyphaseStream,
+                      _stim_windows, _stim_first_nonzero,
+                      _notch_filter_raw_to_file)
+from ..parallel import parallel_func, check_n_jobs
 from ..utils import (_check_fname, _check_pandas_installed, sizeof_fmt,
                      _check_pandas_index_arguments, fill_doc, copy_doc,
                      check_fname, _get_stim_channel, _stamp_to_dt,
@@ -296,7 +300,7 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
         return self._dtype_
 
     def _read_segment(self, start=0, stop=None, sel=None, data_buffer=None,
-                      projector=None, verbose=None):
+                      projector=None, n_jobs=1, verbose=None):
         """Read a chunk of raw data.
 
         Parameters
@@ -315,6 +319,9 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
             to store the data.
         projector : array
             SSP operator to apply to the data.
+        n_jobs : int
+            Number of threads to use to read from the files that make up
+            the requested segment (e.g., split files) concurrently.
         %(verbose_meth)s
 
         Returns
@@ -368,8 +375,9 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
             mult = None
         cals = cals.T[idx]
 
-        # read from necessary files
+        # figure out what to read from the necessary files
         offset = 0
+        reads = list()
         for fi in np.nonzero(files_used)[0]:
             start_file = self._first_samps[fi]
             # first iteration (only) could start in the middle somewhere
@@ -381,10 +389,22 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
                 raise ValueError('Bad array indexing, could be a bug')
             n_read = stop_file - start_file
             this_sl = slice(offset, offset + n_read)
-            self._read_segment_file(data[:, this_sl], idx, fi,
-                                    int(start_file), int(stop_file),
-                                    cals, mult)
+            reads.append((data[:, this_sl], idx, fi, int(start_file),
+                          int(stop_file), cals, mult))
             offset += n_read
+
+        # and read them, each file into its own part of the output
+        n_jobs = min(check_n_jobs(n_jobs), len(reads))
+        if n_jobs > 1:
+            logger.info('    Reading %d files using %d threads'
+                        % (len(reads), n_jobs))
+            with ThreadPoolExecutor(n_jobs) as executor:
+                for future in [executor.submit(self._read_segment_file, *read)
+                               for read in reads]:
+                    future.result()  # re-raise any errors
+        else:
+            for read in reads:
+                self._read_segment_file(*read)
         return data
 
     def _read_segment_file(self, data, idx, fi, start, stop, cals, mult):
@@ -453,11 +473,17 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
         return self[picks, start:stop][0]
 
     @verbose
-    def load_data(self, verbose=None):
+    def load_data(self, n_jobs=1, verbose=None):
         """Load raw data.
 
         Parameters
         ----------
+        n_jobs : int
+            Number of threads to use to read the files that make up the data
+            (e.g., split or concatenated files) concurrently (default 1).
+            This can speed up loading from high-latency storage.
+
+            .. versionadded:: 0.20
         %(verbose_meth)s
 
         Returns
@@ -473,18 +499,19 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
         .. versionadded:: 0.10.0
         """
         if not self.preload:
-            self._preload_data(True)
+            self._preload_data(True, n_jobs=n_jobs)
         return self
 
     @verbose
-    def _preload_data(self, preload, verbose=None):
+    def _preload_data(self, preload, n_jobs=1, verbose=None):
         """Actually preload the data."""
         data_buffer = preload
         if isinstance(preload, (bool, np.bool_)) and not preload:
             data_buffer = None
         logger.info('Reading %d ... %d  =  %9.3f ... %9.3f secs...' %
                     (0, len(self.times) - 1, 0., self.times[-1]))
-        self._data = self._read_segment(data_buffer=data_buffer)
+        self._data = self._read_segment(data_buffer=data_buffer,
+                                        n_jobs=n_jobs)
         assert len(self._data) == self.info['nchan']
         self.preload = True
         self._comp = None  # no longer needed
@@ -834,6 +861,95 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
             return data, times
         return data
 
+    @verbose
+    def iter_chunks(self, duration, overlap=0., picks=None,
+                    reject_by_annotation=True, prefetch=True, verbose=None):
+        """Iterate over the data in fixed-length chunks.
+
+        This gives bounded-memory access to (non-preloaded) data: the chunks
+        are read into a pair of buffers that are reused across iterations,
+        and with ``prefetch=True`` the next chunk is read on a background
+        thread while the current one is being processed.
+
+        Parameters
+        ----------
+        duration : float
+            Duration of each chunk in seconds.
+        overlap : float
+            Overlap between consecutive chunks in seconds. Must be smaller
+            than ``duration``. Defaults to 0.
+        %(picks_all)s
+        reject_by_annotation : bool
+            If True (default), chunks that overlap segments annotated with a
+            description starting with 'bad' are skipped.
+        prefetch : bool
+            If True (default), read the next chunk in a background thread.
+        %(verbose_meth)s
+
+        Yields
+        ------
+        start : int
+            The first sample of the chunk (an index into ``raw.times``).
+        data : ndarray, shape (n_channels, n_times)
+            The data. This is a view of a buffer that is overwritten by later
+            iterations, so it must be copied if it is to be kept.
+
+        Notes
+        -----
+        Samples at the end of the data that do not fill a whole chunk are
+        not returned.
+
+        .. versionadded:: 0.20
+        """
+        picks = _picks_to_idx(self.info, picks, 'all', exclude=())
+        sfreq = self.info['sfreq']
+        n_chunk = int(round(float(duration) * sfreq))
+        n_overlap = int(round(float(overlap) * sfreq))
+        if not 0 < n_chunk <= self.n_times:
+            raise ValueError('duration must give between 1 and %d samples, '
+                             'got %d' % (self.n_times, n_chunk))
+        if not 0 <= n_overlap < n_chunk:
+            raise ValueError('overlap must give a non-negative number of '
+                             'samples smaller than duration (%d), got %d'
+                             % (n_chunk, n_overlap))
+        starts = np.arange(0, self.n_times - n_chunk + 1, n_chunk - n_overlap)
+        if reject_by_annotation:
+            onsets, ends = _annotations_starts_stops(self, ['BAD'])
+            good = np.ones(len(starts), bool)
+            for onset, end in zip(onsets, ends):
+                good &= (starts >= end) | (starts + n_chunk <= onset)
+            logger.info('Skipping %d of %d chunks overlapping bad segments'
+                        % ((~good).sum(), len(good)))
+            starts = starts[good]
+        if len(starts) == 0:
+            return
+        dtype = self._data.dtype if self.preload else self._dtype
+        buffers = np.empty((2 if prefetch else 1, len(picks), n_chunk), dtype)
+
+        def _read_chunk(start, out):
+            if self.preload:
+                np.take(self._data[:, start:start + n_chunk], picks, axis=0,
+                        out=out)
+            else:
+                self._read_segment(start, start + n_chunk, sel=picks,
+                                   data_buffer=out, projector=self._projector,
+                                   verbose=False)
+
+        if not prefetch:
+            for start in starts:
+                _read_chunk(start, buffers[0])
+                yield start, buffers[0]
+            return
+        with ThreadPoolExecutor(1) as executor:
+            future = executor.submit(_read_chunk, starts[0], buffers[0])
+            for ci, start in enumerate(starts):
+                future.result()
+                # the consumer is done with the other buffer by now
+                if ci + 1 < len(starts):
+                    future = executor.submit(_read_chunk, starts[ci + 1],
+                                             buffers[(ci + 1) % 2])
+                yield start, buffers[ci % 2]
+
     @verbose
     def apply_function(self, fun, picks=None, dtype=None, n_jobs=1,
                        channel_wise=True, *args, **kwargs):
@@ -926,18 +1042,21 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
                method='fir', iir_params=None, phase='zero',
                fir_window='hamming', fir_design='firwin',
                skip_by_annotation=('edge', 'bad_acq_skip'),
-               pad='reflect_limited', verbose=None):  # noqa: D102
+               pad='reflect_limited', fname=None, overwrite=False,
+               verbose=None):  # noqa: D102
         return super().filter(
             l_freq, h_freq, picks, filter_length, l_trans_bandwidth,
             h_trans_bandwidth, n_jobs, method, iir_params, phase,
-            fir_window, fir_design, skip_by_annotation, pad, verbose)
+            fir_window, fir_design, skip_by_annotation, pad, fname,
+            overwrite, verbose)
 
     @verbose
     def notch_filter(self, freqs, picks=None, filter_length='auto',
                      notch_widths=None, trans_bandwidth=1.0, n_jobs=1,
                      method='fir', iir_params=None, mt_bandwidth=None,
                      p_value=0.05, phase='zero', fir_window='hamming',
-                     fir_design='firwin', pad='reflect_limited', verbose=None):
+                     fir_design='firwin', pad='reflect_limited', fname=None,
+                     overwrite=False, verbose=None):
         """Notch filter a subset of channels.
 
         Parameters
@@ -948,7 +1067,7 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
             Europe. None can only be used with the mode 'spectrum_fit',
             where an F test is used to find sinusoidal components.
         %(picks_all_data)s
-        %(filter_length)s
+        %(filter_length-notch)s
         notch_widths : float | array of float | None
             Width of each stop band (centred at each freq in freqs) in Hz.
             If None, freqs / 200 is used.
@@ -973,12 +1092,29 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
             The default is ``'reflect_limited'``.
 
             .. versionadded:: 0.15
+        fname : str | None
+            If not None, the filtered data are written to this FIF file
+            instead of being modified inplace, and the data do not need to
+            be loaded: they are read, filtered, and written a buffer at a
+            time. With ``method='spectrum_fit'``, the sinusoids are then
+            fitted in sliding windows (see ``filter_length``).
+
+            .. versionadded:: 0.20
+        overwrite : bool
+            If True, overwrite ``fname`` if it already exists.
+            Only used if ``fname`` is not None.
+
+            .. versionadded:: 0.20
         %(verbose_meth)s
 
         Returns
         -------
         raw : instance of Raw
-            The raw instance with filtered data.
+            The raw instance with filtered data. If ``fname`` is None, this is
+            the instance itself, modified inplace. If ``fname`` is not None,
+            this is a **new** raw instance (not preloaded) that reads the
+            filtered data from ``fname``, and the original instance is left
+            unchanged.
 
         See Also
         --------
@@ -991,7 +1127,7 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
         "picks". By default the data of the Raw object is modified inplace.
 
         The Raw object has to have the data loaded e.g. with ``preload=True``
-        or ``self.load_data()``.
+        or ``self.load_data()``, unless ``fname`` is given.
 
         .. note:: If n_jobs > 1, more memory is required as
                   ``len(picks) * n_times`` additional time points need to
@@ -1001,6 +1137,12 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
         """
         fs = float(self.info['sfreq'])
         picks = _picks_to_idx(self.info, picks, exclude=(), none='data_or_ica')
+        if fname is not None:
+            return _notch_filter_raw_to_file(
+                self, fname, overwrite, freqs, picks, filter_length,
+                notch_widths, trans_bandwidth, n_jobs, method, iir_params,
+                mt_bandwidth, p_value, phase, fir_window, fir_design, pad,
+                verbose)
         _check_preload(self, 'raw.notch_filter')
         self._data = notch_filter(
             self._data, fs, freqs, filter_length=filter_length,
@@ -1013,12 +1155,12 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
 
     @verbose
     def resample(self, sfreq, npad='auto', window='boxcar', stim_picks=None,
-                 n_jobs=1, events=None, pad='reflect_limited',
+                 n_jobs=1, events=None, pad='reflect_limited', method='fft',
                  verbose=None):  # lgtm
         """Resample all channels.
 
         The Raw object has to have the data loaded e.g. with ``preload=True``
-        or ``self.load_data()``.
+        or ``self.load_data()``, unless ``method='polyphase'``.
 
         .. warning:: The intended purpose of this function is primarily to
                      speed up computations (e.g., projection calculation) when
@@ -1058,6 +1200,10 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
             The default is ``'reflect_limited'``.
 
             .. versionadded:: 0.15
+        %(method-resample)s
+            With "polyphase", the data do not need to be loaded: they are
+            read and resampled a piece at a time, and only the resampled
+            data are kept in memory.
         %(verbose_meth)s
 
         Returns
@@ -1077,7 +1223,13 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
         For some data, it may be more accurate to use ``npad=0`` to reduce
         artifacts. This is dataset dependent -- check your data!
         """
-        _check_preload(self, 'raw.resample')
+        _check_option('method', method, ('fft', 'polyphase'))
+        if method == 'fft':
+            _check_preload(self, 'raw.resample')
+        else:
+            _check_polyphase_unused(npad=(npad, 'auto'),
+                                    window=(window, 'boxcar'),
+                                    n_jobs=(n_jobs, 1))
 
         # When no event object is supplied, some basic detection of dropped
         # events is performed to generate a warning. Finding events can fail
@@ -1105,26 +1257,37 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
         stim_picks = np.asanyarray(stim_picks)
 
         for ri in range(len(self._raw_lengths)):
-            data_chunk = self._data[:, offsets[ri]:offsets[ri + 1]]
-            new_data.append(resample(data_chunk, sfreq, o_sfreq, npad,
-                                     window=window, n_jobs=n_jobs, pad=pad))
-            new_ntimes = new_data[ri].shape[1]
-
-            # In empirical testing, it was faster to resample all channels
-            # (above) and then replace the stim channels than it was to only
-            # resample the proper subset of channels and then use np.insert()
-            # to restore the stims.
-            if len(stim_picks) > 0:
-                stim_resampled = _resample_stim_channels(
-                    data_chunk[stim_picks], new_data[ri].shape[1],
-                    data_chunk.shape[1])
-                new_data[ri][stim_picks] = stim_resampled
+            if method == 'polyphase':
+                new_data.append(_polyphase_resample_raw(
+                    self, offsets[ri], offsets[ri + 1], sfreq, o_sfreq,
+                    stim_picks, pad))
+                new_ntimes = new_data[ri].shape[1]
+            else:
+                data_chunk = self._data[:, offsets[ri]:offsets[ri + 1]]
+                new_data.append(resample(data_chunk, sfreq, o_sfreq, npad,
+                                         window=window, n_jobs=n_jobs,
+                                         pad=pad))
+                new_ntimes = new_data[ri].shape[1]
+
+                # In empirical testing, it was faster to resample all channels
+                # (above) and then replace the stim channels than it was to
+                # only resample the proper subset of channels and then use
+                # np.insert() to restore the stims.
+                if len(stim_picks) > 0:
+                    stim_resampled = _resample_stim_channels(
+                        data_chunk[stim_picks], new_data[ri].shape[1],
+                        data_chunk.shape[1])
+                    new_data[ri][stim_picks] = stim_resampled
 
             self._first_samps[ri] = int(self._first_samps[ri] * ratio)
             self._last_samps[ri] = self._first_samps[ri] + new_ntimes - 1
             self._raw_lengths[ri] = new_ntimes
 
         self._data = np.concatenate(new_data, axis=1)
+        if not self.preload:
+            self.preload = True
+            self._comp = None  # no longer needed
+            self.close()
         self.info['sfreq'] = sfreq
         lowpass = self.info.get('lowpass')
         lowpass = np.inf if lowpass is None else lowpass
@@ -1770,6 +1933,102 @@ class _RawShell(object):
         self._annotations = annotations.copy()
 
 
+class _RawFiltered(BaseRaw):
+    """Lazily filter the data of another raw instance.
+
+    Parameters
+    ----------
+    raw : instance of Raw
+        The raw data to filter. It does not need to be preloaded.
+    info : instance of Info
+        The measurement info of the filtered data.
+    picks : ndarray of int
+        The channels to filter. Other channels are passed through.
+    streams : list of tuple
+        The ``(start, stop, stream)`` of each contiguous segment to filter
+        (in samples relative to the start of ``raw``), where ``stream`` is an
+        instance of :class:`mne.filter._OverlapAddStream` (FIR),
+        :class:`mne.filter._IIRStream` (IIR), or
+        :class:`mne.filter._MTSpectrumStream` (spectrum fit).
+    """
+
+    def __init__(self, raw, info, picks, streams):  # noqa: D102
+        raw = raw.copy()
+        raw_extras = dict(raw=raw, picks=picks, streams=streams)
+        super(_RawFiltered, self).__init__(
+            info, first_samps=[raw.first_samp], last_samps=[raw.last_samp],
+            filenames=raw._filenames[:1], raw_extras=[raw_extras],
+            orig_format=raw.orig_format, buffer_size_sec=raw.buffer_size_sec,
+            verbose=raw.verbose)
+        # the data are returned already calibrated
+        self._cals = np.ones(len(self._cals))
+        self._projector = raw._projector
+        self._annotations = raw.annotations.copy()
+
+    def _read_segment_file(self, data, idx, fi, start, stop, cals, mult):
+        """Read a segment of data, filtering it on the fly."""
+        raw_extras = self._raw_extras[fi]
+        raw, picks = raw_extras['raw'], raw_extras['picks']
+        start, stop = start - raw.first_samp, stop - raw.first_samp
+        one = _read_raw_unprojected(raw, start, stop)
+        for seg_start, seg_stop, stream in raw_extras['streams']:
+            this_start, this_stop = max(start, seg_start), min(stop, seg_stop)
+            if this_start >= this_stop:
+                continue
+
+            def read(read_start, read_stop):
+                return _read_raw_unprojected(raw, seg_start + read_start,
+                                             seg_start + read_stop, picks)
+
+            one[picks, this_start - start:this_stop - start] = stream(
+                read, this_start - seg_start, this_stop - seg_start)
+        _mult_cal_one(data, one, idx, cals, mult)
+
+
+def _read_raw_unprojected(raw, start, stop, picks=None):
+    """Read raw data (without applying any projector)."""
+    if raw.preload:
+        return raw._data[:, start:stop].copy() if picks is None else \
+            raw._data[picks, start:stop]
+    sel = None if picks is None else np.asarray(picks)
+    return raw._read_segment(start, stop, sel=sel)
+
+
+def _polyphase_resample_raw(raw, start, stop, up, down, stim_picks, pad):
+    """Polyphase resample the raw samples start:stop, a piece at a time."""
+    up, down = _polyphase_ratio(up, down)
+    n_times = stop - start
+    stream = _PolyphaseStream(n_times, up, down, pad)
+    out = np.empty((raw.info['nchan'], stream.n_out))
+    # about 10 seconds of input at a time
+    n_per = max(int(10 * raw.info['sfreq']) * up // down, 1)
+    for out_start in range(0, stream.n_out, n_per):
+        out_stop = min(out_start + n_per, stream.n_out)
+        # read everything we need (except for the padded edges) at once
+        read_start, read_stop = stream.input_range(out_start, out_stop)
+        if len(stim_picks) > 0:
+            win_starts, win_stops = _stim_windows(n_times, up, down,
+                                                  out_start, out_stop)
+            read_start = min(read_start, win_starts[0])
+            read_stop = max(read_stop, win_stops[-1], win_starts[-1] + 1)
+        read_start, read_stop = max(read_start, 0), min(read_stop, n_times)
+        data = _read_raw_unprojected(raw, start + read_start,
+                                     start + read_stop)
+
+        def read(this_start, this_stop):
+            if read_start <= this_start and this_stop <= read_stop:
+                return data[:, this_start - read_start:this_stop - read_start]
+            return _read_raw_unprojected(raw, start + this_start,
+                                         start + this_stop)
+
+        out[:, out_start:out_stop] = stream(read, out_start, out_stop)
+        if len(stim_picks) > 0:
+            out[stim_picks, out_start:out_stop] = _stim_first_nonzero(
+                data[stim_picks, win_starts[0] - read_start:], win_starts,
+                win_stops)
+    return out
+
+
 ###############################################################################
 # Writing
 def _write_raw(fname, raw, info, picks, fmt, data_type, reset_range, start,
@@ -1843,70 +2102,79 @@ def _write_raw(fname, raw, info, picks, fmt, data_type, reset_range, start,
                 warn('Acquisition skips detected but did not fit evenly into '
                      'output buffer_size, will be written as zeroes.')
 
+    # a view of preloaded data (rather than a copy) when writing all channels
+    sel = slice(None) if np.array_equal(picks, np.arange(len(raw.ch_names))) \
+        else picks
     n_current_skip = 0
-    for first, last in zip(firsts, lasts):
-        if do_skips:
-            if ((first >= sk_onsets) & (last <= sk_ends)).any():
-                # Track how many we have
-                n_current_skip += 1
-                continue
-            elif n_current_skip > 0:
-                # Write out an empty buffer instead of data
-                write_int(fid, FIFF.FIFF_DATA_SKIP, n_current_skip)
-                # These two NOPs appear to be optional (MaxFilter does not do
-                # it, but some acquisition machines do) so let's not bother.
-                # write_nop(fid)
-                # write_nop(fid)
-                n_current_skip = 0
-        data, times = raw[picks, first:last]
-        assert len(times) == last - first
-
-        if projector is not None:
-            data = np.dot(projector, data)
-
-        if ((drop_small_buffer and (first > start) and
-             (len(times) < buffer_size))):
-            logger.info('Skipping data chunk due to small buffer ... '
-                        '[done]')
-            break
-        logger.debug('Writing ...')
-        _write_raw_buffer(fid, data, cals, fmt)
-
-        pos = fid.tell()
-        this_buff_size_bytes = pos - pos_prev
-        overage = pos - split_size + next_file_buffer
-        if overage > 0:
-            # This should occur on the first buffer write of the file, so
-            # we should mention the space required for the meas info
-            fid.close()
-            raise ValueError(
-                'buffer size (%s) is too large for the given split size (%s) '
-                'by %s bytes after writing info (%s) and leaving enough space '
-                'for end tags (%s): decrease "buffer_size_sec" or increase '
-                '"split_size".' % (this_buff_size_bytes, split_size, overage,
-                                   pos_prev, next_file_buffer))
-
-        # Split files if necessary, leave some space for next file info
-        # make sure we check to make sure we actually *need* another buffer
-        # with the "and" check
-        if pos >= split_size - this_buff_size_bytes - next_file_buffer and \
-                first + buffer_size < stop:
-            next_fname, next_idx = _write_raw(
-                fname, raw, info, picks, fmt,
-                data_type, reset_range, first + buffer_size, stop, buffer_size,
-                projector, drop_small_buffer, split_size, split_naming,
-                part_idx + 1, use_fname, overwrite)
-
-            start_block(fid, FIFF.FIFFB_REF)
-            write_int(fid, FIFF.FIFF_REF_ROLE, FIFF.FIFFV_ROLE_NEXT_FILE)
-            write_string(fid, FIFF.FIFF_REF_FILE_NAME, op.basename(next_fname))
-            if info['meas_id'] is not None:
-                write_id(fid, FIFF.FIFF_REF_FILE_ID, info['meas_id'])
-            write_int(fid, FIFF.FIFF_REF_FILE_NUM, next_idx)
-            end_block(fid, FIFF.FIFFB_REF)
-            break
-
-        pos_prev = pos
+    with _RawBufferWriter(fid, cals, fmt, buffer_size) as writer:
+        for first, last in zip(firsts, lasts):
+            if do_skips:
+                if ((first >= sk_onsets) & (last <= sk_ends)).any():
+                    # Track how many we have
+                    n_current_skip += 1
+                    continue
+                elif n_current_skip > 0:
+                    # Write out an empty buffer instead of data
+                    writer.write_skip(n_current_skip)
+                    # These two NOPs appear to be optional (MaxFilter does
+                    # not do it, but some acquisition machines do) so let's
+                    # not bother.
+                    # write_nop(fid)
+                    # write_nop(fid)
+                    n_current_skip = 0
+            data, _ = raw[sel, first:last]
+            assert data.shape[1] == last - first
+
+            if projector is not None:
+                data = np.dot(projector, data)
+
+            if ((drop_small_buffer and (first > start) and
+                 (data.shape[1] < buffer_size))):
+                logger.info('Skipping data chunk due to small buffer ... '
+                            '[done]')
+                break
+            logger.debug('Writing ...')
+            writer.write(data)
+
+            pos = writer.tell()
+            this_buff_size_bytes = pos - pos_prev
+            overage = pos - split_size + next_file_buffer
+            if overage > 0:
+                # This should occur on the first buffer write of the file, so
+                # we should mention the space required for the meas info
+                writer.flush(wait=True)
+                fid.close()
+                raise ValueError(
+                    'buffer size (%s) is too large for the given split size '
+                    '(%s) by %s bytes after writing info (%s) and leaving '
+                    'enough space for end tags (%s): decrease '
+                    '"buffer_size_sec" or increase "split_size".'
+                    % (this_buff_size_bytes, split_size, overage, pos_prev,
+                       next_file_buffer))
+
+            # Split files if necessary, leave some space for next file info
+            # make sure we check to make sure we actually *need* another
+            # buffer with the "and" check
+            if pos >= split_size - this_buff_size_bytes - next_file_buffer \
+                    and first + buffer_size < stop:
+                writer.flush(wait=True)
+                next_fname, next_idx = _write_raw(
+                    fname, raw, info, picks, fmt,
+                    data_type, reset_range, first + buffer_size, stop,
+                    buffer_size, projector, drop_small_buffer, split_size,
+                    split_naming, part_idx + 1, use_fname, overwrite)
+
+                start_block(fid, FIFF.FIFFB_REF)
+                write_int(fid, FIFF.FIFF_REF_ROLE, FIFF.FIFFV_ROLE_NEXT_FILE)
+                write_string(fid, FIFF.FIFF_REF_FILE_NAME,
+                             op.basename(next_fname))
+                if info['meas_id'] is not None:
+                    write_id(fid, FIFF.FIFF_REF_FILE_ID, info['meas_id'])
+                write_int(fid, FIFF.FIFF_REF_FILE_NUM, next_idx)
+                end_block(fid, FIFF.FIFFB_REF)
+                break
+
+            pos_prev = pos
 
     logger.info('Closing %s [done]' % use_fname)
     if info.get('maxshield', False):
@@ -1990,47 +2258,119 @@ def _start_writing_raw(name, info, sel, data_type,
     return fid, cals
 
 
-def _write_raw_buffer(fid, buf, cals, fmt):
-    """Write raw buffer.
+# (FIFF type, dtype) of the data buffers for each fmt, for real and complex
+_raw_buffer_fmts = dict(
+    short=((FIFF.FIFFT_DAU_PACK16, '>i2'), None),
+    int=((FIFF.FIFFT_INT, '>i4'), None),
+    single=((FIFF.FIFFT_FLOAT, '>f4'), (FIFF.FIFFT_COMPLEX_FLOAT, '>c8')),
+    double=((FIFF.FIFFT_DOUBLE, '>f8'), (FIFF.FIFFT_COMPLEX_DOUBLE, '>c16')),
+)
+
+
+class _RawBufferWriter(object):
+    """Write raw data buffers to a file in large blocks.
+
+    The buffers (tag headers and data) are calibrated and cast straight into
+    a preallocated block of bytes that is written with a single call, on a
+    separate thread so that writing overlaps with reading the next buffers.
+    Two blocks are used in turn, so at most one write is pending at a time.
 
     Parameters
     ----------
     fid : file descriptor
-        an open raw data file.
-    buf : array
-        The buffer to write.
+        An open raw data file.
     cals : array
         Calibration factors.
     fmt : str
         'short', 'int', 'single', or 'double' for 16/32 bit int or 32/64 bit
         float for each item. This will be doubled for complex datatypes. Note
         that short and int formats cannot be used for complex data.
+    buffer_size : int
+        The (maximum) number of samples in each buffer.
+    block_size : int
+        The (approximate) number of bytes to write at once.
     """
-    if buf.shape[0] != len(cals):
-        raise ValueError('buffer and calibration sizes do not match')
-
-    _check_option('fmt', fmt, ['short', 'int', 'single', 'double'])
-
-    if np.isrealobj(buf):
-        if fmt == 'short':
-            write_function = write_dau_pack16
-        elif fmt == 'int':
-            write_function = write_int
-        elif fmt == 'single':
-            write_function = write_float
-        else:
-            write_function = write_double
-    else:
-        if fmt == 'single':
-            write_function = write_complex64
-        elif fmt == 'double':
-            write_function = write_complex128
-        else:
+
+    def __init__(self, fid, cals, fmt, buffer_size,
+                 block_size=2 ** 24):  # noqa: D102
+        _check_option('fmt', fmt, ['short', 'int', 'single', 'double'])
+        self._fid, self._fmt = fid, fmt
+        self._cals = np.ravel(cals)
+        self._buffer_size, self._block_size = buffer_size, block_size
+        self._blocks = None  # allocated once we know the data type
+        self._block_idx = self._n_used = 0
+        self._pos = fid.tell()  # position after all submitted writes
+        self._executor = ThreadPoolExecutor(1)
+        self._future = None
+
+    def __enter__(self):  # noqa: D105
+        return self
+
+    def __exit__(self, exc_type, *args):  # noqa: D105
+        try:
+            if exc_type is None:
+                self.flush(wait=True)
+        finally:
+            self._executor.shutdown()
+
+    def _allocate(self, is_complex):
+        kind = _raw_buffer_fmts[self._fmt][int(is_complex)]
+        if kind is None:
             raise ValueError('only "single" and "double" supported for '
                              'writing complex data')
-
-    buf = buf / np.ravel(cals)[:, None]
-    write_function(fid, FIFF.FIFF_DATA_BUFFER, buf)
+        self._ftype, self._dtype = kind
+        n_bytes = 16 + (len(self._cals) * self._buffer_size *
+                        np.dtype(self._dtype).itemsize)
+        n_bytes *= max(self._block_size // n_bytes, 1)
+        self._blocks = [np.empty(n_bytes, np.uint8) for _ in range(2)]
+
+    def tell(self):
+        """Get the file position (including the pending buffers)."""
+        return self._pos + self._n_used
+
+    def write(self, buf):
+        """Write a raw data buffer."""
+        if buf.shape[0] != len(self._cals):
+            raise ValueError('buffer and calibration sizes do not match')
+        if self._blocks is None:
+            self._allocate(np.iscomplexobj(buf))
+        data_size = buf.size * np.dtype(self._dtype).itemsize
+        if self._n_used + 16 + data_size > len(self._blocks[0]):
+            self.flush()
+        block = self._blocks[self._block_idx][self._n_used:]
+        block[:16].view('>i4')[:] = (FIFF.FIFF_DATA_BUFFER, self._ftype,
+                                     data_size, FIFF.FIFFV_NEXT_SEQ)
+        # calibrate and cast (to time-major order) in one pass
+        out = block[16:16 + data_size].view(self._dtype)
+        np.divide(buf.T, self._cals, out=out.reshape(buf.shape[::-1]),
+                  casting='unsafe')
+        self._n_used += 16 + data_size
+
+    def write_skip(self, n_skip):
+        """Write a data skip (of n_skip buffers)."""
+        self.flush(wait=True)
+        write_int(self._fid, FIFF.FIFF_DATA_SKIP, n_skip)
+        self._pos = self._fid.tell()
+
+    def flush(self, wait=False):
+        """Submit the pending buffers for writing."""
+        if self._n_used > 0:
+            self._wait()
+            self._future = self._executor.submit(
+                self._fid.write,
+                self._blocks[self._block_idx][:self._n_used])
+            self._pos += self._n_used
+            self._block_idx, self._n_used = 1 - self._block_idx, 0
+            if self._pos > 2147483648:  # see write.check_fiff_length
+                self._wait()
+                check_fiff_length(self._fid)
+        if wait:
+            self._wait()
+
+    def _wait(self):
+        if self._future is not None:
+            future, self._future = self._future, None
+            future.result()
 
 
 def _check_raw_compatibility(raw):
@@ -217,12 +217,7 @@ def _read_ch(fid, subtype, samp, dtype_byte, dtype=None):
     # BDF
     if subtype == 'bdf':
         ch_data = np.fromfile(fid, dtype=dtype, count=samp * dtype_byte)
-        ch_data = ch_data.reshape(-1, 3).astype(np.int32)
-        ch_data = ((ch_data[:, 0]) +
-                   (ch_data[:, 1] << 8) +
-                   (ch_data[:, 2] << 16))
-        # 24th bit determines the sign
-        ch_data[ch_data >= (1 << 23)] -= (1 << 24)
+        ch_data = _decode_ch(ch_data, subtype, dtype)
 
     # GDF data and EDF data
     else:
@@ -231,6 +226,23 @@ def _read_ch(fid, subtype, samp, dtype_byte, dtype=None):
     return ch_data
 
 
+def _decode_ch(raw, subtype, dtype):
+    """Decode the samples stored in a (..., n_bytes) uint8 array."""
+    shape = raw.shape[:-1] + (-1,)
+    if subtype == 'bdf':
+        # 24-bit little-endian integers: read each sample as the upper three
+        # bytes of an (unaligned) int32 and let the arithmetic shift extend
+        # the sign
+        n_samp = raw.size // 3
+        buf = np.empty(raw.size + 1, np.uint8)
+        buf[1:].reshape(raw.shape)[...] = raw
+        ch_data = np.ndarray((n_samp,), '<i4', buf, strides=(3,)) >> 8
+        ch_data = ch_data.astype(np.int32, copy=False)
+    else:
+        ch_data = np.ascontiguousarray(raw).view(dtype)
+    return ch_data.reshape(shape)
+
+
 def _read_segment_file(data, idx, fi, start, stop, raw_extras, chs, filenames):
     """Read a chunk of raw data."""
     from scipy.interpolate import interp1d
@@ -261,57 +273,87 @@ def _read_segment_file(data, idx, fi, start, stop, raw_extras, chs, filenames):
         this_sel = np.concatenate([this_sel, tal_idx])
     tal_data = []
 
-    # We could read this one EDF block at a time, which would be this:
+    # Byte offsets of each channel within a data record
     ch_offsets = np.cumsum(np.concatenate([[0], n_samps]), dtype=np.int64)
+    ch_offsets *= dtype_byte
+    record_bytes = int(ch_offsets[-1])
     block_start_idx, r_lims, d_lims = _blk_read_lims(start, stop, buf_len)
-    # But to speed it up, we really need to read multiple blocks at once,
-    # Otherwise we can end up with e.g. 18,181 chunks for a 20 MB file!
-    # Let's do ~10 MB chunks:
-    n_per = max(10 * 1024 * 1024 // (ch_offsets[-1] * dtype_byte), 1)
-    with open(filenames, 'rb', buffering=0) as fid:
-
-        # Extract data
-        start_offset = (data_offset +
-                        block_start_idx * ch_offsets[-1] * dtype_byte)
-        for ai in range(0, len(r_lims), n_per):
-            block_offset = ai * ch_offsets[-1] * dtype_byte
-            n_read = min(len(r_lims) - ai, n_per)
-            fid.seek(start_offset + block_offset, 0)
-            # Read and reshape to (n_chunks_read, ch0_ch1_ch2_ch3...)
-            many_chunk = _read_ch(fid, subtype, ch_offsets[-1] * n_read,
-                                  dtype_byte, dtype).reshape(n_read, -1)
-            for ii, ci in enumerate(this_sel):
-                # This now has size (n_chunks_read, n_samp[ci])
-                ch_data = many_chunk[:, ch_offsets[ci]:ch_offsets[ci + 1]]
-
-                if len(tal_idx) and ci in tal_idx:
-                    tal_data.append(ch_data)
-                    continue
-
-                r_sidx = r_lims[ai][0]
-                r_eidx = (buf_len * (n_read - 1) +
-                          r_lims[ai + n_read - 1][1])
-                d_sidx = d_lims[ai][0]
-                d_eidx = d_lims[ai + n_read - 1][1]
-                if n_samps[ci] != buf_len:
-                    if stim_channel is not None and ci in stim_channel:
-                        # Stim channel will be interpolated
-                        old = np.linspace(0, 1, n_samps[ci] + 1, True)
-                        new = np.linspace(0, 1, buf_len, False)
-                        ch_data = np.append(
-                            ch_data, np.zeros((len(ch_data), 1)), -1)
-                        ch_data = interp1d(old, ch_data,
-                                           kind='zero', axis=-1)(new)
-                    else:
-                        # XXX resampling each chunk isn't great,
-                        # it forces edge artifacts to appear at
-                        # each buffer boundary :(
-                        # it can also be very slow...
-                        ch_data = resample(
-                            ch_data.astype(np.float64), buf_len, n_samps[ci],
-                            npad=0, axis=-1)
-                assert ch_data.shape == (len(ch_data), buf_len)
-                data[ii, d_sidx:d_eidx] = ch_data.ravel()[r_sidx:r_eidx]
+    # Channels sampled at the full rate are gathered and decoded all at once,
+    # the others (and the TAL channels) are handled one by one
+    fast, slow = list(), list()
+    for ii, ci in enumerate(this_sel):
+        if n_samps[ci] == buf_len and not (len(tal_idx) and ci in tal_idx):
+            fast.append(ii)
+        else:
+            slow.append(ii)
+    fast_cols = np.concatenate(
+        [np.arange(ch_offsets[this_sel[ii]], ch_offsets[this_sel[ii] + 1])
+         for ii in fast]) if len(fast) else None
+    # use slices rather than fancy indexing whenever possible
+    if len(fast) and np.array_equal(np.diff(fast_cols), 1):
+        fast_cols = slice(fast_cols[0], fast_cols[-1] + 1)
+    if len(fast) and np.array_equal(np.diff(fast), 1):
+        fast = slice(fast[0], fast[-1] + 1)
+    n_fast = len(np.arange(len(this_sel))[fast])
+    # Map the data records rather than reading them, and process ~10 MB
+    # of records at a time
+    n_records = (os.path.getsize(filenames) - data_offset) // record_bytes
+    records = np.memmap(filenames, np.uint8, mode='r', offset=data_offset,
+                        shape=(n_records, record_bytes))
+    n_per = max(10 * 1024 * 1024 // record_bytes, 1)
+    for ai in range(0, len(r_lims), n_per):
+        n_read = min(len(r_lims) - ai, n_per)
+        # This has size (n_chunks_read, ch0_ch1_ch2_ch3...) in bytes
+        first = block_start_idx + ai
+        many_chunk = records[first:first + n_read]
+        r_sidx = r_lims[ai][0]
+        r_eidx = buf_len * (n_read - 1) + r_lims[ai + n_read - 1][1]
+        d_sidx = d_lims[ai][0]
+        d_eidx = d_lims[ai + n_read - 1][1]
+        if n_fast:
+            ch_data = _decode_ch(many_chunk[:, fast_cols], subtype, dtype)
+            ch_data = ch_data.reshape(n_read, n_fast, buf_len)
+            ch_data = ch_data.transpose(1, 0, 2)
+            if isinstance(fast, slice) and r_sidx == 0 and \
+                    r_eidx == n_read * buf_len:
+                # whole records, write them straight into the output
+                # (setting the shape raises rather than silently copying)
+                out = data[fast, d_sidx:d_eidx]
+                out.shape = ch_data.shape
+                out[:] = ch_data
+            else:
+                ch_data = ch_data.reshape(n_fast, -1)
+                data[fast, d_sidx:d_eidx] = ch_data[:, r_sidx:r_eidx]
+        for ii in slow:
+            ci = this_sel[ii]
+            # This now has size (n_chunks_read, n_samp[ci])
+            ch_data = _decode_ch(
+                many_chunk[:, ch_offsets[ci]:ch_offsets[ci + 1]],
+                subtype, dtype)
+
+            if len(tal_idx) and ci in tal_idx:
+                tal_data.append(ch_data)
+                continue
+
+            if stim_channel is not None and ci in stim_channel:
+                # Stim channel will be interpolated
+                old = np.linspace(0, 1, n_samps[ci] + 1, True)
+                new = np.linspace(0, 1, buf_len, False)
+                ch_data = np.append(
+                    ch_data, np.zeros((len(ch_data), 1)), -1)
+                ch_data = interp1d(old, ch_data,
+                                   kind='zero', axis=-1)(new)
+            else:
+                # XXX resampling each chunk isn't great,
+                # it forces edge artifacts to appear at
+                # each buffer boundary :(
+                # it can also be very slow...
+                ch_data = resample(
+                    ch_data.astype(np.float64), buf_len, n_samps[ci],
+                    npad=0, axis=-1)
+            assert ch_data.shape == (len(ch_data), buf_len)
+            data[ii, d_sidx:d_eidx] = ch_data.ravel()[r_sidx:r_eidx]
+    del records
 
     # only try to read the stim channel if it's not None and it's
     # actually one of the requested channels
@@ -25,7 +25,7 @@ from mne.io import read_raw_edf, read_raw_bdf
 from mne.io.tests.test_raw import _test_raw_reader
 from mne.io.edf.edf import _get_edf_default_event_id
 from mne.io.edf.edf import _read_annotations_edf
-from mne.io.edf.edf import _read_ch
+from mne.io.edf.edf import _read_ch, _decode_ch
 from mne.io.edf.edf import _parse_prefilter_string
 from mne.io.pick import channel_indices_by_type
 from mne.annotations import events_from_annotations, read_annotations
@@ -98,6 +98,18 @@ def test_bdf_data():
     assert (raw_py.info['chs'][63]['loc']).any()
 
 
+def test_decode_ch():
+    """Test decoding of packed EDF/BDF samples."""
+    vals = np.array([0, 1, -1, 2 ** 23 - 1, -2 ** 23, 12345, -54321])
+    raw = vals.astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3]
+    raw = np.tile(raw.ravel(), (2, 1))
+    assert_array_equal(_decode_ch(raw, 'bdf', np.uint8), [vals, vals])
+    assert _decode_ch(raw, 'bdf', np.uint8).dtype == np.int32
+    vals = vals[np.abs(vals) < 2 ** 15]
+    raw = vals.astype(np.int16).view(np.uint8)
+    assert_array_equal(_decode_ch(raw, 'edf', np.int16), vals)
+
+
 @testing.requires_testing_data
 def test_bdf_crop_save_stim_channel(tmpdir):
     """Test EDF with various sampling rates."""
@@ -208,23 +208,11 @@ class Raw(BaseRaw):
                     nskip = int(tag.data)
                 elif ent.kind == FIFF.FIFF_DATA_BUFFER:
                     #   Figure out the number of samples in this buffer
-                    if ent.type == FIFF.FIFFT_DAU_PACK16:
-                        nsamp = ent.size // (2 * nchan)
-                    elif ent.type == FIFF.FIFFT_SHORT:
-                        nsamp = ent.size // (2 * nchan)
-                    elif ent.type == FIFF.FIFFT_FLOAT:
-                        nsamp = ent.size // (4 * nchan)
-                    elif ent.type == FIFF.FIFFT_DOUBLE:
-                        nsamp = ent.size // (8 * nchan)
-                    elif ent.type == FIFF.FIFFT_INT:
-                        nsamp = ent.size // (4 * nchan)
-                    elif ent.type == FIFF.FIFFT_COMPLEX_FLOAT:
-                        nsamp = ent.size // (8 * nchan)
-                    elif ent.type == FIFF.FIFFT_COMPLEX_DOUBLE:
-                        nsamp = ent.size // (16 * nchan)
-                    else:
+                    if ent.type not in _buffer_dtypes:
                         raise ValueError('Cannot handle data buffers of type '
                                          '%d' % ent.type)
+                    nsamp = ent.size // (
+                        np.dtype(_buffer_dtypes[ent.type]).itemsize * nchan)
                     if orig_format is None:
                         if ent.type == FIFF.FIFFT_DAU_PACK16:
                             orig_format = 'short'
@@ -320,7 +308,9 @@ class Raw(BaseRaw):
         """Read a segment of data from a file."""
         stop -= 1
         offset = 0
-        with _fiff_get_fid(self._filenames[fi]) as fid:
+        fname = self._filenames[fi]
+        with _BufferReader(fname, self._raw_extras[fi],
+                           start, stop) as read_buffer:
             for this in self._raw_extras[fi]:
                 #  Do we need this buffer
                 if this['last'] >= start:
@@ -352,11 +342,8 @@ class Raw(BaseRaw):
                     if picksamp > 0:
                         # only read data if it exists
                         if this['ent'] is not None:
-                            one = read_tag(fid, this['ent'].pos,
-                                           shape=(this['nsamp'],
-                                                  self.info['nchan']),
-                                           rlims=(first_pick, last_pick)).data
-                            one.shape = (picksamp, self.info['nchan'])
+                            one = read_buffer(this, self.info['nchan'],
+                                              first_pick, last_pick)
                             _mult_cal_one(data[:, offset:(offset + picksamp)],
                                           one.T, idx, cals, mult)
                         offset += picksamp
@@ -417,6 +404,68 @@ def _get_fname_rep(fname):
         return 'File-like %r' % (fname,)
 
 
+# On-disk (big-endian) dtypes of the data buffers
+_buffer_dtypes = {
+    FIFF.FIFFT_DAU_PACK16: '>i2',
+    FIFF.FIFFT_SHORT: '>i2',
+    FIFF.FIFFT_FLOAT: '>f4',
+    FIFF.FIFFT_DOUBLE: '>f8',
+    FIFF.FIFFT_INT: '>i4',
+    FIFF.FIFFT_COMPLEX_FLOAT: '>c8',
+    FIFF.FIFFT_COMPLEX_DOUBLE: '>c16',
+}
+
+
+class _BufferReader(object):
+    """Read (partial) data buffers from a FIF file.
+
+    Uncompressed files on disk are memory-mapped over the span of buffers
+    needed for ``start:stop`` (inclusive), so that each buffer is a view
+    into the file that is only copied when it is calibrated. Compressed
+    files and file-like objects fall back to :func:`read_tag`.
+    """
+
+    def __init__(self, fname, raw_extra, start, stop):  # noqa: D102
+        self.fname = fname
+        self._fid = self._mmap = None
+        ents = [this['ent'] for this in raw_extra
+                if this['ent'] is not None and this['last'] >= start and
+                this['first'] <= stop]
+        if len(ents) == 0:
+            return
+        if _file_like(fname) or op.splitext(fname)[1].lower() == '.gz':
+            self._fid = _fiff_get_fid(fname)
+        else:
+            # the tag header is 16 bytes, the data follows directly
+            self._mmap_start = ents[0].pos + 16
+            mmap_stop = ents[-1].pos + 16 + ents[-1].size
+            self._mmap = np.memmap(fname, np.uint8, mode='r',
+                                   offset=self._mmap_start,
+                                   shape=(mmap_stop - self._mmap_start,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        if self._fid is not None:
+            self._fid.close()
+        self._mmap = None  # closes the map once the views are gone
+
+    def __call__(self, this, nchan, first_pick, last_pick):
+        """Read samples ``first_pick:last_pick`` of a buffer."""
+        ent = this['ent']
+        if self._mmap is None:
+            return read_tag(self._fid, ent.pos, shape=(this['nsamp'], nchan),
+                            rlims=(first_pick, last_pick)).data.reshape(
+                                last_pick - first_pick, nchan)
+        dtype = np.dtype(_buffer_dtypes[ent.type])
+        row_size = dtype.itemsize * nchan
+        pos = ent.pos + 16 - self._mmap_start + first_pick * row_size
+        n_bytes = (last_pick - first_pick) * row_size
+        return self._mmap[pos:pos + n_bytes].view(dtype).reshape(
+            last_pick - first_pick, nchan)
+
+
 def _check_entry(first, nent):
     """Sanity check entries."""
     if first >= nent:
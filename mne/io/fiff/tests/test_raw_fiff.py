@@ -648,6 +648,28 @@ def test_io_complex(tmpdir):
         assert_allclose(raw2_data[:, :n_samp], raw_cp._data[picks, :n_samp])
 
 
+@pytest.mark.filterwarnings('ignore:Saving .* complex data.')
+@pytest.mark.parametrize('fmt, dtype', [
+    ('short', np.float64), ('int', np.float64), ('single', np.float64),
+    ('double', np.float64), ('single', np.complex128),
+    ('double', np.complex128)])
+def test_write_raw_fmts(fmt, dtype, tmpdir):
+    """Test writing raw buffers in all formats."""
+    rng = np.random.RandomState(0)
+    info = create_info(['a', 'b', 'c'], 1000., 'misc')
+    data = np.round(rng.randn(3, 10000) * 1000).astype(dtype)
+    if dtype == np.complex128:
+        data += 1j * rng.randn(*data.shape)
+    raw = RawArray(data, info)
+    fname = tmpdir.join('test_raw.fif')
+    raw.save(fname, fmt=fmt, buffer_size_sec=0.3, tmax=9.7)
+    want = data[:, :9701]
+    if fmt == 'single':
+        want = want.astype(np.complex64 if dtype == np.complex128 else
+                           np.float32)
+    assert_array_equal(read_raw_fif(fname).get_data(), want)
+
+
 @testing.requires_testing_data
 def test_getitem():
     """Test getitem/indexing of Raw."""
@@ -1522,6 +1544,77 @@ def test_memmap(tmpdir):
     # require them.
 
 
+@pytest.mark.parametrize('fmt', ('short', 'int', 'single', 'double'))
+@pytest.mark.parametrize('ext', ('raw.fif', 'raw.fif.gz'))
+def test_memmap_reading(fmt, ext, tmpdir):
+    """Test memory-mapped reading of partial buffers."""
+    rng = np.random.RandomState(0)
+    info = create_info(['a', 'b', 'c', 'STI'], 1000.,
+                       ['eeg', 'eeg', 'misc', 'stim'])
+    data = rng.randint(-1000, 1000, (4, 5000)).astype(float)  # exact
+    fname = tmpdir.join('test_' + ext)
+    RawArray(data, info).save(fname, fmt=fmt, buffer_size_sec=0.3)
+    raw_pre = read_raw_fif(fname, preload=True)
+    raw = read_raw_fif(fname)
+    assert len(raw._raw_extras[0]) == 17
+    assert_array_equal(raw_pre.get_data(), data)
+    for start, stop in ((0, 5000), (0, 1), (299, 301), (1234, 4321),
+                        (4999, 5000)):
+        assert_array_equal(raw.get_data(start=start, stop=stop),
+                           raw_pre._data[:, start:stop])
+    assert_array_equal(raw[[0, 3], 17:601][0], raw_pre._data[[0, 3], 17:601])
+
+
+def test_load_data_threads(tmpdir):
+    """Test threaded loading of split and concatenated files."""
+    info = create_info(['a', 'b', 'c'], 1000., 'eeg')
+    data = np.random.RandomState(0).randn(3, 300000)
+    fname = tmpdir.join('test_raw.fif')
+    RawArray(data, info).save(fname, split_size='2MB')
+    assert op.isfile(str(fname)[:-4] + '-1.fif')
+    raw = read_raw_fif(fname)
+    assert len(raw.filenames) > 1
+    want = raw.get_data()
+    assert_allclose(want, data, rtol=1e-6)
+    assert_array_equal(raw.copy().load_data(n_jobs=4)._data, want)
+    raws = [read_raw_fif(fname) for _ in range(3)]
+    raw = concatenate_raws(raws)
+    assert_array_equal(raw.load_data(n_jobs=-1)._data,
+                       np.concatenate([want] * 3, axis=1))
+
+
+def test_dir_cache(tmpdir, monkeypatch):
+    """Test caching of scanned tag directories."""
+    from mne.io import open as fiff_open_mod
+    cache_dir = tmpdir.join('cache')
+    monkeypatch.setenv('MNE_FIF_INDEX_CACHE_DIR', str(cache_dir))
+    info = create_info(['a', 'b'], 1000., 'eeg')
+    data = np.random.RandomState(0).randn(2, 3000)
+    fname = str(tmpdir.join('test_raw.fif'))
+    RawArray(data, info).save(fname)
+    raw = read_raw_fif(fname, preload=True)  # scans and writes the cache
+    assert len(cache_dir.listdir()) == 1
+    assert_allclose(raw._data, data, rtol=1e-6)
+    n_scanned = list()
+    orig_read_tag_info = fiff_open_mod.read_tag_info
+
+    def _read_tag_info(*args, **kwargs):
+        n_scanned.append(None)
+        return orig_read_tag_info(*args, **kwargs)
+
+    monkeypatch.setattr(fiff_open_mod, 'read_tag_info', _read_tag_info)
+    raw_2 = read_raw_fif(fname, preload=True)
+    assert len(n_scanned) == 1  # just the file id tag
+    assert_array_equal(raw._data, raw_2._data)
+    # a modified file must not use the stale directory
+    RawArray(data[:, :2000], info).save(fname, overwrite=True)
+    del n_scanned[:]
+    raw_3 = read_raw_fif(fname, preload=True)
+    assert len(n_scanned) > 1
+    assert_allclose(raw_3._data, data[:, :2000], rtol=1e-6)
+    assert len(cache_dir.listdir()) == 1
+
+
 @pytest.mark.parametrize('split', (False, True))
 @pytest.mark.parametrize('kind', ('file', 'bytes'))
 @pytest.mark.parametrize('preload', (True, str))
@@ -4,6 +4,8 @@
 #
 # License: BSD (3-clause)
 
+import hashlib
+import os
 import os.path as op
 from io import BytesIO, SEEK_SET
 from gzip import GzipFile
@@ -14,7 +16,7 @@ from scipy import sparse
 from .tag import read_tag_info, read_tag, Tag, _call_dict_names
 from .tree import make_dir_tree, dir_tree_find
 from .constants import FIFF
-from ..utils import logger, verbose, _file_like
+from ..utils import logger, verbose, _file_like, get_config
 
 
 class _NoCloseRead(object):
@@ -93,6 +95,60 @@ def _get_next_fname(fid, fname, tree):
     return next_fname
 
 
+def _get_dir_cache_fname(fname):
+    """Get the directory cache file for a FIF file (None if not caching)."""
+    cache_dir = get_config('MNE_FIF_INDEX_CACHE_DIR', None)
+    if cache_dir is None or _file_like(fname):
+        return None
+    key = op.realpath(str(fname)).encode('utf-8')
+    return op.join(cache_dir, hashlib.sha1(key).hexdigest() + '.npz')
+
+
+def _get_dir_cache_stamp(fname):
+    """Get the (size, mtime) that a cached directory must match."""
+    stat = os.stat(str(fname))
+    return np.array([stat.st_size, stat.st_mtime_ns], np.int64)
+
+
+def _read_dir_cache(fname):
+    """Read a scanned tag directory from the cache, if present and valid."""
+    cache_fname = _get_dir_cache_fname(fname)
+    if cache_fname is None or not op.isfile(cache_fname):
+        return None
+    try:
+        with np.load(cache_fname, allow_pickle=False) as cache:
+            stamp, directory = cache['stamp'], cache['directory']
+    except Exception as exp:  # corrupt or partially written, just rescan
+        logger.debug('    Could not read tag directory cache %s: %s'
+                     % (cache_fname, exp))
+        return None
+    if not np.array_equal(stamp, _get_dir_cache_stamp(fname)):
+        logger.debug('    Tag directory cache for %s is stale' % (fname,))
+        return None
+    logger.debug('    Using tag directory cache %s' % (cache_fname,))
+    return [Tag(*ent) for ent in directory.tolist()]
+
+
+def _write_dir_cache(fname, directory):
+    """Write a scanned tag directory to the cache (when enabled)."""
+    cache_fname = _get_dir_cache_fname(fname)
+    if cache_fname is None:
+        return
+    directory = np.array([[tag.kind, tag.type, tag.size, tag.next, tag.pos]
+                          for tag in directory], np.int64).reshape(-1, 5)
+    tmp_fname = '%s.%d.tmp.npz' % (cache_fname[:-4], os.getpid())
+    try:
+        os.makedirs(op.dirname(cache_fname), exist_ok=True)
+        np.savez(tmp_fname, stamp=_get_dir_cache_stamp(fname),
+                 directory=directory)
+        os.replace(tmp_fname, cache_fname)
+    except OSError as exp:
+        logger.debug('    Could not write tag directory cache %s: %s'
+                     % (cache_fname, exp))
+    else:
+        logger.debug('    Wrote tag directory cache %s' % (cache_fname,))
+
+
 @verbose
 def fiff_open(fname, preload=False, verbose=None):
     """Open a FIF file.
@@ -116,6 +172,14 @@ def fiff_open(fname, preload=False, verbose=None):
         lists and tags.
     directory : list
         A list of tags.
+
+    Notes
+    -----
+    Files without a tag directory (such as those written by MNE) have to be
+    scanned tag by tag when they are opened. If the ``MNE_FIF_INDEX_CACHE_DIR``
+    config value is set, the scanned directory is stored there, keyed by the
+    path, size, and modification time of the file, and reused by later
+    opens of the same unmodified file.
     """
     fid = _fiff_get_fid(fname)
     # do preloading of entire file
@@ -150,16 +214,19 @@ def fiff_open(fname, preload=False, verbose=None):
         tag = read_tag(fid, dirpos)
         directory = tag.data
     else:
-        fid.seek(0, 0)
-        directory = list()
-        while tag.next >= 0:
-            pos = fid.tell()
-            tag = read_tag_info(fid)
-            if tag is None:
-                break  # HACK : to fix file ending with empty tag...
-            else:
-                tag.pos = pos
-                directory.append(tag)
+        directory = _read_dir_cache(fname)
+        if directory is None:
+            fid.seek(0, 0)
+            directory = list()
+            while tag.next >= 0:
+                pos = fid.tell()
+                tag = read_tag_info(fid)
+                if tag is None:
+                    break  # HACK : to fix file ending with empty tag...
+                else:
+                    tag.pos = pos
+                    directory.append(tag)
+            _write_dir_cache(fname, directory)
 
     tree, _ = make_dir_tree(fid, directory)
 
@@ -286,6 +286,43 @@ def test_get_data_reject():
     assert np.isnan(data).sum() == 3072  # but NaNs are introduced instead
 
 
+@pytest.mark.parametrize('prefetch', (True, False))
+@pytest.mark.parametrize('preload', (True, False))
+def test_iter_chunks(prefetch, preload, tmpdir):
+    """Test iterating over raw data in chunks."""
+    info = create_info(['a', 'b', 'c'], 100., 'eeg')
+    data = np.random.RandomState(0).randn(3, 1050)
+    raw = RawArray(data, info)
+    raw.set_annotations(Annotations([2.05], [0.1], ['BAD_blink']))
+    fname = op.join(str(tmpdir), 'test_raw.fif')
+    raw.save(fname)
+    raw = read_raw_fif(fname, preload=preload)
+    data = raw.get_data()
+    kwargs = dict(picks=[0, 2], prefetch=prefetch)
+    chunks = [(start, chunk.copy())
+              for start, chunk in raw.iter_chunks(1., **kwargs)]
+    assert [start for start, _ in chunks] == [0, 100, 300, 400, 500, 600,
+                                              700, 800, 900]
+    for start, chunk in chunks:
+        assert_array_equal(chunk, data[[0, 2], start:start + 100])
+    chunks = [(start, chunk.copy()) for start, chunk in raw.iter_chunks(
+        1., 0.5, reject_by_annotation=False, **kwargs)]
+    assert [start for start, _ in chunks] == list(range(0, 951, 50))
+    for start, chunk in chunks:
+        assert_array_equal(chunk, data[[0, 2], start:start + 100])
+    # without overlap, the chunks tile the data (up to the last full chunk)
+    chunks = [(start, chunk.copy()) for start, chunk in raw.iter_chunks(
+        1., reject_by_annotation=False, prefetch=prefetch)]
+    assert [start for start, _ in chunks] == list(range(0, 901, 100))
+    assert all(chunk.shape == (3, 100) for _, chunk in chunks)
+    assert_array_equal(np.concatenate([chunk for _, chunk in chunks], 1),
+                       data[:, :1000])
+    with pytest.raises(ValueError, match='overlap must'):
+        next(raw.iter_chunks(1., 1.))
+    with pytest.raises(ValueError, match='duration must'):
+        next(raw.iter_chunks(20.))
+
+
 def test_5839():
     """Test concatenating raw objects with annotations."""
     # Global Time 0         1         2         3         4
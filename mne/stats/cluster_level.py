@@ -10,14 +10,25 @@
 #
 # License: Simplified BSD
 
+from functools import partial
+from glob import glob
+import os
+import os.path as op
+import shutil
+import tempfile
+import threading
+import time
+
 import numpy as np
 from scipy import sparse
 
-from .parametric import f_oneway, ttest_1samp_no_p
+from .parametric import (f_oneway, ttest_1samp_no_p, _f_oneway_perms,
+                         _ttest_1samp_no_p_flips)
 from ..parallel import parallel_func, check_n_jobs
 from ..fixes import jit, has_numba
-from ..utils import (split_list, logger, verbose, ProgressBar, warn, _pl,
-                     check_random_state, _check_option, _validate_type)
+from ..utils import (logger, verbose, ProgressBar, warn, _pl,
+                     check_random_state, _check_option, _validate_type,
+                     object_hash, get_config)
 from ..source_estimate import SourceEstimate
 
 
@@ -110,6 +121,285 @@ def _masked_sum_power(x, c, t_power):
     return np.sum(np.sign(x[c]) * np.abs(x[c]) ** t_power)
 
 
+# Union-find cluster labeling. This is only used when Numba is available, as
+# the pure Python loops are much slower than the NumPy-based algorithms below.
+# Each root is the smallest index of its component, so components are labeled
+# in the order of their first element.
+
+_use_union_find = has_numba
+_uf_scratch = threading.local()
+
+
+@jit()
+def _uf_find(parent, ii):
+    while parent[ii] != ii:
+        parent[ii] = parent[parent[ii]]  # path halving
+        ii = parent[ii]
+    return ii
+
+
+@jit()
+def _uf_union(parent, ii, jj):
+    ii = _uf_find(parent, ii)
+    jj = _uf_find(parent, jj)
+    if ii < jj:
+        parent[jj] = ii
+    elif jj < ii:
+        parent[ii] = jj
+
+
+@jit()
+def _uf_st_components(x_in, indptr, indices, n_src, max_step, parent):
+    """Join spatial neighbors (CSR) and temporal neighbors up to max_step."""
+    for ii in range(len(x_in)):
+        parent[ii] = ii
+    for ii in range(len(x_in)):
+        if x_in[ii]:
+            s = ii % n_src
+            t_offset = ii - s
+            for kk in range(indptr[s], indptr[s + 1]):
+                jj = t_offset + indices[kk]
+                if jj < ii and x_in[jj]:
+                    _uf_union(parent, ii, jj)
+            for step in range(1, max_step + 1):
+                jj = ii - step * n_src
+                if jj < 0:
+                    break
+                if x_in[jj]:
+                    _uf_union(parent, ii, jj)
+
+
+@jit()
+def _uf_edge_components(x_in, row, col, parent):
+    """Join the endpoints of each edge (COO) of the connectivity."""
+    for ii in range(len(x_in)):
+        parent[ii] = ii
+    for kk in range(len(row)):
+        if x_in[row[kk]] and x_in[col[kk]]:
+            _uf_union(parent, row[kk], col[kk])
+
+
+@jit()
+def _uf_label_sums(x, x_in, parent, t_power, labels):
+    """Label the components, and sum their (powered) statistics."""
+    n_labels = 0
+    for ii in range(len(x_in)):
+        if x_in[ii]:
+            root = _uf_find(parent, ii)
+            if root == ii:
+                labels[ii] = n_labels
+                n_labels += 1
+            else:
+                labels[ii] = labels[root]
+    sums = np.zeros(n_labels)
+    for ii in range(len(x_in)):
+        if x_in[ii]:
+            if t_power == 1:
+                sums[labels[ii]] += x[ii]
+            else:
+                sums[labels[ii]] += np.sign(x[ii]) * np.abs(x[ii]) ** t_power
+    return sums
+
+
+def _get_uf_scratch(n):
+    """Get the (per-thread) union-find buffers, reused across calls."""
+    if getattr(_uf_scratch, 'parent', np.empty(0)).size < n:
+        _uf_scratch.parent = np.empty(n, np.int64)
+        _uf_scratch.labels = np.empty(n, np.int64)
+    return _uf_scratch.parent[:n], _uf_scratch.labels[:n]
+
+
+def _get_clusters_uf(x, x_in, connectivity, max_step, t_power):
+    """Find clusters and their sums using union-find.
+
+    ``connectivity`` is either the spatial neighbors (_Neighbors) for data
+    organized as time x space, or a COO matrix. The clusters (sorted
+    indices) are ordered by their first element, like _get_components.
+    """
+    parent, labels = _get_uf_scratch(len(x_in))
+    if isinstance(connectivity, list):
+        _uf_st_components(x_in, connectivity.indptr, connectivity.indices,
+                          len(connectivity), max_step, parent)
+    else:
+        _uf_edge_components(x_in, connectivity.row, connectivity.col, parent)
+    sums = _uf_label_sums(x, x_in, parent, float(t_power), labels)
+    idx = np.where(x_in)[0]
+    idx_labels = labels[idx]
+    order = np.argsort(idx_labels, kind='mergesort')
+    bounds = np.where(np.diff(idx_labels[order]))[0] + 1
+    clusters = np.split(idx[order], bounds) if len(idx) else list()
+    return clusters, sums
+
+
+@jit()
+def _tfce_find(parent, val, ii, stack):
+    """Find the root, making val relative to it (path compression)."""
+    n_stack = 0
+    while parent[ii] != ii:
+        stack[n_stack] = ii
+        n_stack += 1
+        ii = parent[ii]
+    for si in range(n_stack - 2, -1, -1):
+        val[stack[si]] += val[stack[si + 1]]
+        parent[stack[si]] = ii
+    return ii
+
+
+@jit()
+def _tfce_flush(root, level, val, size, since, weights_cum, e_power):
+    """Add the enhancement of a cluster down to (excluding) level."""
+    val[root] += ((weights_cum[since[root] + 1] - weights_cum[level + 1]) *
+                  size[root] ** e_power)
+    since[root] = level
+
+
+@jit()
+def _tfce_join(ii, jj, level, groups, parent, val, size, since, weights_cum,
+               e_power, stack):
+    """Join the cluster of ii with that of jj (if active and compatible)."""
+    if parent[jj] < 0 or groups[jj] != groups[ii]:
+        return
+    ii = _tfce_find(parent, val, ii, stack)
+    jj = _tfce_find(parent, val, jj, stack)
+    if ii == jj:
+        return
+    _tfce_flush(ii, level, val, size, since, weights_cum, e_power)
+    _tfce_flush(jj, level, val, size, since, weights_cum, e_power)
+    if size[ii] < size[jj]:
+        ii, jj = jj, ii
+    parent[jj] = ii
+    val[jj] -= val[ii]
+    size[ii] += size[jj]
+
+
+@jit()
+def _tfce_sweep(order, levels, groups, weights_cum, e_power, shape, strides,
+                indptr, indices, n_src, max_step):
+    """Compute TFCE scores in one sweep from the highest threshold down.
+
+    ``levels[ii]`` is the number of thresholds that point ii exceeds, and
+    ``order`` sorts the points with levels > 0 by decreasing level. Points
+    are only ever added to clusters (with union-find), and the enhancement
+    of each cluster is accumulated lazily: when a cluster changes, or at
+    the end, its root gets the weights of the thresholds since the last
+    change times its size to the e_power. The score of a point is the sum
+    of the values along its path to the root, as the value of a root that
+    is attached to another one is made relative to it.
+    """
+    n = len(levels)
+    parent = np.full(n, -1, np.int64)
+    size = np.zeros(n, np.int64)
+    since = np.zeros(n, np.int64)
+    val = np.zeros(n)
+    stack = np.empty(n, np.int64)
+    pos = 0
+    for level in range(len(weights_cum) - 2, -1, -1):
+        while pos < len(order) and levels[order[pos]] == level + 1:
+            ii = order[pos]
+            pos += 1
+            parent[ii] = ii
+            size[ii] = 1
+            since[ii] = level
+            if len(shape) > 0:  # lattice
+                for ai in range(len(shape)):
+                    coord = (ii // strides[ai]) % shape[ai]
+                    if coord > 0:
+                        _tfce_join(ii, ii - strides[ai], level, groups,
+                                   parent, val, size, since, weights_cum,
+                                   e_power, stack)
+                    if coord < shape[ai] - 1:
+                        _tfce_join(ii, ii + strides[ai], level, groups,
+                                   parent, val, size, since, weights_cum,
+                                   e_power, stack)
+            elif len(indptr) > 0:  # spatial neighbors (and time)
+                s = ii % n_src
+                t_offset = ii - s
+                for kk in range(indptr[s], indptr[s + 1]):
+                    _tfce_join(ii, t_offset + indices[kk], level, groups,
+                               parent, val, size, since, weights_cum,
+                               e_power, stack)
+                for step in range(1, max_step + 1):
+                    if ii - step * n_src >= 0:
+                        _tfce_join(ii, ii - step * n_src, level, groups,
+                                   parent, val, size, since, weights_cum,
+                                   e_power, stack)
+                    if ii + step * n_src < n:
+                        _tfce_join(ii, ii + step * n_src, level, groups,
+                                   parent, val, size, since, weights_cum,
+                                   e_power, stack)
+    scores = np.zeros(n)
+    for ii in range(n):
+        if parent[ii] == ii:
+            _tfce_flush(ii, -1, val, size, since, weights_cum, e_power)
+    for ii in range(n):
+        if parent[ii] >= 0:
+            root = _tfce_find(parent, val, ii, stack)
+            scores[ii] = val[ii] + val[root] if root != ii else val[ii]
+    return scores
+
+
+def _tfce_scores(x, thresholds, tail, connectivity, max_step, include,
+                 partitions, h_power, e_power):
+    """Compute TFCE scores with an incremental union-find sweep."""
+    empty = np.zeros(0, np.int64)
+    shape = strides = indptr = indices = empty
+    n_src = 1
+    # 1D lattice clusters are tuples of slices, which the labeling loop
+    # counts as having an extent of one (like unconnected points)
+    if connectivity is None and x.ndim > 1:
+        shape = np.array(x.shape, np.int64)
+        strides = np.cumprod(np.r_[shape[1:], 1][::-1])[::-1].astype(np.int64)
+    elif connectivity is not None and connectivity is not False:
+        if x.ndim > 1:
+            raise Exception("Data should be 1D when using a connectivity "
+                            "to define clusters.")
+        if isinstance(connectivity, _Neighbors):
+            indptr, indices = connectivity.indptr, connectivity.indices
+            n_src = len(connectivity)
+        elif isinstance(connectivity, list):
+            indptr = np.cumsum([0] + [len(n) for n in connectivity])
+            indices = np.concatenate(connectivity).astype(np.int64)
+            n_src = len(connectivity)
+        else:
+            connectivity = (connectivity + connectivity.T).tocsr()
+            indptr, indices = connectivity.indptr, connectivity.indices
+            n_src, max_step = len(x), 0
+    x = x.ravel()
+    # thresholds exceeded by each point (thresholding x, -x or abs(x))
+    thresholds = np.asarray(thresholds, float)
+    if tail == -1:
+        levels = np.searchsorted(-thresholds, -x)
+    else:
+        levels = np.searchsorted(thresholds, x if tail == 1 else np.abs(x))
+    if include is not None:
+        levels[~include.ravel()] = 0
+    # only points of the same sign and partition can be joined
+    groups = np.zeros(len(x), np.int64)
+    if partitions is not None:
+        groups += 2 * partitions.ravel()
+    if tail == 0:
+        groups += x < 0
+    order = np.argsort(-levels, kind='mergesort')
+    order = order[:np.count_nonzero(levels)]
+    weights = np.abs(np.diff(np.r_[0., thresholds])) ** h_power
+    weights_cum = np.r_[0., np.cumsum(weights)]
+    return _tfce_sweep(order, levels, groups, weights_cum, float(e_power),
+                       shape, strides, indptr, indices, n_src, max_step)
+
+
+class _Neighbors(list):
+    """The spatial neighbors of each vertex, also stored in CSR form."""
+
+    def __init__(self, connectivity):  # noqa: D102
+        connectivity = connectivity.tocsr()
+        super(_Neighbors, self).__init__(
+            connectivity.indices[connectivity.indptr[i]:
+                                 connectivity.indptr[i + 1]]
+            for i in range(len(connectivity.indptr) - 1))
+        self.indptr = connectivity.indptr
+        self.indices = connectivity.indices
+
+
 def _get_clusters_spatial(s, neighbors):
     """Form spatial clusters using neighbor lists.
 
@@ -408,6 +698,11 @@ def _find_clusters(x, threshold, tail=0, connectivity=None, max_step=1,
         raise ValueError('Thresholds must be monotonically increasing')
     if tail == -1 and not np.all(np.diff(thresholds) < 0):
         raise ValueError('Thresholds must be monotonically decreasing')
+    if tfce is True and _use_union_find:
+        # sweep the thresholds once, only ever adding points to clusters
+        scores = _tfce_scores(x, thresholds, tail, connectivity, max_step,
+                              include, partitions, h_power, e_power)
+        thresholds = list()
 
     # set these here just in case thresholds == []
     clusters = list()
@@ -521,6 +816,9 @@ def _find_clusters_1dir(x, x_in, connectivity, max_step, t_power, ndimage):
         if x.ndim > 1:
             raise Exception("Data should be 1D when using a connectivity "
                             "to define clusters.")
+        if _use_union_find and (isinstance(connectivity, _Neighbors) or
+                                isinstance(connectivity, sparse.coo_matrix)):
+            return _get_clusters_uf(x, x_in, connectivity, max_step, t_power)
         if isinstance(connectivity, sparse.spmatrix) or connectivity is False:
             clusters = _get_components(x_in, connectivity)
         elif isinstance(connectivity, list):  # use temporal adjacency
@@ -587,18 +885,45 @@ def _setup_connectivity(connectivity, n_tests, n_times):
                 'vertices can be excluded during forward computation'
                 % (connectivity.shape[0], n_tests))
         # we claim to only use upper triangular part... not true here
-        connectivity = (connectivity + connectivity.transpose()).tocsr()
-        connectivity = [connectivity.indices[connectivity.indptr[i]:
-                                             connectivity.indptr[i + 1]]
-                        for i in range(len(connectivity.indptr) - 1)]
+        connectivity = _Neighbors(connectivity + connectivity.transpose())
     return connectivity
 
 
+def _get_batch_stat_fun(stat_fun, X, slices):
+    """Get a function computing a built-in stat_fun for many permutations.
+
+    This returns None if ``stat_fun`` is not ``ttest_1samp_no_p`` (for the
+    1-sample test, possibly with ``sigma`` and ``method`` bound using
+    :func:`functools.partial`) or ``f_oneway`` (for the F-test).
+    """
+    kwargs = dict()
+    if isinstance(stat_fun, partial) and len(stat_fun.args) == 0:
+        stat_fun, kwargs = stat_fun.func, stat_fun.keywords
+    if slices is None:
+        if stat_fun is ttest_1samp_no_p and set(kwargs).issubset(
+                ('sigma', 'method')):
+            return _ttest_1samp_no_p_flips(X, **kwargs)
+    elif stat_fun is f_oneway and len(kwargs) == 0:
+        return _f_oneway_perms(X, slices)
+    return None
+
+
+def _n_perm_block(n_orders, n_vars):
+    """Get the number of permutations to compute together (~32 MB)."""
+    return max(min(n_orders, 2 ** 22 // max(n_vars, 1)), 1)
+
+
 def _do_permutations(X_full, slices, threshold, tail, connectivity, stat_fun,
                      max_step, include, partitions, t_power, orders,
                      sample_shape, buffer_size, progress_bar):
     n_samp, n_vars = X_full.shape
 
+    # the built-in stat_fun are computed for blocks of permutations at once
+    batch_stat_fun = _get_batch_stat_fun(stat_fun, X_full, slices)
+    n_block = _n_perm_block(len(orders), n_vars)
+    if batch_stat_fun is not None:
+        buffer_size = None  # the blocks already bound the memory usage
+
     if buffer_size is not None and n_vars <= buffer_size:
         buffer_size = None  # don't use buffer for few variables
 
@@ -615,7 +940,12 @@ def _do_permutations(X_full, slices, threshold, tail, connectivity, stat_fun,
         assert order is not None
         idx_shuffle_list = [order[s] for s in slices]
 
-        if buffer_size is None:
+        if batch_stat_fun is not None:
+            if seed_idx % n_block == 0:
+                t_obs_block = batch_stat_fun(
+                    orders[seed_idx:seed_idx + n_block])
+            t_obs_surr = t_obs_block[seed_idx % n_block]
+        elif buffer_size is None:
             # shuffle all data at once
             X_shuffle_list = [X_full[idx, :] for idx in idx_shuffle_list]
             t_obs_surr = stat_fun(*X_shuffle_list)
@@ -663,6 +993,12 @@ def _do_1samp_permutations(X, slices, threshold, tail, connectivity, stat_fun,
     n_samp, n_vars = X.shape
     assert slices is None  # should be None for the 1 sample case
 
+    # the built-in stat_fun are computed for blocks of sign flips at once
+    batch_stat_fun = _get_batch_stat_fun(stat_fun, X, slices)
+    n_block = _n_perm_block(len(orders), n_vars)
+    if batch_stat_fun is not None:
+        buffer_size = None  # the blocks already bound the memory usage
+
     if buffer_size is not None and n_vars <= buffer_size:
         buffer_size = None  # don't use buffer for few variables
 
@@ -681,7 +1017,13 @@ def _do_1samp_permutations(X, slices, threshold, tail, connectivity, stat_fun,
         if not np.all(np.equal(np.abs(signs), 1)):
             raise ValueError('signs from rng must be +/- 1')
 
-        if buffer_size is None:
+        if batch_stat_fun is not None:
+            if seed_idx % n_block == 0:
+                signs_block = 2. * np.array(
+                    orders[seed_idx:seed_idx + n_block]) - 1
+                t_obs_block = batch_stat_fun(signs_block)
+            t_obs_surr = t_obs_block[seed_idx % n_block]
+        elif buffer_size is None:
             # be careful about non-writable memmap (GH#1507)
             if X.flags.writeable:
                 X *= signs
@@ -805,10 +1147,169 @@ def _get_1samp_orders(n_samples, n_permutations, tail, rng):
     return orders, n_permutations, extra
 
 
+class _Shared(object):
+    """Data saved to files, for worker processes to memory-map."""
+
+    def __init__(self, x, tempdir, name):  # noqa: D102
+        if isinstance(x, _Neighbors):
+            self.kind, arrays = 'neighbors', dict(indptr=x.indptr,
+                                                  indices=x.indices)
+        elif isinstance(x, sparse.coo_matrix):
+            self.kind, arrays = 'coo', dict(data=x.data, row=x.row, col=x.col)
+            self.shape = x.shape
+        else:
+            self.kind, arrays = 'array', dict(x=np.asarray(x))
+        self.fnames = dict()
+        for key, array in arrays.items():
+            self.fnames[key] = op.join(tempdir, '%s_%s.npy' % (name, key))
+            np.save(self.fnames[key], array)
+
+    def load(self):
+        """Memory-map the data."""
+        arrays = {key: np.load(fname, mmap_mode='r')
+                  for key, fname in self.fnames.items()}
+        if self.kind == 'neighbors':
+            return _Neighbors(sparse.csr_matrix((
+                np.ones(len(arrays['indices']), bool), arrays['indices'],
+                arrays['indptr'])))
+        elif self.kind == 'coo':
+            return sparse.coo_matrix(
+                (arrays['data'], (arrays['row'], arrays['col'])), self.shape)
+        return arrays['x']
+
+
+def _perm_worker_run(do_perm_func, args, orders, sample_shape, buffer_size,
+                     start, stop):
+    """Compute the H0 values of a chunk of orders in a worker process."""
+    args = [arg.load() if isinstance(arg, _Shared) else arg for arg in args]
+    H0 = do_perm_func(*args, orders.load()[start:stop], sample_shape,
+                      buffer_size, ProgressBar(1, verbose_bool=False))
+    return start, stop, H0
+
+
+def _perm_h0_shared(parallel, my_perm_worker_run, n_jobs, do_perm_func,
+                    orders, args, sample_shape, buffer_size, progress_bar):
+    """Compute H0 values in processes that share the data.
+
+    The arrays (data, connectivity, orders, ...) are saved to a temporary
+    directory (in the cache directory if set, see set_cache_dir()) and
+    memory-mapped by each worker, so that memory use does not grow with
+    n_jobs. The orders are handed out in small chunks for load balancing.
+    """
+    n_orders = len(orders)
+    n_chunk = int(np.clip(n_orders // (8 * n_jobs), 1, 100))
+    tempdir = tempfile.mkdtemp(prefix='tmp_mne_perm_',
+                               dir=get_config('MNE_CACHE_DIR', None))
+    try:
+        args = [_Shared(arg, tempdir, str(ii))
+                if isinstance(arg, (np.ndarray, _Neighbors,
+                                    sparse.coo_matrix)) else arg
+                for ii, arg in enumerate(args)]
+        orders = _Shared(orders, tempdir, 'orders')
+        H0 = np.empty(n_orders)
+        for start, stop, this_H0 in parallel(
+                my_perm_worker_run(do_perm_func, args, orders, sample_shape,
+                                   buffer_size, start,
+                                   min(start + n_chunk, n_orders))
+                for start in range(0, n_orders, n_chunk)):
+            H0[start:stop] = this_H0
+            progress_bar.update_with_increment_value(stop - start)
+    finally:
+        shutil.rmtree(tempdir, ignore_errors=True)
+    return H0
+
+
+def _perm_h0(do_perm_func, n_jobs, orders, args, sample_shape, buffer_size):
+    """Compute the H0 values of permutation orders (in parallel)."""
+    t0 = time.time()
+    if len(orders) < 2:
+        n_jobs = 1
+    parallel, my_perm_worker_run, n_jobs = parallel_func(
+        _perm_worker_run, n_jobs, max_nbytes=None, verbose=False)
+    with ProgressBar(len(orders), verbose_bool='auto') as progress_bar:
+        if n_jobs == 1:
+            H0 = do_perm_func(*args, orders, sample_shape, buffer_size,
+                              progress_bar)
+        else:
+            H0 = _perm_h0_shared(parallel, my_perm_worker_run, n_jobs,
+                                 do_perm_func, orders, args, sample_shape,
+                                 buffer_size, progress_bar)
+    dt = time.time() - t0
+    logger.info('Computed %d permutation%s in %0.1f sec (%0.1f/sec using %d '
+                'job%s)' % (len(orders), _pl(orders), dt,
+                            len(orders) / max(dt, 1e-6), n_jobs, _pl(n_jobs)))
+    return H0
+
+
+_CHECKPOINT_CHUNK = 1000  # number of permutations per checkpoint file
+
+
+def _checkpoint_key(X, threshold, tail, connectivity, max_step, include,
+                    t_power, t_obs):
+    """Hash what the H0 values of a permutation depend on."""
+    if isinstance(connectivity, _Neighbors):
+        connectivity = [connectivity.indptr, connectivity.indices]
+    elif isinstance(connectivity, sparse.coo_matrix):
+        connectivity = [connectivity.row, connectivity.col]
+    return '%032x' % object_hash(dict(
+        shapes=[x.shape for x in X], threshold=threshold, tail=tail,
+        connectivity=connectivity, max_step=max_step, include=include,
+        t_power=t_power, t_obs=t_obs))
+
+
+def _checkpoint_h0(checkpoint, key, stream, orders, perm_h0):
+    """Compute H0 for orders, reusing and saving chunks in a directory.
+
+    Chunk files are named ``h0_<key>_<stream>_<start>_<stop>.npz``, where
+    the stream identifies the random state used to generate the orders (or
+    is ``'exact'``). As the orders of a stream do not depend on how many of
+    them are drawn, its chunks can be used to resume or extend a run. The
+    chunks of other (random) streams are appended to H0.
+    """
+    n_orders = len(orders)
+    H0 = np.zeros(n_orders)
+    done = np.zeros(n_orders, bool)
+    others = list()
+    prefix = 'h0_%s_' % (key,)
+    for fname in sorted(glob(op.join(checkpoint, prefix + '*.npz'))):
+        this_stream, start, stop = \
+            op.basename(fname)[len(prefix):-4].split('_')
+        with np.load(fname) as fid:
+            this_H0 = fid['H0']
+        if this_stream == stream:
+            start, stop = int(start), min(int(stop), n_orders)
+            if start < stop:
+                H0[start:stop] = this_H0[:stop - start]
+                done[start:stop] = True
+        elif 'exact' not in (stream, this_stream):
+            others.append(this_H0)
+    if done.any():
+        logger.info('Loaded %d of %d permutations from %s'
+                    % (done.sum(), n_orders, checkpoint))
+    starts = np.where(~done & np.r_[True, done[:-1]])[0]
+    stops = np.where(~done & np.r_[done[1:], True])[0] + 1
+    for start, stop in zip(starts, stops):
+        for start in range(start, stop, _CHECKPOINT_CHUNK):
+            this_stop = min(start + _CHECKPOINT_CHUNK, stop)
+            H0[start:this_stop] = perm_h0(orders[start:this_stop])
+            fname = '%s%s_%09d_%09d.npz' % (prefix, stream, start, this_stop)
+            # write then move, so that an interrupted run leaves no
+            # partial chunk behind
+            tmp_fname = op.join(checkpoint, 'tmp_' + fname)
+            np.savez(tmp_fname, H0=H0[start:this_stop])
+            os.replace(tmp_fname, op.join(checkpoint, fname))
+    if len(others):
+        others = np.concatenate(others)
+        logger.info('Merging %d permutations from other runs in %s'
+                    % (len(others), checkpoint))
+        H0 = np.concatenate([H0, others])
+    return H0
+
+
 def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
                               connectivity, n_jobs, seed, max_step,
                               exclude, step_down_p, t_power, out_type,
-                              check_disjoint, buffer_size):
+                              check_disjoint, buffer_size, checkpoint=None):
     n_jobs = check_n_jobs(n_jobs)
     """Aux Function.
 
@@ -910,14 +1411,26 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
     # check to see if we can do an exact test
     # (for a two-tailed test, we can exploit symmetry to just do half)
     extra = ''
+    if checkpoint is not None:
+        _validate_type(checkpoint, 'path-like', 'checkpoint')
+        if seed is None:
+            raise ValueError('seed must be given when using checkpoint, '
+                             'otherwise each call adds new permutations to '
+                             'the saved H0 instead of reusing them')
+        checkpoint = str(checkpoint)
+        os.makedirs(checkpoint, exist_ok=True)
     rng = check_random_state(seed)
     del seed
+    if checkpoint is not None:
+        stream = '%032x' % object_hash(rng.get_state())
     if len(X) == 1:  # 1-sample test
         do_perm_func = _do_1samp_permutations
         X_full = X[0]
         slices = None
         orders, n_permutations, extra = _get_1samp_orders(
             n_samples, n_permutations, tail, rng)
+        if checkpoint is not None and extra:
+            stream = 'exact'
     else:
         n_permutations = int(n_permutations)
         do_perm_func = _do_permutations
@@ -929,8 +1442,6 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
         orders = [rng.permutation(len(X_full))
                   for _ in range(n_permutations - 1)]
     del rng
-    parallel, my_do_perm_func, _ = parallel_func(
-        do_perm_func, n_jobs, verbose=False)
 
     if len(clusters) == 0:
         warn('No clusters found, returning empty H0, clusters, and cluster_pv')
@@ -954,13 +1465,17 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
         else:
             this_include = step_down_include
         logger.info('Permuting %d times%s...' % (len(orders), extra))
-        with ProgressBar(len(orders), verbose_bool='auto') as progress_bar:
-            H0 = parallel(
-                my_do_perm_func(X_full, slices, threshold, tail, connectivity,
-                                stat_fun, max_step, this_include, partitions,
-                                t_power, order, sample_shape, buffer_size,
-                                progress_bar.subset(idx))
-                for idx, order in split_list(orders, n_jobs, idx=True))
+        perm_h0 = partial(
+            _perm_h0, do_perm_func, n_jobs,
+            args=(X_full, slices, threshold, tail, connectivity, stat_fun,
+                  max_step, this_include, partitions, t_power),
+            sample_shape=sample_shape, buffer_size=buffer_size)
+        if checkpoint is None:
+            H0 = perm_h0(orders)
+        else:
+            key = _checkpoint_key(X, threshold, tail, connectivity, max_step,
+                                  this_include, t_power, t_obs)
+            H0 = _checkpoint_h0(checkpoint, key, stream, orders, perm_h0)
         # include original (true) ordering
         if tail == -1:  # up tail
             orig = cluster_stats.min()
@@ -968,8 +1483,7 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
             orig = cluster_stats.max()
         else:
             orig = abs(cluster_stats).max()
-        H0.insert(0, [orig])
-        H0 = np.concatenate(H0)
+        H0 = np.concatenate([[orig], H0])
         logger.info('Computing cluster p-values')
         cluster_pv = _pval_from_histogram(cluster_stats, H0, tail)
 
@@ -1034,7 +1548,7 @@ def permutation_cluster_test(
         X, threshold=None, n_permutations=1024, tail=0, stat_fun=None,
         connectivity=None, n_jobs=1, seed=None, max_step=1, exclude=None,
         step_down_p=0, t_power=1, out_type='mask', check_disjoint=False,
-        buffer_size=1000, verbose=None):
+        buffer_size=1000, checkpoint=None, verbose=None):
     """Cluster-level statistical permutation test.
 
     For a list of nd-arrays of data, e.g. 2d for time series or 3d for
@@ -1113,10 +1627,11 @@ def permutation_cluster_test(
     buffer_size : int or None
         The statistics will be computed for blocks of variables of size
         "buffer_size" at a time. This is option significantly reduces the
-        memory requirements when n_jobs > 1 and memory sharing between
-        processes is enabled (see set_cache_dir()), as X will be shared
-        between processes and each process only needs to allocate space
-        for a small block of variables.
+        memory requirements when n_jobs > 1, as X is shared between
+        processes (memory-mapped from a temporary file, in the cache
+        directory if set, see set_cache_dir()) and each process only needs
+        to allocate space for a small block of variables.
+    %(checkpoint)s
     %(verbose)s
 
     Returns
@@ -1142,7 +1657,7 @@ def permutation_cluster_test(
         stat_fun=stat_fun, connectivity=connectivity, n_jobs=n_jobs, seed=seed,
         max_step=max_step, exclude=exclude, step_down_p=step_down_p,
         t_power=t_power, out_type=out_type, check_disjoint=check_disjoint,
-        buffer_size=buffer_size)
+        buffer_size=buffer_size, checkpoint=checkpoint)
 
 
 @verbose
@@ -1150,7 +1665,7 @@ def permutation_cluster_1samp_test(
         X, threshold=None, n_permutations=1024, tail=0, stat_fun=None,
         connectivity=None, verbose=None, n_jobs=1, seed=None, max_step=1,
         exclude=None, step_down_p=0, t_power=1, out_type='mask',
-        check_disjoint=False, buffer_size=1000):
+        check_disjoint=False, buffer_size=1000, checkpoint=None):
     """Non-parametric cluster-level paired t-test.
 
     Parameters
@@ -1223,10 +1738,11 @@ def permutation_cluster_1samp_test(
     buffer_size : int or None
         The statistics will be computed for blocks of variables of size
         "buffer_size" at a time. This is option significantly reduces the
-        memory requirements when n_jobs > 1 and memory sharing between
-        processes is enabled (see set_cache_dir()), as X will be shared
-        between processes and each process only needs to allocate space
-        for a small block of variables.
+        memory requirements when n_jobs > 1, as X is shared between
+        processes (memory-mapped from a temporary file, in the cache
+        directory if set, see set_cache_dir()) and each process only needs
+        to allocate space for a small block of variables.
+    %(checkpoint)s
 
     Returns
     -------
@@ -1274,7 +1790,7 @@ def permutation_cluster_1samp_test(
         stat_fun=stat_fun, connectivity=connectivity, n_jobs=n_jobs, seed=seed,
         max_step=max_step, exclude=exclude, step_down_p=step_down_p,
         t_power=t_power, out_type=out_type, check_disjoint=check_disjoint,
-        buffer_size=buffer_size)
+        buffer_size=buffer_size, checkpoint=checkpoint)
 
 
 @verbose
@@ -1283,7 +1799,7 @@ def spatio_temporal_cluster_1samp_test(
         stat_fun=None, connectivity=None, n_jobs=1, seed=None,
         max_step=1, spatial_exclude=None, step_down_p=0, t_power=1,
         out_type='indices', check_disjoint=False, buffer_size=1000,
-        verbose=None):
+        checkpoint=None, verbose=None):
     """Non-parametric cluster-level paired t-test for spatio-temporal data.
 
     This function provides a convenient wrapper for data organized in the form
@@ -1354,10 +1870,11 @@ def spatio_temporal_cluster_1samp_test(
     buffer_size : int or None
         The statistics will be computed for blocks of variables of size
         "buffer_size" at a time. This is option significantly reduces the
-        memory requirements when n_jobs > 1 and memory sharing between
-        processes is enabled (see set_cache_dir()), as X will be shared
-        between processes and each process only needs to allocate space
-        for a small block of variables.
+        memory requirements when n_jobs > 1, as X is shared between
+        processes (memory-mapped from a temporary file, in the cache
+        directory if set, see set_cache_dir()) and each process only needs
+        to allocate space for a small block of variables.
+    %(checkpoint)s
     %(verbose)s
 
     Returns
@@ -1392,7 +1909,8 @@ def spatio_temporal_cluster_1samp_test(
         n_permutations=n_permutations, connectivity=connectivity,
         n_jobs=n_jobs, seed=seed, max_step=max_step, exclude=exclude,
         step_down_p=step_down_p, t_power=t_power, out_type=out_type,
-        check_disjoint=check_disjoint, buffer_size=buffer_size)
+        check_disjoint=check_disjoint, buffer_size=buffer_size,
+        checkpoint=checkpoint)
 
 
 @verbose
@@ -1400,7 +1918,7 @@ def spatio_temporal_cluster_test(
         X, threshold=None, n_permutations=1024, tail=0, stat_fun=None,
         connectivity=None, verbose=None, n_jobs=1, seed=None, max_step=1,
         spatial_exclude=None, step_down_p=0, t_power=1, out_type='indices',
-        check_disjoint=False, buffer_size=1000):
+        check_disjoint=False, buffer_size=1000, checkpoint=None):
     """Non-parametric cluster-level test for spatio-temporal data.
 
     This function provides a convenient wrapper for data organized in the form
@@ -1466,10 +1984,11 @@ def spatio_temporal_cluster_test(
     buffer_size : int or None
         The statistics will be computed for blocks of variables of size
         "buffer_size" at a time. This is option significantly reduces the
-        memory requirements when n_jobs > 1 and memory sharing between
-        processes is enabled (see set_cache_dir()), as X will be shared
-        between processes and each process only needs to allocate space
-        for a small block of variables.
+        memory requirements when n_jobs > 1, as X is shared between
+        processes (memory-mapped from a temporary file, in the cache
+        directory if set, see set_cache_dir()) and each process only needs
+        to allocate space for a small block of variables.
+    %(checkpoint)s
 
     Returns
     -------
@@ -1500,7 +2019,8 @@ def spatio_temporal_cluster_test(
         n_permutations=n_permutations, connectivity=connectivity,
         n_jobs=n_jobs, seed=seed, max_step=max_step, exclude=exclude,
         step_down_p=step_down_p, t_power=t_power, out_type=out_type,
-        check_disjoint=check_disjoint, buffer_size=buffer_size)
+        check_disjoint=check_disjoint, buffer_size=buffer_size,
+        checkpoint=checkpoint)
 
 
 def _st_mask_from_s_inds(n_times, n_vertices, vertices, set_as=True):
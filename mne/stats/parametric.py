@@ -129,6 +129,87 @@ def f_oneway(*args):
     return f
 
 
+def _ttest_1samp_no_p_flips(X, sigma=0, method='relative'):
+    """Get a function computing ttest_1samp_no_p of sign-flipped data.
+
+    The returned function takes an array of signs (+1 or -1) of shape
+    (n_flips, n_samples), and returns the t-values of each sign flip of X,
+    of shape (n_flips, n_tests). The flipped means are computed together as
+    a matrix product.
+
+    To keep the precision of a two-pass variance when the mean of X is large
+    compared to its standard deviation, X is centered as ``X = c + Y``. With
+    ``d = signs.sum()`` and ``u = signs @ Y / n``, the flipped mean is
+    ``u + c * d / n``, and the sum of squares around it is
+    ``sum(Y ** 2) - n * u ** 2 + 2 * c * (sum(Y) - u * d)
+    + c ** 2 * (n - d ** 2 / n)``.
+    """
+    _check_option('method', method, ['absolute', 'relative'])
+    n_samples = X.shape[0]
+    c = np.mean(X, axis=0)
+    Y = X - c
+    sum_y = np.sum(Y, axis=0)
+    ss_y = np.sum(Y * Y, axis=0)
+
+    def stat_fun(signs):
+        d = np.sum(signs, axis=1, keepdims=True)
+        u = np.dot(signs, Y)
+        u /= n_samples
+        var = sum_y - u * d
+        var *= 2 * c
+        var += ss_y
+        var -= n_samples * u * u
+        var += c * c * (n_samples - d * d / n_samples)
+        mean = u
+        mean += c * (d / n_samples)
+        var /= n_samples - 1
+        np.maximum(var, 0, out=var)  # guard against round-off
+        if sigma > 0:
+            var += (sigma * np.max(var, axis=1, keepdims=True)
+                    if method == 'relative' else sigma)
+        var /= n_samples
+        np.sqrt(var, out=var)
+        mean /= var
+        return mean
+    return stat_fun
+
+
+def _f_oneway_perms(X, slices):
+    """Get a function computing f_oneway of permuted group labels.
+
+    The returned function takes permutations of the rows of X, of shape
+    (n_perms, n_samples), and returns the F-values of each permutation of
+    shape (n_perms, n_tests), where ``X[order[sl]]`` is the group of each
+    slice in ``slices``. The group sums are computed together as matrix
+    products, and the total sums of squares do not depend on the order.
+    """
+    n_samples = X.shape[0]
+    n_classes = len(slices)
+    sum_alldata = np.sum(X, axis=0)
+    square_of_sums_alldata = sum_alldata ** 2 / float(n_samples)
+    sstot = np.sum(X * X, axis=0) - square_of_sums_alldata
+
+    def stat_fun(orders):
+        orders = np.asarray(orders)
+        ssbn = -square_of_sums_alldata
+        sums_rest = sum_alldata
+        for k, sl in enumerate(slices):
+            if k < n_classes - 1:
+                select = np.zeros((len(orders), n_samples))
+                select[np.arange(len(orders))[:, np.newaxis],
+                       orders[:, sl]] = 1.
+                sums = np.dot(select, X)
+                sums_rest = sums_rest - sums
+            else:  # the last group has the remaining sum
+                sums = sums_rest
+            ssbn = ssbn + sums ** 2 / float(sl.stop - sl.start)
+        sswn = sstot - ssbn
+        msb = ssbn / float(n_classes - 1)
+        msw = sswn / float(n_samples - n_classes)
+        return msb / msw
+    return stat_fun
+
+
 def _map_effects(n_factors, effects):
     """Map effects to indices."""
     if n_factors > len(ascii_uppercase):
@@ -34,6 +34,7 @@ def numba_conditional(monkeypatch, request):
             cluster_level, '_get_selves', cluster_level._get_selves_fallback)
         monkeypatch.setattr(
             cluster_level, '_where_first', cluster_level._where_first_fallback)
+        monkeypatch.setattr(cluster_level, '_use_union_find', False)
     if request.param == 'Numba' and not has_numba:
         pytest.skip('Numba not installed')
     yield request.param
@@ -272,6 +273,44 @@ def test_cluster_permutation_t_test(numba_conditional, stat_fun):
                 condition1, threshold=1, stat_fun=lambda x: stat_fun(x)[:-1])
 
 
+@pytest.mark.parametrize('stat_fun', [
+    ttest_1samp_no_p,
+    partial(ttest_1samp_no_p, sigma=1e-1),
+    partial(ttest_1samp_no_p, sigma=1e-2, method='absolute'),
+    f_oneway,
+])
+@pytest.mark.parametrize('offset', (0., 1e7))
+def test_batched_stat_fun(stat_fun, offset):
+    """Test computing the built-in statistics for many permutations."""
+    if stat_fun is f_oneway and offset:
+        pytest.skip('f_oneway itself uses one-pass sums of squares')
+    rng = np.random.RandomState(0)
+    X = rng.randn(12, 30) + offset  # a large offset needs a stable variance
+    if stat_fun is f_oneway:
+        slices = [slice(0, 3), slice(3, 8), slice(8, 12)]
+        orders = np.array([rng.permutation(len(X)) for _ in range(20)])
+        want = [stat_fun(*[X[order[s]] for s in slices]) for order in orders]
+    else:
+        slices = None
+        orders = 2. * rng.randint(0, 2, (20, len(X))) - 1
+        want = [stat_fun(X * signs[:, np.newaxis]) for signs in orders]
+    batch_stat_fun = cluster_level._get_batch_stat_fun(stat_fun, X, slices)
+    assert_allclose(batch_stat_fun(orders), want, rtol=1e-10, atol=1e-12)
+    # other statistics are computed one permutation at a time
+    assert cluster_level._get_batch_stat_fun(
+        lambda *args: stat_fun(*args), X, slices) is None
+    # which gives the same H0
+    X = X if slices is None else [X[s] for s in slices]
+    test = permutation_cluster_1samp_test if slices is None else \
+        permutation_cluster_test
+    with pytest.warns(None):  # threshold
+        H0 = test(X, threshold=1.5, n_permutations=50, tail=1, seed=0,
+                  stat_fun=stat_fun)[3]
+        H0_loop = test(X, threshold=1.5, n_permutations=50, tail=1, seed=0,
+                       stat_fun=lambda *args: stat_fun(*args))[3]
+    assert_allclose(H0, H0_loop, rtol=1e-10)
+
+
 def test_cluster_permutation_with_connectivity(numba_conditional):
     """Test cluster level permutations with connectivity matrix."""
     try:
@@ -433,6 +472,67 @@ def test_cluster_permutation_with_connectivity(numba_conditional):
                     buffer_size=None)
 
 
+@pytest.mark.parametrize('max_step, t_power', [(1, 1), (2, 1), (1, 2)])
+def test_union_find_clusters(monkeypatch, max_step, t_power):
+    """Test union-find cluster labeling against the other algorithms."""
+    rng = np.random.RandomState(0)
+    n_times, n_src = 6, 30
+    conn = sparse.diags([1, 1], [-1, 1], shape=(n_src, n_src))
+    conn = conn + sparse.coo_matrix(
+        (np.ones(5), (rng.randint(0, n_src, 5), rng.randint(0, n_src, 5))),
+        shape=(n_src, n_src))
+    x = rng.randn(n_times * n_src)
+    conn_st = cluster_level._setup_connectivity(conn, len(x), n_times)
+    assert isinstance(conn_st, cluster_level._Neighbors)
+    conn_full = cluster_level._setup_connectivity(
+        sparse.kron(sparse.eye(n_times), conn) +
+        sparse.kron(sparse.diags([1, 1], [-1, 1], shape=(n_times, n_times)),
+                    sparse.eye(n_src)), len(x), n_times)
+    for conn_, this_max_step in ((conn_st, max_step), (conn_full, 1)):
+        for thresh in (0.5, 1.5, 10.):
+            kwargs = dict(threshold=thresh, connectivity=conn_,
+                          max_step=this_max_step, t_power=t_power)
+            monkeypatch.setattr(cluster_level, '_use_union_find', False)
+            want = cluster_level._find_clusters(x, **kwargs)
+            monkeypatch.setattr(cluster_level, '_use_union_find', True)
+            got = cluster_level._find_clusters(x, **kwargs)
+            # the same clusters (with sorted indices)
+            assert len(got[0]) == len(want[0])
+            got_order = np.argsort([c[0] for c in got[0]])
+            want_order = np.argsort([np.min(c) for c in want[0]])
+            for gi, wi in zip(got_order, want_order):
+                assert_array_equal(got[0][gi], np.sort(want[0][wi]))
+            assert_allclose(got[1][got_order], want[1][want_order])
+
+
+@pytest.mark.parametrize('tail', [-1, 0, 1])
+def test_tfce_incremental(monkeypatch, tail):
+    """Test the incremental TFCE sweep against thresholding each step."""
+    rng = np.random.RandomState(0)
+    n_times, n_src = 6, 30
+    conn = sparse.diags([1, 1], [-1, 1], shape=(n_src, n_src))
+    x = rng.randn(n_times * n_src)
+    conn_st = cluster_level._setup_connectivity(conn, len(x), n_times)
+    threshold = dict(start=0, step=0.2 if tail >= 0 else -0.2, h_power=1.5,
+                     e_power=0.7)
+    partitions = np.repeat(np.arange(3), len(x) // 3)
+    include = rng.rand(len(x)) > 0.2
+    parts = dict(partitions=partitions, include=include)
+    for x_, conn_, kwargs in ((x, conn_st, dict(max_step=2)),
+                              (x, conn_st, parts),
+                              (x[:n_src], conn.tocoo(), dict()),
+                              (x.reshape(n_times, n_src), None, dict()),
+                              (x, None, parts), (x, False, parts)):
+        kwargs = dict(kwargs, threshold=threshold, tail=tail,
+                      connectivity=conn_)
+        monkeypatch.setattr(cluster_level, '_use_union_find', False)
+        want = cluster_level._find_clusters(x_, **kwargs)
+        monkeypatch.setattr(cluster_level, '_use_union_find', True)
+        got = cluster_level._find_clusters(x_, **kwargs)
+        assert len(got[0]) == len(want[0]) == x_.size
+        assert_allclose(got[1], want[1], rtol=1e-10, atol=1e-12)
+
+
 def test_permutation_connectivity_equiv(numba_conditional):
     """Test cluster level permutations with and without connectivity."""
     try:
@@ -599,6 +699,122 @@ def test_permutation_test_H0(numba_conditional):
         assert_equal(len(h0), 2 ** (7 - (tail == 0)))  # exact test
 
 
+def test_permutation_checkpoint(tmpdir, monkeypatch):
+    """Test resuming, extending, and merging H0 saved to a checkpoint."""
+    rng = np.random.RandomState(0)
+    data = rng.randn(10, 8, 3)
+    data[:, 2:5] += 1.
+    conn = sparse.diags([1, 1], [-1, 1], shape=(3, 3))
+    kwargs = dict(threshold=1., connectivity=conn, seed=0, max_step=2)
+    want = spatio_temporal_cluster_1samp_test(data, n_permutations=50,
+                                              **kwargs)
+    monkeypatch.setattr(cluster_level, '_CHECKPOINT_CHUNK', 20)
+    checkpoint = str(tmpdir.join('h0'))
+    with pytest.raises(ValueError, match='seed must be given'):
+        spatio_temporal_cluster_1samp_test(
+            data, n_permutations=30, checkpoint=checkpoint,
+            **dict(kwargs, seed=None))
+    kwargs['checkpoint'] = checkpoint
+    # an interrupted run, then extending it
+    h0 = spatio_temporal_cluster_1samp_test(data, n_permutations=30,
+                                            **kwargs)[3]
+    assert_allclose(h0, want[3][:30])
+    assert len(os.listdir(checkpoint)) == 2  # 20 + 9
+    with catch_logging() as log:
+        got = spatio_temporal_cluster_1samp_test(data, n_permutations=50,
+                                                 verbose=True, **kwargs)
+    assert 'Loaded 29 of 49 permutations' in log.getvalue()
+    assert len(os.listdir(checkpoint)) == 3  # + 20
+    for ii in (0, 2, 3):
+        assert_allclose(got[ii], want[ii])
+    assert len(got[1]) == len(want[1])
+
+    # everything is reused
+    def _perm_h0(*args, **kwargs):
+        raise RuntimeError('Should not be computed')
+
+    monkeypatch.setattr(cluster_level, '_perm_h0', _perm_h0)
+    assert_allclose(spatio_temporal_cluster_1samp_test(
+        data, n_permutations=50, **kwargs)[3], want[3])
+    monkeypatch.undo()
+    # merging chunks of a run with another seed
+    kwargs['seed'] = 1
+    other = spatio_temporal_cluster_1samp_test(data, n_permutations=11,
+                                               **kwargs)
+    assert len(other[3]) == 11 + 49
+    kwargs['seed'] = 0
+    got = spatio_temporal_cluster_1samp_test(data, n_permutations=50,
+                                             **kwargs)
+    assert_allclose(got[3][:50], want[3])
+    assert_allclose(got[3][50:], other[3][1:11])
+    assert_allclose(got[2], other[2])
+    # independent samples and exact tests
+    X = [data[:5], data[5:] - 1.]
+    want = spatio_temporal_cluster_test(X, n_permutations=20,
+                                        **dict(kwargs, checkpoint=None))[3]
+    for _ in range(2):  # computed, then loaded
+        assert_allclose(want, spatio_temporal_cluster_test(
+            X, n_permutations=20, **kwargs)[3])
+    got = spatio_temporal_cluster_1samp_test(data[:4], n_permutations=1024,
+                                             **kwargs)[3]
+    assert len(got) == 8
+    assert_allclose(got, spatio_temporal_cluster_1samp_test(
+        data[:4], n_permutations=1024, **kwargs)[3])
+
+
+def test_permutation_shared_jobs(tmpdir, monkeypatch):
+    """Test permutations in processes that share memory-mapped data."""
+    monkeypatch.setenv('MNE_CACHE_DIR', str(tmpdir))
+    rng = np.random.RandomState(0)
+    data = rng.randn(10, 8, 3)
+    data[:, 2:5] += 1.
+    conn = sparse.diags([1, 1], [-1, 1], shape=(3, 3))
+    full = cluster_level._setup_connectivity(
+        sparse.kron(sparse.eye(8), conn) +
+        sparse.kron(sparse.diags([1, 1], [-1, 1], shape=(8, 8)),
+                    sparse.eye(3)), 24, 8)
+    for func, X, kwargs in (
+            (spatio_temporal_cluster_1samp_test, data,
+             dict(connectivity=conn, spatial_exclude=[2])),
+            (spatio_temporal_cluster_test, [data[:5], data[5:] - 1.],
+             dict(connectivity=conn, threshold=dict(start=0, step=1.))),
+            (permutation_cluster_1samp_test, data.reshape(10, -1),
+             dict(connectivity=full)),
+            (permutation_cluster_1samp_test, data, dict())):
+        kwargs.update(n_permutations=50, seed=0)
+        want = func(X, n_jobs=1, **kwargs)
+        with catch_logging() as log:
+            got = func(X, n_jobs=2, verbose=True, **kwargs)
+        assert 'Computed 49 permutations' in log.getvalue()
+        if check_version('joblib', '0.8') and not _force_serial:
+            assert 'using 2 jobs' in log.getvalue()
+        assert_allclose(got[2], want[2])
+        assert_allclose(got[3], want[3])
+        assert os.listdir(str(tmpdir)) == []
+
+
+@pytest.mark.skipif(not check_version('joblib', '0.8') or _force_serial,
+                    reason='Requires joblib and parallel processing')
+def test_permutation_shared_spawn(tmpdir, monkeypatch):
+    """Test permutations in spawned processes with a lambda stat_fun."""
+    from joblib import parallel_backend
+    monkeypatch.setenv('MNE_CACHE_DIR', str(tmpdir))
+    rng = np.random.RandomState(0)
+    data = rng.randn(10, 8, 3)
+    data[:, 2:5] += 1.
+    kwargs = dict(n_permutations=50, seed=0, threshold=1.,
+                  stat_fun=lambda x: ttest_1samp_no_p(x, sigma=1e-3))
+    want = permutation_cluster_1samp_test(data, n_jobs=1, **kwargs)
+    with parallel_backend('loky'):  # spawns fresh processes
+        with catch_logging() as log:
+            got = permutation_cluster_1samp_test(data, n_jobs=2, verbose=True,
+                                                 **kwargs)
+    assert 'using 2 jobs' in log.getvalue()
+    assert_allclose(got[2], want[2])
+    assert_allclose(got[3], want[3])
+    assert os.listdir(str(tmpdir)) == []
+
+
 def test_tfce_thresholds(numba_conditional):
     """Test TFCE thresholds."""
     rng = np.random.RandomState(0)
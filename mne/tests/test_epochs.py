@@ -29,7 +29,7 @@ from mne.preprocessing import maxwell_filter
 from mne.epochs import (
     bootstrap, equalize_epoch_counts, combine_event_ids, add_channels_epochs,
     EpochsArray, concatenate_epochs, BaseEpochs, average_movements,
-    _handle_event_repeated)
+    _handle_event_repeated, _is_good, _is_good_batch)
 from mne.utils import (requires_pandas, run_tests_if_main, object_diff,
                        requires_version, catch_logging, _FakeNoPandas,
                        assert_meg_snr, check_version, _dt_to_stamp)
@@ -2209,6 +2209,89 @@ def test_add_channels_epochs():
                   [epochs_meg2, epochs_eeg])
 
 
+def test_epochs_from_preloaded_raw(tmpdir):
+    """Test gathering epochs from preloaded raw data at once."""
+    info = create_info(['a', 'b', 'c', 'd'], 1000., ['eeg'] * 3 + ['stim'])
+    raw = RawArray(rng.randn(4, 20000) * 1e-5, info, first_samp=100)
+    raw.set_annotations(Annotations(
+        [3., 3.2, 10., 15.5], [0.5, 2., 1., 0.], ['BAD_a', 'bad_b', 'good',
+                                                  'BAD_c'], orig_time=None))
+    fname = op.join(str(tmpdir), 'test_raw.fif')
+    raw.save(fname)
+    events = make_fixed_length_events(raw, duration=0.07)
+    # too early, too late, and out of order
+    events = np.concatenate([[[raw.first_samp + 10, 0, 1]], events[::-1],
+                             [[raw.last_samp - 50, 0, 1]]])
+    events[:, 2] = 1
+    for kwargs in (dict(), dict(reject=dict(eeg=4e-5)),
+                   dict(detrend=1, baseline=None, picks=[0, 2]),
+                   dict(reject_by_annotation=False, tmax=0.41)):
+        kwargs = dict(dict(tmin=-0.1, tmax=0.3), **kwargs)
+        with pytest.warns(RuntimeWarning, match='chronologically'):
+            epochs = Epochs(read_raw_fif(fname, preload=True), events,
+                            preload=True, **kwargs)
+        with pytest.warns(RuntimeWarning, match='chronologically'):
+            epochs_disk = Epochs(read_raw_fif(fname), events, preload=True,
+                                 **kwargs)
+        assert epochs.drop_log == epochs_disk.drop_log
+        assert_array_equal(epochs.get_data(), epochs_disk.get_data())
+        reasons = {log[0] for log in epochs.drop_log if len(log)}
+        assert {'NO_DATA', 'TOO_SHORT'} <= reasons
+        assert ({'BAD_a', 'bad_b', 'BAD_c'} <= reasons) == \
+            kwargs.get('reject_by_annotation', True)
+
+
+def test_is_good_batch():
+    """Test checking the rejection criteria of many epochs at once."""
+    info = create_info(['a', 'b', 'c', 'd', 'e'], 1000.,
+                       ['eeg', 'eeg', 'eog', 'eeg', 'stim'])
+    info['bads'] = ['d']
+    data = rng.randn(500, 5, 100) * 1e-5
+    data[::7, 1] *= 1e-3
+    data[::11, 2] *= 10
+    epochs = EpochsArray(data, info)
+    kwargs = dict(ch_names=epochs.ch_names,
+                  channel_type_idx=epochs._channel_type_idx,
+                  reject=dict(eeg=9e-5, eog=2e-4), flat=dict(eeg=1e-6),
+                  ignore_chs=info['bads'])
+    reasons = _is_good_batch(data, **kwargs)
+    n_bad = 0
+    for epoch, reason in zip(data, reasons):
+        is_good, want = _is_good(epoch, full_report=True, **kwargs)
+        assert is_good == (reason is None)
+        assert reason == want
+        n_bad += not is_good
+    assert 100 < n_bad < 500
+    epochs.drop_bad(reject=kwargs['reject'], flat=kwargs['flat'])
+    assert [log for log in epochs.drop_log] == \
+        [reason or [] for reason in reasons]
+    assert _is_good_batch(data, **dict(kwargs, reject=None, flat=None)) == \
+        [None] * len(data)
+
+
+@pytest.mark.parametrize('fmt', ('single', 'double'))
+def test_read_epochs_lazy(fmt, tmpdir):
+    """Test reading batches of non-preloaded epochs from disk."""
+    info = create_info(['a', 'b', 'c', 'd'], 1000., ['eeg'] * 3 + ['stim'])
+    info['lowpass'] = 100.
+    raw = RawArray(rng.randn(4, 20000) * 1e-5, info)
+    raw.set_eeg_reference(projection=True)
+    events = np.c_[np.arange(100, 19000, 89), np.zeros(213, int),
+                   np.ones(213, int)]
+    epochs = Epochs(raw, events, tmin=-0.05, tmax=0.2, baseline=None,
+                    detrend=1, decim=2, preload=True)
+    fname = op.join(str(tmpdir), 'test-epo.fif')
+    epochs.save(fname, fmt=fmt)
+    epochs = read_epochs(fname, preload=True)
+    epochs_lazy = read_epochs(fname, preload=False)
+    assert_allclose(epochs_lazy.get_data(), epochs.get_data(), atol=1e-20)
+    for item in (rng.permutation(len(epochs))[:50], slice(3, 40, 2), [7]):
+        assert_array_equal(epochs_lazy.get_data(item=item),
+                           epochs_lazy.get_data()[item])
+    assert_array_equal(epochs_lazy[17].get_data(),
+                       epochs_lazy.get_data()[17:18])
+
+
 def test_array_epochs(tmpdir):
     """Test creating epochs from array."""
     tempdir = str(tmpdir)
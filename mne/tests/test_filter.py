@@ -7,14 +7,17 @@ from numpy.testing import (assert_array_almost_equal, assert_almost_equal,
 import pytest
 from scipy.signal import resample as sp_resample, butter, freqz
 
-from mne import create_info
-from mne.fixes import _sosfreqz, fft, fftfreq
+from mne import create_info, Annotations, EpochsArray
+from mne.fixes import _sosfreqz, fft, fftfreq, rfft, irfft
 from mne.io import RawArray, read_raw_fif
 from mne.io.pick import _DATA_CH_TYPES_SPLIT
 from mne.filter import (filter_data, resample, _resample_stim_channels,
                         construct_iir_filter, notch_filter, detrend,
                         _overlap_add_filter, _smart_pad, design_mne_c_filter,
-                        estimate_ringing_samples, create_filter, _Interp2)
+                        estimate_ringing_samples, create_filter, _Interp2,
+                        _OverlapAddStream, fir_cache_info, fir_cache_clear,
+                        _1d_overlap_filter, _setup_overlap_add, _IIRStream,
+                        _PolyphaseStream, _MTSpectrumStream)
 
 from mne.utils import (sum_squared, run_tests_if_main,
                        catch_logging, requires_version, _TempDir,
@@ -235,6 +238,56 @@ def test_notch_filters():
         assert_almost_equal(new_power, orig_power, tol)
 
 
+def test_notch_spectrum_fit_windows(tmpdir):
+    """Test spectrum_fit notch filtering in sliding windows and streamed."""
+    rng = np.random.RandomState(0)
+    sfreq = 250.
+    t = np.arange(int(60 * sfreq)) / sfreq
+    noise = rng.randn(4, len(t)) * 1e-5
+    amps = np.arange(1, 5)[:, np.newaxis] * 1e-5
+    data = noise + amps * np.sin(2 * np.pi * 60 * t + rng.rand(4, 1))
+    orig_power = np.sqrt(np.mean(noise ** 2, axis=1))
+    for line_freqs in ([60.], None):
+        for filter_length in ('auto', '10s', 2000):
+            out = notch_filter(data, sfreq, line_freqs, filter_length,
+                               notch_widths=0.01, method='spectrum_fit')
+            assert_allclose(np.sqrt(np.mean(out ** 2, axis=1)), orig_power,
+                            rtol=1e-3)
+    with pytest.raises(ValueError, match='human-readable'):
+        notch_filter(data, sfreq, [60.], '10 sec', method='spectrum_fit')
+    # the windows are the same when processed piece by piece
+    want = notch_filter(data, sfreq, [60.], '5s', method='spectrum_fit')
+    stream = _MTSpectrumStream(len(t), sfreq, [60.], [0.3], None, 0.05,
+                               1250)
+    assert stream.n_window == 1250
+    assert_allclose(np.diff(stream.starts), 625)
+
+    def read(start, stop):
+        return data[:, start:stop]
+
+    got = np.concatenate([stream(read, start, min(start + 999, len(t)))
+                          for start in range(0, len(t), 999)], axis=1)
+    assert_allclose(got, want, rtol=0, atol=1e-20)
+    assert_allclose(stream(read, 10, 20), want[:, 10:20], rtol=0, atol=1e-20)
+    # and when streaming (not preloaded) raw data to disk
+    info = create_info(['a', 'b', 'c', 'd'], sfreq, 'eeg')
+    fname = op.join(str(tmpdir), 'test_raw.fif')
+    RawArray(data, info).save(fname, buffer_size_sec=1.)
+    out_fname = op.join(str(tmpdir), 'test_notch_raw.fif')
+    raw = read_raw_fif(fname)
+    raw_notch = raw.notch_filter(None, method='spectrum_fit',
+                                 fname=out_fname)
+    assert not raw.preload
+    want = notch_filter(raw.get_data(), sfreq, None, '10s',
+                        method='spectrum_fit')
+    atol = 1e-6 * np.abs(want).max()  # single precision
+    assert_allclose(raw_notch.get_data(), want, rtol=0, atol=atol)
+    raw_notch = raw.notch_filter(60., picks=[0, 1], fname=out_fname,
+                                 overwrite=True)
+    want = raw.copy().load_data().notch_filter(60., picks=[0, 1]).get_data()
+    assert_allclose(raw_notch.get_data(), want, rtol=0, atol=atol)
+
+
 def test_resample():
     """Test resampling."""
     x = rng.normal(0, 1, (10, 10, 10))
@@ -285,6 +338,25 @@ def test_n_jobs(n_jobs):
     assert_allclose(y1, y2)
 
 
+@pytest.mark.parametrize('phase', ('zero', 'zero-double', 'linear'))
+@pytest.mark.parametrize('pad', ('reflect_limited', 'edge'))
+def test_overlap_add_2d(phase, pad):
+    """Test multichannel overlap-add filtering against row by row."""
+    x = np.random.RandomState(0).randn(5, 1000)
+    h = create_filter(x, 100., 5., 40., phase=phase, fir_design='firwin',
+                      l_trans_bandwidth=5.)
+    h_eff, n_edge, n_fft = _setup_overlap_add(h, x.shape[1], 512, phase)
+    cuda_dict = dict(n_fft=n_fft, rfft=rfft, irfft=irfft,
+                     h_fft=rfft(h_eff, n=n_fft))
+    want = np.array([_1d_overlap_filter(xx, len(h_eff), n_edge, phase,
+                                        cuda_dict, pad, n_fft) for xx in x])
+    for n_jobs in (1, 3):
+        got = _overlap_add_filter(x, h, 512, phase, picks=[0, 1, 3, 4],
+                                  n_jobs=n_jobs, pad=pad)
+        assert_allclose(got[[0, 1, 3, 4]], want[[0, 1, 3, 4]], atol=1e-12)
+        assert_array_equal(got[2], x[2])
+
+
 def test_resamp_stim_channel():
     """Test resampling of stim channels."""
     # Downsampling
@@ -322,6 +394,62 @@ def test_resample_raw():
     assert data.shape == (1, 63)
 
 
+@pytest.mark.parametrize('up, down', [(1, 20), (3, 10), (5, 3), (2, 1)])
+def test_resample_polyphase(up, down):
+    """Test polyphase resampling against SciPy."""
+    from scipy.signal import resample_poly
+    x = np.random.RandomState(0).randn(3, 1001)
+    y = resample(x, up, down, method='polyphase', pad='constant')
+    assert y.shape == (3, int(round(1001 * up / down)))
+    assert_allclose(y, resample_poly(x, up, down, axis=-1)[:, :y.shape[1]],
+                    atol=1e-12)
+    y = resample(x, up, down, method='polyphase')
+    assert_allclose(resample(x, up, down, method='polyphase', n_jobs=2), y)
+    # along another axis, piece by piece
+    assert_allclose(resample(x.T, up, down, axis=0, method='polyphase'), y.T)
+    stream = _PolyphaseStream(x.shape[1], up, down, 'reflect_limited')
+    y_chunks = [stream(lambda start, stop: x[:, start:stop], start,
+                       min(start + 17, stream.n_out))
+                for start in range(0, stream.n_out, 17)]
+    assert_allclose(np.concatenate(y_chunks, axis=1), y, atol=1e-12)
+    # low frequencies are preserved, and samples stay aligned
+    x = np.sin(2 * np.pi * 5 * np.arange(1001) / 1000.)
+    y = resample(x, up, down, method='polyphase')
+    t = np.arange(len(y)) * down / (1000. * up)
+    assert_allclose(y[20:-20], np.sin(2 * np.pi * 5 * t)[20:-20], atol=1e-3)
+    with pytest.raises(ValueError, match='ratio of integers'):
+        resample(x, 1, np.pi, method='polyphase')
+    with pytest.warns(RuntimeWarning, match='npad, window are not used'):
+        resample(x, up, down, npad=0, window='hann', method='polyphase')
+
+
+def test_resample_raw_polyphase(tmpdir):
+    """Test polyphase resampling of (not preloaded) raw data."""
+    rng = np.random.RandomState(0)
+    n_times = 60000
+    stim = np.zeros(n_times)
+    stim[rng.randint(0, n_times, 20)] = rng.randint(1, 5, 20)
+    data = np.concatenate([rng.randn(2, n_times) * 1e-5, stim[np.newaxis]])
+    info = create_info(['a', 'b', 'STI'], 6000., ['eeg', 'eeg', 'stim'])
+    fname = op.join(str(tmpdir), 'test_raw.fif')
+    RawArray(data, info).save(fname)
+    raw = read_raw_fif(fname)
+    raw_want = read_raw_fif(fname, preload=True)
+    want = resample(raw_want.get_data(), 1, 6, method='polyphase')
+    want[2] = _resample_stim_channels(raw_want.get_data()[2], 1, 6)
+    raw.resample(1000., method='polyphase')
+    assert raw.preload
+    assert raw.info['sfreq'] == 1000.
+    assert_allclose(raw.get_data(), want, atol=1e-20)
+    assert_array_equal(raw.get_data()[2], want[2])
+    raw_want.resample(1000., method='polyphase')
+    assert_array_equal(raw.get_data(), raw_want.get_data())
+    with pytest.raises(ValueError, match='Invalid value'):
+        raw.resample(100., method='foo')
+    with pytest.warns(RuntimeWarning, match='n_jobs is not used'):
+        raw.resample(500., method='polyphase', n_jobs=2)
+
+
 @pytest.mark.slowtest
 def test_filters():
     """Test low-, band-, high-pass, and band-stop filters plus resampling."""
@@ -496,6 +624,33 @@ def test_filter_auto():
         filter_data(1j, 1000., None, 40.)
 
 
+def test_filter_cache():
+    """Test caching of FIR filter designs and their FFTs."""
+    fir_cache_clear()
+    x = rng.randn(3, 4000)
+    x_filt = filter_data(x, 1000., 1., 40.)
+    info = fir_cache_info()
+    assert (info['design'].misses, info['design'].hits) == (1, 0)
+    assert (info['fft'].misses, info['fft'].hits) == (1, 0)
+    for _ in range(3):
+        assert_array_equal(filter_data(x, 1000., 1., 40.), x_filt)
+    info = fir_cache_info()
+    assert (info['design'].misses, info['design'].hits) == (1, 3)
+    assert (info['fft'].misses, info['fft'].hits) == (1, 3)
+    # the shared filter cannot be modified through the returned one
+    h = create_filter(x, 1000., 1., 40.)
+    h[:] = 0.
+    assert_array_equal(filter_data(x, 1000., 1., 40.), x_filt)
+    # warnings are still emitted when the design comes from the cache
+    for _ in range(2):
+        with pytest.warns(RuntimeWarning, match='Attenuation'):
+            create_filter(x, 1000., None, 40., filter_length=11,
+                          fir_design='firwin2')
+    assert fir_cache_info()['design'].hits == 6
+    fir_cache_clear()
+    assert fir_cache_info()['design'].currsize == 0
+
+
 def test_cuda_fir():
     """Test CUDA-based filtering."""
     # Using `n_jobs='cuda'` on a non-CUDA system should be fine,
@@ -758,4 +913,97 @@ def test_filter_picks():
                 assert_allclose(raw.get_data(), want)
 
 
+@pytest.mark.parametrize('phase', ('zero', 'zero-double', 'minimum'))
+@pytest.mark.parametrize('pad', ('reflect_limited', 'edge', 'constant'))
+@pytest.mark.parametrize('n_times', (100, 5001))
+def test_overlap_add_stream(phase, pad, n_times):
+    """Test computing overlap-add filtered samples on demand."""
+    x = np.random.RandomState(0).randn(2, n_times)
+    h = create_filter(x, 1000., 1., 40., phase=phase, verbose='error')
+    want = _overlap_add_filter(x.copy(), h, phase=phase, pad=pad)
+    stream = _OverlapAddStream(h, n_times, phase, pad)
+
+    def read(start, stop):
+        assert 0 <= start < stop <= n_times
+        return x[:, start:stop]
+
+    # sequentially and in random order
+    bounds = np.unique(np.concatenate([
+        [0, n_times], np.random.RandomState(0).randint(0, n_times, 10)]))
+    for order in (slice(None), slice(None, None, -1)):
+        got = np.empty_like(x)
+        for start, stop in list(zip(bounds[:-1], bounds[1:]))[order]:
+            got[:, start:stop] = stream(read, start, stop)
+        assert_array_equal(got, want)
+    with pytest.raises(ValueError, match='without preloading'):
+        _OverlapAddStream(h, n_times, phase, 'mean')
+
+
+@pytest.mark.parametrize('output', ('sos', 'ba'))
+@pytest.mark.parametrize('l_freq, h_freq',
+                         [(1., None), (None, 40.), (8., 12.)])
+def test_iir_stream(output, l_freq, h_freq):
+    """Test chunked zero-phase IIR filtering."""
+    x = np.random.RandomState(0).randn(3, 30000)
+    iir_params = dict(output=output, order=2, ftype='butter')
+    iir_params = create_filter(x, 1000., l_freq, h_freq, method='iir',
+                               iir_params=iir_params)
+    want = filter_data(x, 1000., l_freq, h_freq, method='iir',
+                       iir_params=iir_params)
+    stream = _IIRStream(iir_params, x.shape[1])
+    assert stream.n_block < x.shape[1]
+
+    def read(start, stop):
+        return x[:, start:stop]
+
+    got = np.concatenate([stream(read, start, min(start + 1000, 30000))
+                          for start in range(0, 30000, 1000)], axis=1)
+    assert_allclose(got, want, rtol=0, atol=1e-9)
+    # seeking backward
+    assert_allclose(stream(read, 10, 20), want[:, 10:20], rtol=0, atol=1e-9)
+    # the end of the signal does not depend on the block boundaries
+    assert_allclose(stream(read, 29000, 30000), want[:, 29000:], atol=1e-12)
+
+
+def test_filter_raw_to_file(tmpdir):
+    """Test filtering non-preloaded raw data straight to disk."""
+    data = np.random.RandomState(0).randn(3, 20000) * 1e-5
+    info = create_info(['a', 'b', 'c'], 1000., ['eeg', 'eeg', 'stim'])
+    raw = RawArray(data, info)
+    raw.set_annotations(Annotations([5.], [0.5], ['bad_acq_skip']))
+    fname = op.join(str(tmpdir), 'test_raw.fif')
+    raw.save(fname, buffer_size_sec=0.5)
+    out_fname = op.join(str(tmpdir), 'test_filt_raw.fif')
+    want_fname = op.join(str(tmpdir), 'test_want_raw.fif')
+    for kwargs in (dict(l_freq=1., h_freq=40.),
+                   dict(l_freq=None, h_freq=100., phase='minimum', picks=[1])):
+        raw = read_raw_fif(fname)
+        orig = raw.get_data()
+        raw_filt = raw.filter(fname=out_fname, overwrite=True, **kwargs)
+        assert not raw.preload
+        assert_array_equal(raw.get_data(), orig)  # unchanged
+        raw.copy().load_data().filter(**kwargs).save(want_fname,
+                                                     overwrite=True)
+        raw_want = read_raw_fif(want_fname)
+        assert_array_equal(raw_filt.get_data(), raw_want.get_data())
+        assert_array_equal(raw_filt.annotations.onset,
+                           raw_want.annotations.onset)
+        for key in ('lowpass', 'highpass'):
+            assert raw_filt.info[key] == raw_want.info[key]
+    # IIR filtering matches up to the decay of the filter ringing
+    raw = read_raw_fif(fname)
+    raw_filt = raw.filter(1., 40., method='iir', fname=out_fname,
+                          overwrite=True)
+    assert not raw.preload
+    raw.copy().load_data().filter(1., 40., method='iir').save(
+        want_fname, overwrite=True)
+    want = read_raw_fif(want_fname).get_data()
+    assert_allclose(raw_filt.get_data(), want, rtol=0,
+                    atol=1e-6 * np.abs(want).max())  # single precision
+    with pytest.raises(IOError, match='exists'):
+        raw.filter(1., None, fname=out_fname)
+    with pytest.raises(TypeError, match='raw data'):
+        EpochsArray(data[np.newaxis], info).filter(1., None, fname=out_fname)
+
+
 run_tests_if_main()
@@ -1,7 +1,8 @@
 """Time frequency analysis tools."""
 
 from .tfr import (morlet, tfr_morlet, AverageTFR, tfr_multitaper, _BaseTFR,
-                  read_tfrs, write_tfrs, EpochsTFR, tfr_array_morlet)
+                  read_tfrs, write_tfrs, EpochsTFR, tfr_array_morlet,
+                  TFRAccumulator)
 from .psd import psd_welch, psd_multitaper, psd_array_welch
 from .csd import (CrossSpectralDensity, csd_fourier, csd_multitaper,
                   csd_morlet, csd_array_fourier, csd_array_multitaper,
@@ -3,15 +3,18 @@
 #
 # License : BSD 3-clause
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from functools import lru_cache
 import math
 import numpy as np
-from scipy import fftpack
+from numpy.lib.stride_tricks import as_strided
 # XXX explore cuda optimization at some point.
 
+from ..fixes import fft, ifft, fftfreq
 from ..io.pick import _pick_data_channels, pick_info
-from ..utils import verbose, warn, fill_doc
-from ..parallel import parallel_func, check_n_jobs
+from ..utils import verbose, warn, fill_doc, logger
+from ..parallel import check_n_jobs
 from .tfr import AverageTFR, _get_data
 
 
@@ -42,7 +45,7 @@ def _check_input_st(x_in, n_fft):
 
 def _precompute_st_windows(n_samp, start_f, stop_f, sfreq, width):
     """Precompute stockwell Gaussian windows (in the freq domain)."""
-    tw = fftpack.fftfreq(n_samp, 1. / sfreq) / n_samp
+    tw = fftfreq(n_samp, 1. / sfreq) / n_samp
     tw = np.r_[tw[:1], tw[1:][::-1]]
 
     k = width  # 1 for classical stowckwell transform
@@ -55,7 +58,15 @@ def _precompute_st_windows(n_samp, start_f, stop_f, sfreq, width):
             window = ((f / (np.sqrt(2. * np.pi) * k)) *
                       np.exp(-0.5 * (1. / k ** 2.) * (f ** 2.) * tw ** 2.))
         window /= window.sum()  # normalisation
-        windows[i_f] = fftpack.fft(window)
+        windows[i_f] = fft(window)
+    return windows
+
+
+@lru_cache(maxsize=4)
+def _get_st_windows(n_samp, start_f, stop_f, sfreq, width):
+    """Get a cached, read-only bank of Stockwell windows."""
+    windows = _precompute_st_windows(n_samp, start_f, stop_f, sfreq, width)
+    windows.flags.writeable = False
     return windows
 
 
@@ -64,37 +75,55 @@ def _st(x, start_f, windows):
     n_samp = x.shape[-1]
     ST = np.empty(x.shape[:-1] + (len(windows), n_samp), dtype=np.complex)
     # do the work
-    Fx = fftpack.fft(x)
+    Fx = fft(x)
     XF = np.concatenate([Fx, Fx], axis=-1)
     for i_f, window in enumerate(windows):
         f = start_f + i_f
-        ST[..., i_f, :] = fftpack.ifft(XF[..., f:f + n_samp] * window)
+        ST[..., i_f, :] = ifft(XF[..., f:f + n_samp] * window)
     return ST
 
 
-def _st_power_itc(x, start_f, compute_itc, zero_pad, decim, W):
-    """Aux function."""
-    n_samp = x.shape[-1]
+def _st_power_itc(x, start_f, compute_itc, zero_pad, decim, W, out=None):
+    """Aux function.
+
+    The frequencies are processed in blocks so that only a
+    (n_epochs, n_block, n_samp) slab of the S-transform exists at a time,
+    and only the retained (decimated) time samples are inverse transformed.
+    """
+    n_epochs, n_samp = x.shape
     n_out = (n_samp - zero_pad)
     n_out = n_out // decim + bool(n_out % decim)
-    psd = np.empty((len(W), n_out))
-    itc = np.empty_like(psd) if compute_itc else None
-    X = fftpack.fft(x)
+    if out is None:
+        psd = np.empty((len(W), n_out))
+        itc = np.empty_like(psd) if compute_itc else None
+    else:
+        psd, itc = out
+    X = fft(x)
     XX = np.concatenate([X, X], axis=-1)
-    for i_f, window in enumerate(W):
-        f = start_f + i_f
-        ST = fftpack.ifft(XX[:, f:f + n_samp] * window)
-        if zero_pad > 0:
-            TFR = ST[:, :-zero_pad:decim]
+    # XX_win[:, f] is a view of XX[:, f:f + n_samp]
+    XX_win = as_strided(XX, (n_epochs, n_samp + 1, n_samp),
+                        XX.strides + XX.strides[-1:], writeable=False)
+    # when the length splits evenly, decimation in time is done by folding
+    # the spectrum, which needs an inverse FFT of only n_samp // decim points
+    fold = decim > 1 and n_samp % decim == 0
+    n_block = max(2 ** 18 // (n_epochs * n_samp), 1)  # ~4 MB of complex
+    for f_start in range(0, len(W), n_block):
+        f_stop = min(f_start + n_block, len(W))
+        f = start_f + f_start
+        Y = XX_win[:, f:f + f_stop - f_start] * W[f_start:f_stop]
+        if fold:
+            Y = Y.reshape(Y.shape[:2] + (decim, n_samp // decim)).sum(axis=2)
+            Y /= decim
+            TFR = ifft(Y)[..., :n_out]
         else:
-            TFR = ST[:, ::decim]
+            TFR = ifft(Y)[..., :n_samp - zero_pad:decim]
         TFR_abs = np.abs(TFR)
         TFR_abs[TFR_abs == 0] = 1.
         if compute_itc:
             TFR /= TFR_abs
-            itc[i_f] = np.abs(np.mean(TFR, axis=0))
+            itc[f_start:f_stop] = np.abs(np.mean(TFR, axis=0))
         TFR_abs *= TFR_abs
-        psd[i_f] = np.mean(TFR_abs, axis=0)
+        psd[f_start:f_stop] = np.mean(TFR_abs, axis=0)
     return psd, itc
 
 
@@ -172,7 +201,7 @@ def tfr_array_stockwell(data, sfreq, fmin=None, fmax=None, n_fft=None,
     n_out = data.shape[2] // decim + bool(data.shape[2] % decim)
     data, n_fft_, zero_pad = _check_input_st(data, n_fft)
 
-    freqs = fftpack.fftfreq(n_fft_, 1. / sfreq)
+    freqs = fftfreq(n_fft_, 1. / sfreq)
     if fmin is None:
         fmin = freqs[freqs > 0][0]
     if fmax is None:
@@ -182,19 +211,30 @@ def tfr_array_stockwell(data, sfreq, fmin=None, fmax=None, n_fft=None,
     stop_f = np.abs(freqs - fmax).argmin()
     freqs = freqs[start_f:stop_f]
 
-    W = _precompute_st_windows(data.shape[-1], start_f, stop_f, sfreq, width)
+    W = _get_st_windows(data.shape[-1], int(start_f), int(stop_f),
+                        float(sfreq), float(width))
     n_freq = stop_f - start_f
     psd = np.empty((n_channels, n_freq, n_out))
     itc = np.empty((n_channels, n_freq, n_out)) if return_itc else None
 
-    parallel, my_st, _ = parallel_func(_st_power_itc, n_jobs)
-    tfrs = parallel(my_st(data[:, c, :], start_f, return_itc, zero_pad,
-                          decim, W)
-                    for c in range(n_channels))
-    for c, (this_psd, this_itc) in enumerate(iter(tfrs)):
-        psd[c] = this_psd
-        if this_itc is not None:
-            itc[c] = this_itc
+    # The FFTs and the elementwise NumPy operations release the GIL, so the
+    # channels are processed by threads that all share the window bank and
+    # write straight into the output arrays.
+    def _st_channel(c):
+        _st_power_itc(data[:, c, :], start_f, return_itc, zero_pad, decim, W,
+                      out=(psd[c], itc[c] if return_itc else None))
+
+    n_jobs = min(check_n_jobs(n_jobs), n_channels)
+    if n_jobs > 1:
+        logger.info('Computing Stockwell TFR of %d channels using %d threads'
+                    % (n_channels, n_jobs))
+        with ThreadPoolExecutor(n_jobs) as executor:
+            for future in [executor.submit(_st_channel, c)
+                           for c in range(n_channels)]:
+                future.result()  # re-raise any errors
+    else:
+        for c in range(n_channels):
+            _st_channel(c)
 
     return psd, itc, freqs
 
@@ -226,7 +266,7 @@ def tfr_stockwell(inst, fmin=None, fmax=None, n_fft=None,
     return_itc : bool
         Return intertrial coherence (ITC) as well as averaged power.
     n_jobs : int
-        The number of jobs to run in parallel (over channels).
+        The number of threads to run in parallel (over channels).
     %(verbose)s
 
     Returns
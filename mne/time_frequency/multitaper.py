@@ -3,7 +3,9 @@
 
 # Parts of this code were copied from NiTime http://nipy.sourceforge.net/nitime
 
+from functools import lru_cache
 import operator
+
 import numpy as np
 
 from ..fixes import _get_dpss, rfft, irfft, rfftfreq
@@ -58,13 +60,46 @@ def dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
     Slepian, D. Prolate spheroidal wave functions, Fourier analysis, and
     uncertainty V: The discrete case. Bell System Technical Journal,
     Volume 57 (1978), 1371430
+
+    The most recently used windows (of moderate size) are cached, so
+    repeated calls with the same parameters are fast.
     """
+    dpss, eigvals = _dpss_windows(N, half_nbw, Kmax, low_bias, interp_from,
+                                  interp_kind)
+    return np.array(dpss), np.array(eigvals)
+
+
+# DPSS windows with at most this many samples (over all tapers) are cached
+_DPSS_CACHE_MAX_SIZE = 2 ** 20
+
+
+def _dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
+                  interp_kind='linear'):
+    """Get (possibly cached and read-only) DPSS windows, see dpss_windows."""
+    args = (operator.index(N), float(half_nbw), operator.index(Kmax),
+            interp_from, interp_kind)
+    if args[0] * args[2] <= _DPSS_CACHE_MAX_SIZE:
+        dpss, eigvals = _compute_dpss_cached(*args)
+    else:
+        dpss, eigvals = _compute_dpss(*args)
+    if low_bias:
+        idx = (eigvals > 0.9)
+        if not idx.any():
+            warn('Could not properly use low_bias, keeping lowest-bias taper')
+            idx = [np.argmax(eigvals)]
+        dpss, eigvals = dpss[idx], eigvals[idx]
+    assert len(dpss) > 0  # should never happen
+    return dpss, eigvals
+
+
+def _compute_dpss(N, half_nbw, Kmax, interp_from, interp_kind):
+    """Compute the (read-only) DPSS windows and their eigenvalues."""
     from scipy import interpolate
     from ..filter import next_fast_len
     # This np.int32 business works around a weird Windows bug, see
     # gh-5039 and https://github.com/scipy/scipy/pull/8608
-    Kmax = np.int32(operator.index(Kmax))
-    N = np.int32(operator.index(N))
+    Kmax = np.int32(Kmax)
+    N = np.int32(N)
     W = float(half_nbw) / N
     nidx = np.arange(N, dtype='d')
 
@@ -77,7 +112,7 @@ def dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
             e_s += 'Please enter interp_from smaller than N.'
             raise ValueError(e_s)
         dpss = []
-        d, e = dpss_windows(interp_from, half_nbw, Kmax, low_bias=False)
+        d, e = _dpss_windows(interp_from, half_nbw, Kmax, low_bias=False)
         for this_d in d:
             x = np.arange(this_d.shape[-1])
             tmp = interpolate.interp1d(x, this_d, kind=interp_kind)
@@ -107,18 +142,15 @@ def dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
     r = 4 * W * np.sinc(2 * W * nidx)
     r[0] = 2 * W
     eigvals = np.dot(dpss_rxx, r)
-
-    if low_bias:
-        idx = (eigvals > 0.9)
-        if not idx.any():
-            warn('Could not properly use low_bias, keeping lowest-bias taper')
-            idx = [np.argmax(eigvals)]
-        dpss, eigvals = dpss[idx], eigvals[idx]
-    assert len(dpss) > 0  # should never happen
     assert dpss.shape[1] == N  # old nitime bug
+    dpss.flags.writeable = False
+    eigvals.flags.writeable = False
     return dpss, eigvals
 
 
+_compute_dpss_cached = lru_cache(maxsize=16)(_compute_dpss)
+
+
 def _psd_from_mt_adaptive(x_mt, eigvals, freq_mask, max_iter=150,
                           return_weights=False):
     r"""Use iterative procedure to compute the PSD from tapered spectra.
@@ -158,76 +190,110 @@ def _psd_from_mt_adaptive(x_mt, eigvals, freq_mask, max_iter=150,
     if n_tapers < 3:
         raise ValueError('Not enough tapers to compute adaptive weights.')
 
+    eigvals = eigvals[:, np.newaxis]
     rt_eig = np.sqrt(eigvals)
+    x_sq = x_mt.real ** 2
+    x_sq += x_mt.imag ** 2
 
     # estimate the variance from an estimate with fixed weights
-    psd_est = _psd_from_mt(x_mt, rt_eig[np.newaxis, :, np.newaxis])
+    psd_est = _psd_from_mt_sq(x_sq, rt_eig)
     x_var = np.trapz(psd_est, dx=np.pi / n_freqs) / (2 * np.pi)
     del psd_est
 
-    # allocate space for output
-    psd = np.empty((n_signals, np.sum(freq_mask)))
-
-    # only keep the frequencies of interest
-    x_mt = x_mt[:, :, freq_mask]
-
+    # only keep the frequencies of interest, and solve for all signals and
+    # frequencies together: shape (n_tapers, n_signals * n_freqs)
+    x_sq = x_sq[:, :, freq_mask]
+    n_freqs = x_sq.shape[2]
+    x_sq = x_sq.transpose(1, 0, 2).reshape(n_tapers, -1)
+    var = np.repeat(x_var, n_freqs)
+
+    # The process is to iteratively switch solving for the following
+    # two expressions:
+    # (1) Adaptive Multitaper SDF:
+    # S^{mt}(f) = [ sum |d_k(f)|^2 S_k(f) ]/ sum |d_k(f)|^2
+    #
+    # (2) Weights
+    # d_k(f) = [sqrt(lam_k) S^{mt}(f)] / [lam_k S^{mt}(f) + E{B_k(f)}]
+    #
+    # Where lam_k are the eigenvalues corresponding to the DPSS tapers,
+    # and the expected value of the broadband bias function
+    # E{B_k(f)} is replaced by its full-band integration
+    # (1/2pi) int_{-pi}^{pi} E{B_k(f)} = sig^2(1-lam_k)
+
+    # All signals and frequencies are solved for together (in cache-sized
+    # blocks), each one until its weights have converged
+    psd = np.empty(x_sq.shape[1])
+    weights = np.empty(x_sq.shape)
+    converged = True
+    n_block = 2 ** 12
+    for start in range(0, x_sq.shape[1], n_block):
+        sl = slice(start, start + n_block)
+        converged &= _adaptive_weights(x_sq[:, sl], var[sl], eigvals, rt_eig,
+                                       max_iter, psd[sl], weights[:, sl])
+    if not converged:
+        warn('Iterative multi-taper PSD computation did not converge.')
+
+    psd.shape = (n_signals, n_freqs)
     if return_weights:
-        weights = np.empty((n_signals, n_tapers, psd.shape[1]))
-
-    for i, (xk, var) in enumerate(zip(x_mt, x_var)):
-        # combine the SDFs in the traditional way in order to estimate
-        # the variance of the timeseries
-
-        # The process is to iteratively switch solving for the following
-        # two expressions:
-        # (1) Adaptive Multitaper SDF:
-        # S^{mt}(f) = [ sum |d_k(f)|^2 S_k(f) ]/ sum |d_k(f)|^2
-        #
-        # (2) Weights
-        # d_k(f) = [sqrt(lam_k) S^{mt}(f)] / [lam_k S^{mt}(f) + E{B_k(f)}]
-        #
-        # Where lam_k are the eigenvalues corresponding to the DPSS tapers,
-        # and the expected value of the broadband bias function
-        # E{B_k(f)} is replaced by its full-band integration
-        # (1/2pi) int_{-pi}^{pi} E{B_k(f)} = sig^2(1-lam_k)
-
-        # start with an estimate from incomplete data--the first 2 tapers
-        psd_iter = _psd_from_mt(xk[:2, :], rt_eig[:2, np.newaxis])
-
-        err = np.zeros_like(xk)
-        for n in range(max_iter):
-            d_k = (psd_iter / (eigvals[:, np.newaxis] * psd_iter +
-                               (1 - eigvals[:, np.newaxis]) * var))
-            d_k *= rt_eig[:, np.newaxis]
-            # Test for convergence -- this is overly conservative, since
-            # iteration only stops when all frequencies have converged.
-            # A better approach is to iterate separately for each freq, but
-            # that is a nonvectorized algorithm.
-            # Take the RMS difference in weights from the previous iterate
-            # across frequencies. If the maximum RMS error across freqs is
-            # less than 1e-10, then we're converged
-            err -= d_k
-            if np.max(np.mean(err ** 2, axis=0)) < 1e-10:
-                break
-
-            # update the iterative estimate with this d_k
-            psd_iter = _psd_from_mt(xk, d_k)
-            err = d_k
-
-        if n == max_iter - 1:
-            warn('Iterative multi-taper PSD computation did not converge.')
-
-        psd[i, :] = psd_iter
-
-        if return_weights:
-            weights[i, :, :] = d_k
-
-    if return_weights:
-        return psd, weights
+        weights = weights.reshape(n_tapers, n_signals, n_freqs)
+        return psd, weights.transpose(1, 0, 2)
     else:
         return psd
 
 
+def _adaptive_weights(x_sq, var, eigvals, rt_eig, max_iter, psd, weights):
+    """Iterate the adaptive weights of each column until convergence.
+
+    The PSD and weights of a column are stored in ``psd`` and ``weights``
+    as soon as the RMS difference in its weights from the previous iterate
+    across tapers is less than 1e-10, and the converged columns are dropped
+    from the working arrays once they are a sizable fraction of them.
+    Returns whether all columns converged.
+    """
+    n_tapers = len(x_sq)
+    idx = np.arange(x_sq.shape[1])
+    done = np.zeros(len(idx), bool)
+    # start with an estimate from incomplete data--the first 2 tapers
+    psd_iter = _psd_from_mt_sq(x_sq[:2], rt_eig[:2])
+    d_prev = np.zeros_like(x_sq)
+    for n in range(max_iter):
+        # d_k(f) = sqrt(lam_k) / [lam_k + sig^2 (1 - lam_k) / S^{mt}(f)]
+        with np.errstate(divide='ignore'):
+            d_k = (1 - eigvals) * (var / psd_iter)
+        d_k += eigvals
+        np.divide(rt_eig, d_k, out=d_k)
+        err = d_prev - d_k
+        err *= err
+        new = err.sum(axis=0) < 1e-10 * n_tapers
+        new &= ~done
+        if new.any():
+            psd[idx[new]] = psd_iter[new]
+            weights[:, idx[new]] = d_k[:, new]
+            done |= new
+            if done.all():
+                return True
+            if done.mean() > 0.25:
+                keep = ~done
+                idx, x_sq, var = idx[keep], x_sq[:, keep], var[keep]
+                d_k, done = d_k[:, keep], done[keep]
+
+        # update the iterative estimate with this d_k
+        psd_iter = _psd_from_mt_sq(x_sq, d_k)
+        d_prev = d_k
+    psd[idx[~done]] = psd_iter[~done]
+    weights[:, idx[~done]] = d_k[:, ~done]
+    return False
+
+
+def _psd_from_mt_sq(x_sq, weights):
+    """Compute PSD from squared magnitudes of tapered spectra (real weights).
+
+    This is like _psd_from_mt, but for ``x_sq = np.abs(x_mt) ** 2``.
+    """
+    weights = weights * weights
+    return 2 * (weights * x_sq).sum(axis=-2) / weights.sum(axis=-2)
+
+
 def _psd_from_mt(x_mt, weights):
     """Compute PSD from tapered spectra.
 
@@ -457,7 +523,7 @@ def psd_array_multitaper(x, sfreq, fmin=0, fmax=np.inf, bandwidth=None,
 def tfr_array_multitaper(epoch_data, sfreq, freqs, n_cycles=7.0,
                          zero_mean=True, time_bandwidth=None, use_fft=True,
                          decim=1, output='complex', n_jobs=1,
-                         verbose=None):
+                         dtype='float64', verbose=None):
     """Compute time-frequency transforms using wavelets and multitaper windows.
 
     Uses Morlet wavelets windowed with multiple DPSS tapers.
@@ -502,6 +568,7 @@ def tfr_array_multitaper(epoch_data, sfreq, freqs, n_cycles=7.0,
     %(n_jobs)s
         The number of epochs to process at the same time. The parallelization
         is implemented across channels. Defaults to 1.
+    %(dtype-tfr)s
     %(verbose)s
 
     Returns
@@ -530,4 +597,4 @@ def tfr_array_multitaper(epoch_data, sfreq, freqs, n_cycles=7.0,
                         method='multitaper', n_cycles=n_cycles,
                         zero_mean=zero_mean, time_bandwidth=time_bandwidth,
                         use_fft=use_fft, decim=decim, output=output,
-                        n_jobs=n_jobs, verbose=verbose)
+                        n_jobs=n_jobs, dtype=dtype, verbose=verbose)
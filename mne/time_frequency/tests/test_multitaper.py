@@ -2,10 +2,13 @@ from distutils.version import LooseVersion
 
 import numpy as np
 import pytest
-from numpy.testing import assert_array_almost_equal
+from numpy.testing import (assert_array_almost_equal, assert_allclose,
+                           assert_array_equal)
 
 from mne.time_frequency import psd_multitaper
-from mne.time_frequency.multitaper import dpss_windows
+from mne.time_frequency.multitaper import (dpss_windows, _mt_spectra,
+                                           _psd_from_mt, _psd_from_mt_adaptive,
+                                           _compute_dpss_cached)
 from mne.utils import requires_nitime
 from mne.io import RawArray
 from mne import create_info
@@ -36,6 +39,54 @@ def test_dpss_windows():
     assert_array_almost_equal(eigs, eigs_ni)
 
 
+def test_dpss_windows_cache():
+    """Test that cached DPSS windows are returned as copies."""
+    _compute_dpss_cached.cache_clear()
+    dpss, eigs = dpss_windows(500, 4, 8, low_bias=False)
+    dpss_2, eigs_2 = dpss_windows(500, 4, 8, low_bias=False)
+    assert _compute_dpss_cached.cache_info().hits == 1
+    dpss[0] = 0.
+    eigs[0] = 0.
+    assert_array_equal(dpss_2, dpss_windows(500, 4, 8, low_bias=False)[0])
+    dpss_lb, eigs_lb = dpss_windows(500, 4, 8)
+    assert _compute_dpss_cached.cache_info().hits == 3
+    assert_array_equal(dpss_lb, dpss_2[eigs_2 > 0.9])
+    assert_array_equal(eigs_lb, eigs_2[eigs_2 > 0.9])
+
+
+def test_psd_from_mt_adaptive():
+    """Test the adaptive weights against a per-signal computation."""
+    rng = np.random.RandomState(0)
+    n_times, sfreq = 500, 100.
+    x = rng.randn(6, n_times)
+    x[:3] += np.sin(2 * np.pi * 10 * np.arange(n_times) / sfreq)
+    dpss, eigvals = dpss_windows(n_times, 4, 8)
+    x_mt = _mt_spectra(x, dpss, sfreq)[0]
+    freq_mask = np.zeros(x_mt.shape[-1], bool)
+    freq_mask[20:200] = True
+    psd, weights = _psd_from_mt_adaptive(x_mt, eigvals, freq_mask,
+                                         return_weights=True)
+    assert psd.shape == (6, 180)
+    assert weights.shape == (6, len(eigvals), 180)
+    # iterate each signal and frequency separately until convergence
+    rt_eig = np.sqrt(eigvals)[:, np.newaxis]
+    x_var = np.trapz(_psd_from_mt(x_mt, rt_eig), dx=np.pi / x_mt.shape[-1])
+    x_var /= 2 * np.pi
+    for xk, var, this_psd, this_weights in zip(x_mt, x_var, psd, weights):
+        for ii, xf in enumerate(xk[:, freq_mask].T):
+            xf = xf[:, np.newaxis]
+            psd_iter = _psd_from_mt(xf[:2], rt_eig[:2])
+            d_prev = 0.
+            for _ in range(150):
+                d_k = rt_eig * psd_iter / (eigvals[:, np.newaxis] * psd_iter +
+                                           (1 - eigvals[:, np.newaxis]) * var)
+                if np.mean((d_prev - d_k) ** 2) < 1e-10:
+                    break
+                psd_iter, d_prev = _psd_from_mt(xf, d_k), d_k
+            assert_allclose(this_psd[ii], psd_iter[0], rtol=1e-10)
+            assert_allclose(this_weights[:, ii], d_k[:, 0], rtol=1e-10)
+
+
 @requires_nitime
 def test_multitaper_psd():
     """Test multi-taper PSD computation."""
@@ -8,13 +8,14 @@ import os.path as op
 import pytest
 import numpy as np
 from numpy.testing import (assert_array_almost_equal, assert_allclose,
-                           assert_equal)
+                           assert_equal, assert_array_equal)
 
 from scipy import fftpack
 
 from mne import read_events, Epochs, make_fixed_length_events
 from mne.io import read_raw_fif
 from mne.time_frequency._stockwell import (tfr_stockwell, _st,
+                                           tfr_array_stockwell,
                                            _precompute_st_windows,
                                            _check_input_st,
                                            _st_power_itc)
@@ -103,6 +104,22 @@ def test_stockwell_core():
     assert_array_almost_equal(pulse, y_inv)
 
 
+@pytest.mark.parametrize('n_times, decim', [(128, 4), (120, 3), (100, 7)])
+def test_stockwell_array_decim(n_times, decim):
+    """Test that decimated and threaded stockwell match the full one."""
+    rng = np.random.RandomState(0)
+    data = rng.randn(4, 3, n_times)
+    with pytest.warns(None):  # zero padding
+        power, itc, freqs = tfr_array_stockwell(data, 200., fmin=5, fmax=80,
+                                                return_itc=True)
+        power_d, itc_d, freqs_d = tfr_array_stockwell(
+            data, 200., fmin=5, fmax=80, decim=decim, return_itc=True,
+            n_jobs=2)
+    assert_array_equal(freqs, freqs_d)
+    assert_allclose(power_d, power[..., ::decim], rtol=1e-10)
+    assert_allclose(itc_d, itc[..., ::decim], rtol=1e-10)
+
+
 def test_stockwell_api():
     """Test stockwell functions."""
     raw = read_raw_fif(raw_fname)
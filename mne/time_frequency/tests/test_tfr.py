@@ -4,7 +4,7 @@ import os.path as op
 
 import numpy as np
 from numpy.testing import (assert_array_almost_equal, assert_array_equal,
-                           assert_equal)
+                           assert_equal, assert_allclose)
 import pytest
 import matplotlib.pyplot as plt
 
@@ -18,7 +18,8 @@ from mne.time_frequency.tfr import (morlet, tfr_morlet, _make_dpss,
                                     tfr_multitaper, AverageTFR, read_tfrs,
                                     write_tfrs, combine_tfr, cwt, _compute_tfr,
                                     EpochsTFR)
-from mne.time_frequency import tfr_array_multitaper, tfr_array_morlet
+from mne.time_frequency import (tfr_array_multitaper, tfr_array_morlet,
+                                TFRAccumulator)
 from mne.viz.utils import _fake_click
 from mne.tests.test_epochs import assert_metadata_equal
 
@@ -703,6 +704,120 @@ def test_compute_tfr():
             assert_array_equal(shape[1:], out.shape)
 
 
+@pytest.mark.parametrize('method', ('multitaper', 'morlet'))
+@pytest.mark.parametrize('use_fft', (False, True))
+def test_compute_tfr_batched(method, use_fft):
+    """Test the batched TFR engine against a single-signal reference."""
+    rng = np.random.RandomState(0)
+    data = rng.randn(5, 3, 200)
+    sfreq = 100.
+    freqs = np.array([10., 20., 30.])
+    n_cycles = np.array([2., 3., 4.])
+    kwargs = dict(method=method, n_cycles=n_cycles, use_fft=use_fft)
+    power = _compute_tfr(data, freqs, sfreq, output='power', **kwargs)
+    coefs = _compute_tfr(data, freqs, sfreq, output='complex', **kwargs)
+    if method == 'morlet':
+        Ws = [morlet(sfreq, freqs, n_cycles)]
+    else:
+        Ws = _make_dpss(sfreq, freqs, n_cycles, zero_mean=True)
+    want = np.mean([cwt(data.reshape(-1, 200), W, use_fft=use_fft)
+                    for W in Ws], axis=0).reshape(coefs.shape)
+    assert_array_almost_equal(coefs, want)
+    for output in ('avg_power', 'itc', 'avg_power_itc'):
+        out = _compute_tfr(data, freqs, sfreq, output=output, **kwargs)
+        if output != 'itc':
+            assert_array_almost_equal(out.real, power.mean(axis=0))
+        assert out.dtype == (np.complex128 if output == 'avg_power_itc'
+                             else np.float64)
+    # single precision
+    for output in ('power', 'complex', 'avg_power_itc'):
+        out64 = _compute_tfr(data, freqs, sfreq, output=output, **kwargs)
+        out32 = _compute_tfr(data, freqs, sfreq, output=output,
+                             dtype='float32', **kwargs)
+        assert out32.dtype == (np.float32 if output == 'power'
+                               else np.complex64)
+        assert_allclose(out32, out64, rtol=1e-4,
+                        atol=1e-5 * np.abs(out64).max())
+    with pytest.raises(ValueError, match='Invalid value for the .dtype.'):
+        _compute_tfr(data, freqs, sfreq, dtype='int32', **kwargs)
+
+
+@pytest.mark.parametrize('method', ('multitaper', 'morlet'))
+@pytest.mark.parametrize('direct', (False, True))
+def test_compute_tfr_decim(method, direct, monkeypatch):
+    """Test computing only the retained samples when decimating."""
+    import mne.time_frequency.tfr as tfr_module
+    monkeypatch.setattr(tfr_module, '_use_direct_cwt', lambda *a: direct)
+    data = np.random.RandomState(0).randn(4, 2, 301)
+    freqs = [10., 20., 45.]
+    full = _compute_tfr(data, freqs, 100., method=method, n_cycles=3.)
+    for decim in (2, 7, slice(4, 250, 5), slice(300, None, 4), 400):
+        _decim = slice(None, None, decim) if isinstance(decim, int) else decim
+        for use_fft in (False, True):
+            out = _compute_tfr(data, freqs, 100., method=method, n_cycles=3.,
+                               decim=decim, use_fft=use_fft)
+            assert_allclose(out, full[..., _decim], atol=1e-12)
+
+
+@pytest.mark.parametrize('func', (tfr_morlet, tfr_multitaper))
+def test_tfr_accumulator(func):
+    """Test averaging TFRs of chunks of epochs."""
+    rng = np.random.RandomState(0)
+    sfreq, n_times = 200., 300
+    info = create_info(['a', 'b', 'c', 'd'], sfreq, 'eeg')
+    raw = mne.io.RawArray(rng.randn(4, 40 * n_times), info)
+    raw.info['bads'] = ['c']
+    events = np.array([[150 + ii * 310, 0, 1] for ii in range(35)])
+    kwargs = dict(tmin=0, tmax=(n_times - 1) / sfreq, baseline=None,
+                  reject=dict(eeg=6.2))
+    epochs = Epochs(raw, events, preload=True, **kwargs)
+    assert 0 < len(epochs) < len(events)
+    freqs = np.array([10., 20., 40.])
+    method = func.__name__[4:]
+    n_cycles = 2.
+    power, itc = func(epochs, freqs, n_cycles, use_fft=True, decim=3)
+    assert power.ch_names == ['a', 'b', 'd']
+
+    # lazy epochs are averaged in chunks
+    lazy = Epochs(raw, events, preload=False, **kwargs)
+    power_lazy, itc_lazy = func(lazy, freqs, n_cycles, use_fft=True,
+                                decim=3)
+    assert power_lazy.nave == power.nave == len(epochs)
+    assert_array_equal(power_lazy.times, power.times)
+    assert power_lazy.info['sfreq'] == power.info['sfreq']
+    assert power_lazy.method == power.method
+    assert_allclose(power_lazy.data, power.data)
+    assert_allclose(itc_lazy.data, itc.data, atol=1e-12)
+
+    # chunks of data, picks
+    data = epochs.get_data()
+    acc = TFRAccumulator(epochs.info, epochs.times, freqs, n_cycles,
+                         method=method, decim=3, picks=[0, 3])
+    assert acc.nave == 0
+    with pytest.raises(RuntimeError, match='No epochs'):
+        acc.average()
+    for start in range(0, len(data), 4):
+        acc.add(data[start:start + 4])
+    acc.add(data[0])
+    assert acc.nave == len(data) + 1
+    assert 'nave: %d' % (len(data) + 1,) in repr(acc)
+    power_acc, itc_acc = acc.average()
+    want = func(EpochsArray(np.concatenate([data, data[:1]]), epochs.info),
+                freqs, n_cycles, use_fft=True, decim=3, picks=[0, 3])
+    assert power_acc.ch_names == ['a', 'd']
+    assert_allclose(power_acc.data, want[0].data)
+    assert_allclose(itc_acc.data, want[1].data, atol=1e-12)
+    power_acc = TFRAccumulator(epochs.info, epochs.times, freqs, n_cycles,
+                               method=method, return_itc=False).add(
+        epochs).average()
+    assert_allclose(power_acc.data, func(
+        epochs, freqs, n_cycles, use_fft=True, return_itc=False).data)
+    with pytest.raises(ValueError, match='data must be of shape'):
+        acc.add(data[:, :2])
+    with pytest.raises(ValueError, match='do not match'):
+        acc.add(epochs.copy().pick_channels(['a', 'b']))
+
+
 @pytest.mark.parametrize('method', ('multitaper', 'morlet'))
 @pytest.mark.parametrize('decim', (1, slice(1, None, 2), 3))
 def test_compute_tfr_correct(method, decim):
@@ -10,7 +10,7 @@ Morlet code inspired by Matlab code from Sheraz Khan & Brainstorm & SPM
 # License : BSD (3-clause)
 
 from copy import deepcopy
-from functools import partial
+from functools import partial, lru_cache
 from math import sqrt
 
 import numpy as np
@@ -270,7 +270,7 @@ def _cwt(X, Ws, mode="same", decim=1, use_fft=True):
 def _compute_tfr(epoch_data, freqs, sfreq=1.0, method='morlet',
                  n_cycles=7.0, zero_mean=None, time_bandwidth=None,
                  use_fft=True, decim=1, output='complex', n_jobs=1,
-                 verbose=None):
+                 dtype='float64', verbose=None):
     """Compute time-frequency transforms.
 
     Parameters
@@ -321,6 +321,7 @@ def _compute_tfr(epoch_data, freqs, sfreq=1.0, method='morlet',
     %(n_jobs)s
         The number of epochs to process at the same time. The parallelization
         is implemented across channels.
+    %(dtype-tfr)s
     %(verbose)s
 
     Returns
@@ -344,57 +345,95 @@ def _compute_tfr(epoch_data, freqs, sfreq=1.0, method='morlet',
                          time_bandwidth, use_fft, decim, output)
 
     decim = _check_decim(decim)
+    Ws, fft_Ws, dtype = _prepare_wavelets(
+        freqs, sfreq, method, n_cycles, zero_mean, time_bandwidth, use_fft,
+        epoch_data.shape[2], decim, dtype)
+
+    # Parallel computation, applied across blocks of channels
+    parallel, my_tfr, n_jobs = parallel_func(_time_frequency_loop, n_jobs)
+    blocks = _channel_blocks(epoch_data.shape[1], n_jobs)
+    if len(blocks) == 1:
+        return _time_frequency_loop(epoch_data, Ws, fft_Ws, output, use_fft,
+                                    decim, dtype)
+    tfrs = parallel(
+        my_tfr(epoch_data[:, block], Ws, fft_Ws, output, use_fft, decim,
+               dtype) for block in blocks)
+    # the epochs are the first dimension for single trial outputs
+    axis = 0 if ('avg_' in output) or ('itc' in output) else 1
+    return np.concatenate(tfrs, axis=axis)
+
+
+def _prepare_wavelets(freqs, sfreq, method, n_cycles, zero_mean,
+                      time_bandwidth, use_fft, n_times, decim, dtype):
+    """Aux. function to get the (checked) wavelets and their FFTs."""
     if (freqs > sfreq / 2.).any():
         raise ValueError('Cannot compute freq above Nyquist freq of the data '
                          '(%0.1f Hz), got %0.1f Hz'
                          % (sfreq / 2., freqs.max()))
+    dtype = np.dtype(dtype)
+    _check_option('dtype', dtype.name, ['float64', 'float32'])
 
     # We decimate *after* decomposition, so we need to create our kernels
     # for the original sfreq
-    if method == 'morlet':
-        W = morlet(sfreq, freqs, n_cycles=n_cycles, zero_mean=zero_mean)
-        Ws = [W]  # to have same dimensionality as the 'multitaper' case
-
-    elif method == 'multitaper':
-        Ws = _make_dpss(sfreq, freqs, n_cycles=n_cycles,
-                        time_bandwidth=time_bandwidth, zero_mean=zero_mean)
+    if not isinstance(n_cycles, float):
+        n_cycles = tuple(n_cycles.tolist())
+    wavelet_params = (method, sfreq, tuple(freqs.tolist()), n_cycles,
+                      zero_mean, time_bandwidth)
+    Ws = _get_wavelets(*wavelet_params)
 
     # Check wavelets
-    if len(Ws[0][0]) > epoch_data.shape[2]:
+    if len(Ws[0][0]) > n_times:
         raise ValueError('At least one of the wavelets is longer than the '
                          'signal. Use a longer signal or shorter wavelets.')
+    fft_Ws = None
+    if use_fft:
+        from ..filter import next_fast_len
+        size = n_times + max(W.size for W in Ws[0]) - 1
+        if decim.step > 1:
+            # Use a multiple of the decimation factor, so that the retained
+            # samples can be computed from folded spectra (see _cwt_blocks)
+            n_fft = decim.step * next_fast_len(-(-size // decim.step))
+        else:
+            # Always use 2**n-sized FFT
+            n_fft = 2 ** int(np.ceil(np.log2(size)))
+        fft_Ws = _get_wavelet_ffts(wavelet_params, n_fft, dtype.name)
+    return Ws, fft_Ws, dtype
 
-    # Initialize output
-    n_freqs = len(freqs)
-    n_epochs, n_chans, n_times = epoch_data[:, :, decim].shape
-    if output in ('power', 'phase', 'avg_power', 'itc'):
-        dtype = np.float
-    elif output in ('complex', 'avg_power_itc'):
-        # avg_power_itc is stored as power + 1i * itc to keep a
-        # simple dimensionality
-        dtype = np.complex
-
-    if ('avg_' in output) or ('itc' in output):
-        out = np.empty((n_chans, n_freqs, n_times), dtype)
-    else:
-        out = np.empty((n_chans, n_epochs, n_freqs, n_times), dtype)
 
-    # Parallel computation
-    parallel, my_cwt, _ = parallel_func(_time_frequency_loop, n_jobs)
+def _channel_blocks(n_chans, n_jobs):
+    """Split the channels in (at most) n_jobs contiguous blocks."""
+    bounds = np.linspace(0, n_chans, min(n_jobs, n_chans) + 1).astype(int)
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
 
-    # Parallelization is applied across channels.
-    tfrs = parallel(
-        my_cwt(channel, Ws, output, use_fft, 'same', decim)
-        for channel in epoch_data.transpose(1, 0, 2))
 
-    # FIXME: to avoid overheads we should use np.array_split()
-    for channel_idx, tfr in enumerate(tfrs):
-        out[channel_idx] = tfr
+@lru_cache(maxsize=8)
+def _get_wavelets(method, sfreq, freqs, n_cycles, zero_mean,
+                  time_bandwidth):
+    """Compute (and cache) the wavelets of each taper."""
+    freqs = np.array(freqs)
+    n_cycles = np.array(n_cycles)
+    if method == 'morlet':
+        Ws = [morlet(sfreq, freqs, n_cycles=n_cycles, zero_mean=zero_mean)]
+    else:
+        Ws = _make_dpss(sfreq, freqs, n_cycles=n_cycles,
+                        time_bandwidth=time_bandwidth, zero_mean=zero_mean)
+    for W in Ws:
+        for w in W:
+            w.flags.writeable = False
+    return tuple(tuple(W) for W in Ws)
 
-    if ('avg_' not in output) and ('itc' not in output):
-        # This is to enforce that the first dimension is for epochs
-        out = out.transpose(1, 0, 2, 3)
-    return out
+
+@lru_cache(maxsize=8)
+def _get_wavelet_ffts(wavelet_params, n_fft, dtype):
+    """Compute (and cache) the FFTs of the wavelets of each taper."""
+    Ws = _get_wavelets(*wavelet_params)
+    fft_Ws = np.empty((len(Ws), len(Ws[0]), n_fft),
+                      np.result_type(dtype, np.complex64))
+    for W, fft_W in zip(Ws, fft_Ws):
+        for w, this_fft in zip(W, fft_W):
+            this_fft[:] = fft(w, n_fft)
+    fft_Ws.flags.writeable = False
+    return fft_Ws
 
 
 def _check_tfr_param(freqs, sfreq, method, zero_mean, n_cycles,
@@ -466,17 +505,141 @@ def _check_tfr_param(freqs, sfreq, method, zero_mean, n_cycles,
     return freqs, sfreq, zero_mean, n_cycles, time_bandwidth, decim
 
 
-def _time_frequency_loop(X, Ws, output, use_fft, mode, decim):
+def _cwt_blocks(X, W, fft_W, use_fft, decim, dtype):
+    """Aux. function to decompose blocks of epochs with a set of wavelets.
+
+    Each block of signals is transformed at once, with a single FFT when
+    ``use_fft`` is True, and convolved with 'same' mode.
+
+    When decimating (``decim.step > 1``), only the retained samples are
+    computed, either with direct dot products (always if ``use_fft`` is
+    False, otherwise for the wavelets for which it is cheaper) or with
+    inverse FFTs of the spectra folded ``decim.step`` times, which are
+    ``decim.step`` times shorter. This requires the FFT size to be a
+    multiple of ``decim.step``.
+
+    Parameters
+    ----------
+    X : array, shape (n_epochs, n_chans, n_times)
+        The epochs data.
+    W : list, shape (n_wavelets, n_times)
+        The wavelets of a single taper.
+    fft_W : array, shape (n_wavelets, n_fft) | None
+        The FFTs of the wavelets, only used if ``use_fft`` is True.
+    use_fft : bool
+        Use the FFT for convolutions or not.
+    decim : slice
+        The decimation slice: e.g. power[:, decim]
+    dtype : dtype
+        The real data type of the computations.
+
+    Yields
+    ------
+    start : int
+        The index of the first epoch of the block.
+    ii : int
+        The index of the wavelet.
+    tfr : array, shape (n_block, n_chans, n_times_decim)
+        The decomposition of the block of epochs by the wavelet.
+    """
+    n_epochs, n_chans, n_times = X.shape
+    cdtype = np.result_type(dtype, np.complex64)
+    # Work on blocks of epochs of (at most) ~64 MB of complex values
+    n_fft = fft_W.shape[-1] if use_fft else n_times
+    n_block = max(2 ** 26 // (n_chans * n_fft * cdtype.itemsize), 1)
+
+    # Choose how to compute each wavelet
+    t_out = np.arange(n_times)[decim]
+    step = decim.step
+    if step > 1 and len(t_out) > 0:
+        direct = [not use_fft or _use_direct_cwt(w.size, len(t_out), n_fft)
+                  for w in W]
+        n_pad = max(w.size for w in W) - 1
+        if not all(direct):
+            # shift the retained samples to the origin, to fold the spectra
+            shifts = [t_out[0] + (w.size - 1) // 2 for w in W]
+            ramp = 2j * np.pi * np.arange(n_fft) / n_fft
+            fft_W = [None if direct_ else
+                     (fft_W[ii] * np.exp(ramp * shifts[ii])).astype(cdtype)
+                     for ii, direct_ in enumerate(direct)]
+    else:
+        direct = None
+
+    for start in range(0, n_epochs, n_block):
+        x = X[start:start + n_block].astype(dtype, copy=False)
+        if use_fft and not (direct is not None and all(direct)):
+            fft_x = fft(x, n_fft)
+        if direct is not None and any(direct):
+            x_pad = np.zeros(x.shape[:2] + (n_times + 2 * n_pad,), dtype)
+            x_pad[..., n_pad:n_pad + n_times] = x
+
+        # Loop across wavelets
+        for ii, w in enumerate(W):
+            if direct is not None:
+                if direct[ii]:
+                    tfr = _direct_cwt(x_pad, n_pad, w, t_out)
+                else:
+                    tfr = fft_x * fft_W[ii]
+                    tfr = tfr.reshape(x.shape[:2] + (step, -1)).sum(axis=2)
+                    tfr = ifft(tfr)[..., :len(t_out)]
+                    tfr /= step
+                yield start, ii, tfr
+                continue
+            if use_fft:
+                tfr = ifft(fft_x * fft_W[ii])
+                # Center the decomposition
+                offset = (w.size - 1) // 2
+                tfr = tfr[..., offset:offset + n_times]
+            else:
+                tfr = np.array([np.convolve(xx, w, mode='same')
+                                for xx in x.reshape(-1, n_times)])
+                tfr = tfr.reshape(x.shape)
+            yield start, ii, tfr[..., decim]
+
+
+def _use_direct_cwt(n_taps, n_out, n_fft):
+    """Aux. function to choose direct dot products over a folded FFT."""
+    # Empirically, multiplying and folding one frequency bin costs about as
+    # much as six multiply-adds of the (BLAS) dot products
+    return n_taps * n_out <= 6 * n_fft
+
+
+def _direct_cwt(x_pad, n_pad, w, t_out):
+    """Aux. function to compute a 'same' mode convolution at some samples.
+
+    ``x_pad`` is the signal padded with ``n_pad`` zeros on each side, and
+    ``t_out`` are evenly spaced sample indices.
+    """
+    from numpy.lib.stride_tricks import as_strided
+    n_taps = w.size
+    step = t_out[1] - t_out[0] if len(t_out) > 1 else 1
+    # windows of the (padded) signal ending at each output sample
+    first = n_pad + t_out[0] + (n_taps - 1) // 2 - (n_taps - 1)
+    x_pad = x_pad[..., first:]
+    windows = as_strided(
+        x_pad, x_pad.shape[:-1] + (len(t_out), n_taps),
+        x_pad.strides[:-1] + (step * x_pad.strides[-1], x_pad.strides[-1]),
+        writeable=False)
+    w = w[::-1]
+    w = np.array([w.real, w.imag], x_pad.dtype).T
+    tfr = np.dot(windows, w)
+    return tfr.view(np.result_type(x_pad.dtype, np.complex64))[..., 0]
+
+
+def _time_frequency_loop(X, Ws, fft_Ws, output, use_fft, decim, dtype):
     """Aux. function to _compute_tfr.
 
-    Loops time-frequency transform across wavelets and epochs.
+    Loops time-frequency transform across tapers, blocks of epochs and
+    wavelets.
 
     Parameters
     ----------
-    X : array, shape (n_epochs, n_times)
-        The epochs data of a single channel.
+    X : array, shape (n_epochs, n_chans, n_times)
+        The epochs data.
     Ws : list, shape (n_tapers, n_wavelets, n_times)
         The wavelets.
+    fft_Ws : array, shape (n_tapers, n_wavelets, n_fft) | None
+        The FFTs of the wavelets, only used if ``use_fft`` is True.
     output : str
 
         * 'complex' : single trial complex.
@@ -489,35 +652,37 @@ def _time_frequency_loop(X, Ws, output, use_fft, mode, decim):
 
     use_fft : bool
         Use the FFT for convolutions or not.
-    mode : {'full', 'valid', 'same'}
-        See numpy.convolve.
     decim : slice
         The decimation slice: e.g. power[:, decim]
+    dtype : dtype
+        The real data type of the computations.
     """
     # Set output type
-    dtype = np.float
+    cdtype = np.result_type(dtype, np.complex64)
+    out_dtype = dtype
     if output in ['complex', 'avg_power_itc']:
-        dtype = np.complex
+        out_dtype = cdtype
+    average = ('avg_' in output) or ('itc' in output)
 
     # Init outputs
     decim = _check_decim(decim)
-    n_epochs, n_times = X[:, decim].shape
+    n_epochs, n_chans, n_times = X[:, :, decim].shape
     n_freqs = len(Ws[0])
-    if ('avg_' in output) or ('itc' in output):
-        tfrs = np.zeros((n_freqs, n_times), dtype=dtype)
+    if average:
+        tfrs = np.zeros((n_chans, n_freqs, n_times), dtype=out_dtype)
     else:
-        tfrs = np.zeros((n_epochs, n_freqs, n_times), dtype=dtype)
+        tfrs = np.zeros((n_epochs, n_chans, n_freqs, n_times),
+                        dtype=out_dtype)
 
     # Loops across tapers.
-    for W in Ws:
-        coefs = _cwt(X, W, mode, decim=decim, use_fft=use_fft)
-
+    for W, fft_W in zip(Ws, fft_Ws if use_fft else Ws):
         # Inter-trial phase locking is apparently computed per taper...
         if 'itc' in output:
-            plf = np.zeros((n_freqs, n_times), dtype=np.complex)
+            plf = np.zeros((n_chans, n_freqs, n_times), dtype=cdtype)
 
-        # Loop across epochs
-        for epoch_idx, tfr in enumerate(coefs):
+        # Loop across blocks of epochs and wavelets
+        for start, ii, tfr in _cwt_blocks(X, W, fft_W, use_fft, decim,
+                                          dtype):
             # Transform complex values
             if output in ['power', 'avg_power']:
                 tfr = (tfr * tfr.conj()).real  # power
@@ -525,17 +690,17 @@ def _time_frequency_loop(X, Ws, output, use_fft, mode, decim):
                 tfr = np.angle(tfr)
             elif output == 'avg_power_itc':
                 tfr_abs = np.abs(tfr)
-                plf += tfr / tfr_abs  # phase
+                plf[:, ii] += (tfr / tfr_abs).sum(axis=0)  # phase
                 tfr = tfr_abs ** 2  # power
             elif output == 'itc':
-                plf += tfr / np.abs(tfr)  # phase
+                plf[:, ii] += (tfr / np.abs(tfr)).sum(axis=0)  # phase
                 continue  # not need to stack anything else than plf
 
             # Stack or add
-            if ('avg_' in output) or ('itc' in output):
-                tfrs += tfr
+            if average:
+                tfrs[:, ii] += tfr.sum(axis=0)
             else:
-                tfrs[epoch_idx] += tfr
+                tfrs[start:start + len(tfr), :, ii] += tfr
 
         # Compute inter trial coherence
         if output == 'avg_power_itc':
@@ -544,7 +709,7 @@ def _time_frequency_loop(X, Ws, output, use_fft, mode, decim):
             tfrs += np.abs(plf)
 
     # Normalization of average metrics
-    if ('avg_' in output) or ('itc' in output):
+    if average:
         tfrs /= n_epochs
 
     # Normalization by number of taper
@@ -552,6 +717,34 @@ def _time_frequency_loop(X, Ws, output, use_fft, mode, decim):
     return tfrs
 
 
+def _tfr_sums(X, Ws, fft_Ws, use_fft, decim, dtype, return_itc):
+    """Aux. function to TFRAccumulator.
+
+    Returns the power summed across epochs and tapers, shape (n_chans,
+    n_freqs, n_times), and the unit phase vectors summed across epochs,
+    shape (n_tapers, n_chans, n_freqs, n_times), or None if ``return_itc``
+    is False.
+    """
+    decim = _check_decim(decim)
+    n_epochs, n_chans, n_times = X[:, :, decim].shape
+    n_freqs = len(Ws[0])
+    power = np.zeros((n_chans, n_freqs, n_times), dtype)
+    plf = None
+    if return_itc:
+        plf = np.zeros((len(Ws), n_chans, n_freqs, n_times),
+                       np.result_type(dtype, np.complex64))
+    for ti, (W, fft_W) in enumerate(zip(Ws, fft_Ws if use_fft else Ws)):
+        for start, ii, tfr in _cwt_blocks(X, W, fft_W, use_fft, decim,
+                                          dtype):
+            if return_itc:
+                tfr_abs = np.abs(tfr)
+                plf[ti, :, ii] += (tfr / tfr_abs).sum(axis=0)  # phase
+                power[:, ii] += (tfr_abs ** 2).sum(axis=0)
+            else:
+                power[:, ii] += (tfr * tfr.conj()).real.sum(axis=0)
+    return power, plf
+
+
 def cwt(X, Ws, use_fft=True, mode='same', decim=1):
     """Compute time freq decomposition with continuous wavelet transform.
 
@@ -603,12 +796,6 @@ def _tfr_aux(method, inst, freqs, decim, return_itc, picks, average,
     from ..epochs import BaseEpochs
     """Help reduce redundancy between tfr_morlet and tfr_multitaper."""
     decim = _check_decim(decim)
-    data = _get_data(inst, return_itc)
-    info = inst.info.copy()  # make a copy as sfreq can be altered
-
-    info, data = _prepare_picks(info, data, picks, axis=1)
-    del picks
-
     if average:
         if output == 'complex':
             raise ValueError('output must be "power" if average=True')
@@ -622,6 +809,19 @@ def _tfr_aux(method, inst, freqs, decim, return_itc, picks, average,
             raise ValueError('Inter-trial coherence is not supported'
                              ' with average=False')
 
+    if average and isinstance(inst, BaseEpochs) and not inst.preload:
+        # average chunks of epochs rather than loading all of them
+        acc = TFRAccumulator(inst.info, inst.times, freqs, method=method,
+                             decim=decim, return_itc=return_itc, picks=picks,
+                             **tfr_params)
+        return acc.add(inst).average()
+
+    data = _get_data(inst, return_itc)
+    info = inst.info.copy()  # make a copy as sfreq can be altered
+
+    info, data = _prepare_picks(info, data, picks, axis=1)
+    del picks
+
     out = _compute_tfr(data, freqs, info['sfreq'], method=method,
                        output=output, decim=decim, **tfr_params)
     times = inst.times[decim].copy()
@@ -657,7 +857,7 @@ def _tfr_aux(method, inst, freqs, decim, return_itc, picks, average,
 @verbose
 def tfr_morlet(inst, freqs, n_cycles, use_fft=False, return_itc=True, decim=1,
                n_jobs=1, picks=None, zero_mean=True, average=True,
-               output='power', verbose=None):
+               output='power', dtype='float64', verbose=None):
     """Compute Time-Frequency Representation (TFR) using Morlet wavelets.
 
     Parameters
@@ -697,6 +897,7 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False, return_itc=True, decim=1,
         average must be False.
 
         .. versionadded:: 0.15.0
+    %(dtype-tfr)s
     %(verbose)s
 
     Returns
@@ -716,7 +917,7 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False, return_itc=True, decim=1,
     mne.time_frequency.tfr_array_stockwell
     """
     tfr_params = dict(n_cycles=n_cycles, n_jobs=n_jobs, use_fft=use_fft,
-                      zero_mean=zero_mean, output=output)
+                      zero_mean=zero_mean, output=output, dtype=dtype)
     return _tfr_aux('morlet', inst, freqs, decim, return_itc, picks,
                     average, **tfr_params)
 
@@ -724,7 +925,7 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False, return_itc=True, decim=1,
 @verbose
 def tfr_array_morlet(epoch_data, sfreq, freqs, n_cycles=7.0,
                      zero_mean=False, use_fft=True, decim=1, output='complex',
-                     n_jobs=1, verbose=None):
+                     n_jobs=1, dtype='float64', verbose=None):
     """Compute time-frequency transform using Morlet wavelets.
 
     Convolves epoch data with selected Morlet wavelets.
@@ -765,6 +966,7 @@ def tfr_array_morlet(epoch_data, sfreq, freqs, n_cycles=7.0,
     %(n_jobs)s
         The number of epochs to process at the same time. The parallelization
         is implemented across channels. Default 1.
+    %(dtype-tfr)s
     %(verbose)s
 
     Returns
@@ -792,13 +994,14 @@ def tfr_array_morlet(epoch_data, sfreq, freqs, n_cycles=7.0,
                         sfreq=sfreq, method='morlet', n_cycles=n_cycles,
                         zero_mean=zero_mean, time_bandwidth=None,
                         use_fft=use_fft, decim=decim, output=output,
-                        n_jobs=n_jobs, verbose=verbose)
+                        n_jobs=n_jobs, dtype=dtype, verbose=verbose)
 
 
 @verbose
 def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
                    use_fft=True, return_itc=True, decim=1,
-                   n_jobs=1, picks=None, average=True, verbose=None):
+                   n_jobs=1, picks=None, average=True, dtype='float64',
+                   verbose=None):
     """Compute Time-Frequency Representation (TFR) using DPSS tapers.
 
     Parameters
@@ -835,6 +1038,7 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
         If True average across Epochs.
 
         .. versionadded:: 0.13.0
+    %(dtype-tfr)s
     %(verbose)s
 
     Returns
@@ -858,11 +1062,201 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
     .. versionadded:: 0.9.0
     """
     tfr_params = dict(n_cycles=n_cycles, n_jobs=n_jobs, use_fft=use_fft,
-                      zero_mean=True, time_bandwidth=time_bandwidth)
+                      zero_mean=True, time_bandwidth=time_bandwidth,
+                      dtype=dtype)
     return _tfr_aux('multitaper', inst, freqs, decim, return_itc, picks,
                     average, **tfr_params)
 
 
+@fill_doc
+class TFRAccumulator(object):
+    """Average the power and ITC of epochs added one chunk at a time.
+
+    The running sums take O(n_channels * n_freqs * n_times) memory whatever
+    the number of epochs, so that the epochs can be loaded (or generated)
+    in chunks rather than all at once.
+
+    Parameters
+    ----------
+    info : instance of Info
+        The measurement info of the epochs.
+    times : array, shape (n_times,)
+        The time points of the epochs, in seconds.
+    freqs : ndarray, shape (n_freqs,)
+        The frequencies in Hz.
+    n_cycles : float | ndarray, shape (n_freqs,)
+        The number of cycles globally or for each frequency.
+    method : 'morlet' | 'multitaper'
+        The time-frequency method. 'morlet' convolves a Morlet wavelet.
+        'multitaper' uses Morlet wavelets windowed with multiple DPSS
+        tapers.
+    time_bandwidth : float | None
+        Time x (Full) Bandwidth product, only used with 'multitaper'. If
+        None (default), 4.0 is used (3 tapers).
+    use_fft : bool, default True
+        The fft based convolution or not.
+    zero_mean : bool, default True
+        Make sure the wavelet has a mean of zero.
+    decim : int | slice, default 1
+        To reduce memory usage, decimation factor after time-frequency
+        decomposition.
+        If `int`, returns tfr[..., ::decim].
+        If `slice`, returns tfr[..., decim].
+
+        .. note:: Decimation may create aliasing artifacts.
+    return_itc : bool, default True
+        Accumulate the inter-trial coherence (ITC) as well as the power.
+    %(picks_good_data)s
+    dtype : str
+        The precision of the computations, 'float64' (default) or 'float32'.
+    %(n_jobs)s
+        The parallelization is implemented across channels.
+
+    Attributes
+    ----------
+    nave : int
+        The number of epochs accumulated so far.
+
+    See Also
+    --------
+    mne.time_frequency.tfr_morlet
+    mne.time_frequency.tfr_multitaper
+    mne.time_frequency.combine_tfr
+
+    Notes
+    -----
+    ``tfr_morlet`` and ``tfr_multitaper`` use this to average epochs that
+    are not preloaded.
+
+    .. versionadded:: 0.20
+    """
+
+    def __init__(self, info, times, freqs, n_cycles=7.0, method='morlet',
+                 time_bandwidth=None, use_fft=True, zero_mean=True, decim=1,
+                 return_itc=True, picks=None, dtype='float64', n_jobs=1):
+        _check_option('method', method, ['morlet', 'multitaper'])
+        freqs, sfreq, zero_mean, n_cycles, time_bandwidth, decim = \
+            _check_tfr_param(freqs, info['sfreq'], method, zero_mean,
+                             n_cycles, time_bandwidth, use_fft, decim,
+                             'avg_power_itc')
+        decim = _check_decim(decim)
+        times = np.array(times, float)
+        self._Ws, self._fft_Ws, self._dtype = _prepare_wavelets(
+            freqs, sfreq, method, n_cycles, zero_mean, time_bandwidth,
+            use_fft, len(times), decim, dtype)
+        self._ch_names = list(info['ch_names'])
+        self._picks = _picks_to_idx(info, picks, exclude='bads')
+        self.info = pick_info(info, self._picks)
+        self.info['sfreq'] /= decim.step
+        self._n_times = len(times)
+        self.times = times[decim]
+        self.freqs = freqs
+        self.method = method
+        self.return_itc = return_itc
+        self._use_fft = use_fft
+        self._decim = decim
+        self._n_jobs = n_jobs
+        self.nave = 0
+        self._power = self._plf = None
+
+    def add(self, inst):
+        """Add epochs to the averages.
+
+        Parameters
+        ----------
+        inst : instance of Epochs | array
+            The epochs, or the data of a chunk of epochs of shape
+            (n_epochs, n_channels, n_times) (or of a single epoch, of shape
+            (n_channels, n_times)). Epochs that are not preloaded are loaded
+            and added in chunks.
+
+        Returns
+        -------
+        self : instance of TFRAccumulator
+            The accumulator.
+        """
+        from ..epochs import BaseEpochs
+        if isinstance(inst, BaseEpochs):
+            if inst.ch_names != self._ch_names:
+                raise ValueError('The channels of the epochs do not match '
+                                 'those of the accumulator')
+            if len(inst.times) != self._n_times:
+                raise ValueError('The epochs must have %d time points, got %d'
+                                 % (self._n_times, len(inst.times)))
+            inst.drop_bad()
+            # read chunks of ~64 MB
+            n_per = max(2 ** 23 // (len(self._picks) * self._n_times), 1)
+            for start in range(0, len(inst), n_per):
+                self._add(inst.get_data(picks=self._picks,
+                                        item=slice(start, start + n_per)))
+        else:
+            data = np.asarray(inst)
+            if data.ndim == 2:
+                data = data[np.newaxis]
+            if data.ndim != 3 or data.shape[1:] != (len(self._ch_names),
+                                                    self._n_times):
+                raise ValueError('data must be of shape (n_epochs, %d, %d), '
+                                 'got %s' % (len(self._ch_names),
+                                             self._n_times, data.shape))
+            self._add(data[:, self._picks])
+        return self
+
+    def _add(self, data):
+        """Add the data of a chunk of (picked) epochs."""
+        if len(data) == 0:
+            return
+        parallel, my_sums, _ = parallel_func(_tfr_sums, self._n_jobs)
+        args = (self._Ws, self._fft_Ws, self._use_fft, self._decim,
+                self._dtype, self.return_itc)
+        blocks = _channel_blocks(data.shape[1], self._n_jobs)
+        if len(blocks) == 1:
+            power, plf = _tfr_sums(data, *args)
+        else:
+            sums = parallel(my_sums(data[:, block], *args)
+                            for block in blocks)
+            power = np.concatenate([p for p, _ in sums])
+            plf = (np.concatenate([p for _, p in sums], axis=1)
+                   if self.return_itc else None)
+        if self.nave == 0:
+            self._power, self._plf = power, plf
+        else:
+            self._power += power
+            if self.return_itc:
+                self._plf += plf
+        self.nave += len(data)
+
+    def average(self):
+        """Get the average power (and ITC) of the epochs added so far.
+
+        Returns
+        -------
+        power : AverageTFR
+            The averaged power.
+        itc : AverageTFR
+            The inter-trial coherence (ITC). Only returned if return_itc
+            is True.
+        """
+        if self.nave == 0:
+            raise RuntimeError('No epochs have been added yet')
+        n_tapers = len(self._Ws)
+        power = self._power / self.nave / n_tapers
+        out = AverageTFR(self.info.copy(), power, self.times.copy(),
+                         self.freqs.copy(), self.nave,
+                         method='%s-power' % self.method)
+        if self.return_itc:
+            itc = np.abs(self._plf).sum(axis=0) / self.nave / n_tapers
+            out = (out, AverageTFR(self.info.copy(), itc, self.times.copy(),
+                                   self.freqs.copy(), self.nave,
+                                   method='%s-itc' % self.method))
+        return out
+
+    def __repr__(self):  # noqa: D105
+        return ('<TFRAccumulator  |  method: %s, %d channels x %d freqs x '
+                '%d times, nave: %d>'
+                % (self.method, len(self.info['ch_names']), len(self.freqs),
+                   len(self.times), self.nave))
+
+
 # TFR(s) class
 
 class _BaseTFR(ContainsMixin, UpdateChannelsMixin, SizeMixin):
@@ -175,6 +175,15 @@ filter_length : str | int
     * **int**: Specified length in samples. For fir_design="firwin",
       this should not be used.
 """
+docdict['filter_length-notch'] = docdict['filter_length'] + """
+    For ``method='spectrum_fit'``, this is instead the length of the sliding
+    window in which the sinusoids are fitted, with windows overlapping by
+    half. 'auto' uses a single window spanning the whole signal, except when
+    streaming raw data to disk, where 10 second windows are used.
+
+    .. versionchanged:: 0.20
+       Support for sliding windows with ``method='spectrum_fit'``.
+"""
 docdict['l_trans_bandwidth'] = """
 l_trans_bandwidth : float | str
     Width of the transition band at the low cut-off frequency in Hz
@@ -258,6 +267,18 @@ npad : int | str
     Can also be "auto" to use a padding that will result in
     a power-of-two size (can be much faster).
 """
+docdict['method-resample'] = """
+method : str
+    Can be "fft" (default) to resample in the frequency domain (see
+    ``npad`` and ``window``), or "polyphase" to use a polyphase FIR filter
+    (:func:`scipy.signal.upfirdn`, as in :func:`scipy.signal.resample_poly`),
+    which works on the data piece by piece and requires the ratio of the
+    sampling rates to be a ratio of integers no larger than 1000. With
+    "polyphase", ``npad`` and ``window`` are not used (nor is ``n_jobs``
+    when resampling raw data), and a warning is emitted if they are set.
+
+    .. versionadded:: 0.20
+"""
 docdict['window-resample'] = """
 window : str | tuple
     Frequency-domain window to use in resampling.
@@ -525,6 +546,32 @@ seed : None | int | instance of ~numpy.random.RandomState
     ``None``.
 """
 
+# Time-frequency
+docdict['dtype-tfr'] = """
+dtype : str
+    The precision of the computations and of the output, 'float64'
+    (default) or 'float32' (with 'complex64' complex values). Single
+    precision halves the memory used and is faster.
+
+    .. versionadded:: 0.20
+"""
+
+# Clustering
+docdict['checkpoint'] = """
+checkpoint : str | None
+    Directory in which to save the permutation values of ``H0`` in chunks
+    as they are computed. Chunks already saved there for the same data and
+    parameters are reused, so a run that was interrupted can be resumed, or
+    extended to a larger ``n_permutations``, by calling the function again
+    with the same (int) ``seed``. Chunks computed with other seeds (e.g., on
+    other machines, with their files copied to this directory) are merged
+    into ``H0``, which can then have more than ``n_permutations`` values.
+    None (default) does not save anything. ``seed`` must not be None when
+    a checkpoint is used.
+
+    .. versionadded:: 0.20
+"""
+
 # Visualization
 docdict['combine'] = """
 combine : None | str | callable